@@ -13,7 +13,6 @@ import os
 import sys
 import json
 import time
-import hashlib
 import logging
 from datetime import datetime
 
@@ -27,127 +26,61 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def inject_word_style():
-    st.markdown("""
-    <style>
-        .main .block-container {max-width:98%; padding:1rem;}
-        .ck-editor__editable {
-            min-height:700px;
-            background:white;
-            color:black;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-inject_word_style()
+# O CSS (tema + editor) sai num único bloco em inject_visual_core (seção 04).
 
 # ==============================================================================
 # 02. PATHS PRINCIPAIS
 # ==============================================================================
-SYSTEM_ROOT = "Dados_Pregador_V31"
-os.makedirs(SYSTEM_ROOT, exist_ok=True)
-
-LOG_PATH = os.path.join(SYSTEM_ROOT, "logs")
-os.makedirs(LOG_PATH, exist_ok=True)
-
-logging.basicConfig(
-    filename=os.path.join(LOG_PATH, "system.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# O logging é configurado uma única vez em app_modules.core (System_Logs).
 
 # ==============================================================================
 # 03. IMPORTAÇÃO DOS MÓDULOS DO SISTEMA (ORDEM CORRETA)
 # ==============================================================================
-from app_modules.core import (
-    genesis_filesystem_integrity_check,
-    DB_FILES,
-    _read_json_safe,
-    _write_json_atomic,
-    DIRECTORY_STRUCTURE
-)
+from app_modules.startup import startup_phase, format_startup_report
 
-from app_modules.auth import AccessGate
-from app_modules.visual import inject_visual_core
-from app_modules import dashboard as dashboard_module
+with startup_phase("import app_modules"):
+    from app_modules.core import genesis_filesystem_integrity_check
+    from app_modules.auth import AccessGate
+    from app_modules.visual import inject_visual_core
 
 # ==============================================================================
 # 04. INICIALIZAÇÃO DO SISTEMA
 # ==============================================================================
-genesis_filesystem_integrity_check()
-inject_visual_core()
+with startup_phase("genesis_filesystem_integrity_check"):
+    # pastas/arquivos iniciais uma vez por processo (migrações uma vez por versão); nos reruns é só um flag
+    genesis_filesystem_integrity_check()
+
+if "backup_scheduler" not in st.session_state:
+    with startup_phase("start_backup_scheduler"):
+        from app_modules.backup import start_backup_scheduler
+        st.session_state["backup_scheduler"] = start_backup_scheduler().name
+
+with startup_phase("inject_visual_core"):
+    inject_visual_core()
 
 # ==============================================================================
-# 05. BLINDAGEM DO BANCO DE USUÁRIOS (SEM NameError / KeyError)
+# 05. BANCO DE USUÁRIOS
 # ==============================================================================
-if "USERS" not in DB_FILES:
-    USERS_DB_PATH = os.path.join(SYSTEM_ROOT, "db", "users.json")
-    os.makedirs(os.path.dirname(USERS_DB_PATH), exist_ok=True)
-    DB_FILES["USERS"] = USERS_DB_PATH
-
-    if not os.path.exists(USERS_DB_PATH):
-        _write_json_atomic(USERS_DB_PATH, {})
-        logging.warning("DB de usuários criado automaticamente.")
+# Contas ficam só no USERS_DB do storage (AccessGate); o antigo db/users.json
+# é migrado pela checagem de gênese.
 
 # ==============================================================================
 # 06. IDENTIDADE ESPIRITUAL (NÚCLEO INVISÍVEL)
 # ==============================================================================
-class SpiritualIdentity:
-    PATH = os.path.join(SYSTEM_ROOT, "identity")
-
-    def __init__(self):
-        os.makedirs(self.PATH, exist_ok=True)
-
-    def load(self, user):
-        f = os.path.join(self.PATH, f"{user}.json")
-        if os.path.exists(f):
-            return json.load(open(f, "r", encoding="utf-8"))
-        data = {
-            "user": user,
-            "calling": "",
-            "tradition": "Reformada",
-            "created": datetime.utcnow().isoformat(),
-            "history": []
-        }
-        self.save(user, data)
-        return data
-
-    def save(self, user, data):
-        json.dump(
-            data,
-            open(os.path.join(self.PATH, f"{user}.json"), "w", encoding="utf-8"),
-            indent=2,
-            ensure_ascii=False
-        )
-
-IDENTITY_CORE = SpiritualIdentity()
+# Perfil em cache (um objeto por usuário, guardado também na sessão);
+# histórico em segmento próprio e gravações em lote.
+from app_modules.identity import get_identity_core
+
+IDENTITY_CORE = get_identity_core()
 
 # ==============================================================================
 # 07. CRIAÇÃO DE CONTA (FUNCIONAL)
 # ==============================================================================
 def create_account(username, password):
-    username = username.upper().strip()
-
-    if not username or not password:
-        return False, "Usuário e senha obrigatórios."
-
-    users = _read_json_safe(DB_FILES["USERS"], default={})
-
-    if username in users:
-        return False, "Usuário já existe."
-
-    users[username] = {
-        "password": hashlib.sha256(password.encode()).hexdigest(),
-        "created": datetime.utcnow().isoformat(),
-        "active": True,
-        "role": "PASTOR"
-    }
-
-    _write_json_atomic(DB_FILES["USERS"], users)
-    IDENTITY_CORE.load(username)
-
-    logging.info(f"Conta criada: {username}")
-    return True, "Conta criada com sucesso."
+    ok, msg = AccessGate.create_account(username, password)
+    if ok:
+        IDENTITY_CORE.load(username.upper().strip())
+    return ok, msg
 
 # ==============================================================================
 # 08. CONTROLE DE SESSÃO
@@ -173,9 +106,11 @@ if not st.session_state["session_valid"]:
         if st.button("ENTRAR"):
             if AccessGate.login_check(u, p):
                 st.session_state["session_valid"] = True
-                st.session_state["current_user"] = u.upper()
-                IDENTITY_CORE.load(u.upper())
+                st.session_state["current_user"] = u.upper().strip()
+                st.session_state["identity"] = IDENTITY_CORE.load(u.upper().strip())
                 st.rerun()
+            elif AccessGate.retry_after(u):
+                st.error(f"Muitas tentativas. Tente de novo em {AccessGate.retry_after(u)} segundos.")
             else:
                 st.error("Usuário ou senha inválidos.")
 
@@ -206,6 +141,7 @@ with st.sidebar:
         [
             "Dashboard & Cuidado",
             "Gabinete de Preparação",
+            "Membresia",
             "Rede Ministerial",
             "Biblioteca Digital",
             "Configurações"
@@ -216,20 +152,28 @@ with st.sidebar:
 # 11. ROTAS PRINCIPAIS
 # ==============================================================================
 if app_mode == "Dashboard & Cuidado":
+    from app_modules import dashboard as dashboard_module
     dashboard_module.render_dashboard()
 
 elif app_mode == "Gabinete de Preparação":
     st.title("📝 Gabinete Pastoral")
     st.info("Editor preservado. Núcleo espiritual ativo.")
 
+elif app_mode == "Membresia":
+    from app_modules import members_page
+    members_page.render_members()
+
 elif app_mode == "Rede Ministerial":
-    st.title("🤝 Rede Ministerial")
+    from app_modules import feed_page
+    feed_page.render_network()
 
 elif app_mode == "Biblioteca Digital":
     st.title("📚 Biblioteca Digital")
 
 elif app_mode == "Configurações":
     st.title("⚙️ Configurações")
+    with st.expander("⏱️ Relatório de inicialização"):
+        st.code(format_startup_report())
 
 # ==============================================================================
 # FIM DO SISTEMA
@@ -1,11 +1,14 @@
 import streamlit as st
-from duckduckgo_search import DDGS
-import google.generativeai as genai
 import os
-import requests
-from streamlit_lottie import st_lottie
 import time
 import json
+from app_modules.sermon_search import get_sermon_index
+from app_modules.library import get_library
+from app_modules.startup import lazy_import
+from app_modules.ai_gateway import get_ai_gateway
+from app_modules.web_search import get_search_service
+from app_modules.assets import get_asset_cache, LOTTIE_BOOK_URL
+from app_modules.spelling_page import render_spell_check
 
 # Clean, single-file app (login + editor + web + IA)
 st.set_page_config(page_title="O Pregador (clean)", layout="wide", page_icon="✝️")
@@ -42,28 +45,27 @@ if not verificar_login():
 USUARIO_ATUAL = st.session_state['usuario_atual']
 
 def load_lottieurl(url):
-    try:
-        r = requests.get(url, timeout=6)
-        return r.json()
-    except Exception:
-        return None
+    # cache local (memória/disco, revalidado em segundo plano); nunca espera a rede
+    return get_asset_cache().lottie(url)
 
-anim_book = load_lottieurl("https://lottie.host/5a666e37-d2c4-4a47-98d9-247544062a4d/lB6y7y6a1W.json")
+anim_book = load_lottieurl(LOTTIE_BOOK_URL)
 
-def consultar_gemini(prompt, chave):
-    if not chave:
-        return "⚠️ Coloque la clave API en Configuração."
+def consultar_gemini(prompt, chave, modo="analise"):
+    # gerador: a resposta chega em pedaços (st.write_stream); cache e fila em ai_gateway
+    gateway = get_ai_gateway()
+    if not chave and gateway.backend.name != "stub":
+        yield "⚠️ Coloque la clave API en Configuração."
+        return
     try:
-        genai.configure(api_key=chave)
-        model = genai.GenerativeModel('gemini-pro')
-        return model.generate_content(prompt).text
+        yield from gateway.stream(prompt, chave, mode=modo)
     except Exception as e:
-        return f"Erro: {e}"
+        yield f"Erro: {e}"
 
 def buscar_web(texto):
+    # cache em disco, consultas iguais coalescidas e limite de taxa em web_search
     try:
-        res = DDGS().text(texto, max_results=3)
-        return "\n\n".join([f"• {r.get('title','(sem título)')}: {r.get('body','')}" for r in res]) if res else "Nada."
+        res = get_search_service().search(texto, max_results=3)
+        return "\n\n".join([f"• {r.get('title') or '(sem título)'}: {r.get('body','')}" for r in res]) if res else "Nada."
     except Exception as e:
         return f"Erro na busca: {e}"
 
@@ -102,7 +104,8 @@ st.markdown("""
 with st.sidebar:
     # Logo / animación
     try:
-        if anim_book:
+        st_lottie = lazy_import("streamlit_lottie", "st_lottie")
+        if anim_book and st_lottie:
             st_lottie(anim_book, height=80)
     except Exception:
         pass
@@ -151,8 +154,21 @@ with st.sidebar:
 
     # Mis estudios (lista de archivos)
     st.markdown("##### Meus Estudos")
-    arquivos = [f for f in os.listdir(PASTA_USUARIO) if f.endswith('.txt')]
-    arquivos.sort()
+    busca_estudos = st.text_input("🔎 Buscar nos estudos", key="busca_estudos")
+    if busca_estudos:
+        indice = get_sermon_index(PASTA_USUARIO)
+        resultados = indice.search(busca_estudos, limit=10)
+        if not resultados:
+            st.caption("Nenhum estudo encontrado.")
+        for r in resultados:
+            # o radio só lista os arquivos da raiz; subpastas não têm como ser selecionadas
+            if "/" not in r["rel"] and st.button(f"📄 {r['title']}", key=f"busca_{r['rel']}"):
+                st.session_state["sidebar_arquivos"] = r["rel"]
+                st.rerun()
+            st.caption(indice.snippet(r["path"], busca_estudos))
+    arquivos = get_library(PASTA_USUARIO).names()
+    if st.session_state.get("sidebar_arquivos") not in ["+ Novo"] + arquivos:
+        st.session_state["sidebar_arquivos"] = "+ Novo"
     arquivo_atual = st.radio("Selecionar estudo", ["+ Novo"] + arquivos, key="sidebar_arquivos")
 
     st.divider()
@@ -179,19 +195,19 @@ with col_editor:
     conteudo_padrao = ""
     if arquivo_atual != "+ Novo":
         titulo_padrao = arquivo_atual.replace('.txt','')
-        try:
-            with open(os.path.join(PASTA_USUARIO, arquivo_atual), 'r', encoding='utf-8') as f:
-                conteudo_padrao = f.read()
-        except Exception:
-            conteudo_padrao = ""
+        conteudo_padrao = get_library(PASTA_USUARIO).read(os.path.join(PASTA_USUARIO, arquivo_atual))
     novo_titulo = st.text_input("Título", value=titulo_padrao)
     texto = st.text_area("Esboço", value=conteudo_padrao, height=600)
+    render_spell_check(texto)
     if st.button("💾 Salvar"):
         if not novo_titulo:
             st.warning("Digite um título antes de salvar.")
         else:
-            with open(os.path.join(PASTA_USUARIO, f"{novo_titulo}.txt"), 'w', encoding='utf-8') as f:
+            caminho = os.path.join(PASTA_USUARIO, f"{novo_titulo}.txt")
+            with open(caminho, 'w', encoding='utf-8') as f:
                 f.write(texto)
+            get_sermon_index(PASTA_USUARIO).update(caminho, texto)
+            get_library(PASTA_USUARIO).update(caminho, texto)
             st.success("Salvo!")
             st.experimental_rerun()
 
@@ -205,8 +221,7 @@ with col_tools:
         if st.button("Analisar Texto"):
             prompt = f"Analise: {texto}"
             chave = st.session_state.get("api_key", "")
-            resp = consultar_gemini(prompt, chave)
-            st.write(resp)
+            st.write_stream(consultar_gemini(prompt, chave))
 
 st.markdown("---")
 st.caption("Versão limpa: `app_clean.py` — execute com o venv e instale dependências antes.")
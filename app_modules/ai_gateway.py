@@ -0,0 +1,165 @@
+import os, time, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from .core import DIRECTORY_STRUCTURE
+from .result_cache import ResultCache, cache_key
+from .startup import lazy_import
+
+AI_MODEL = "gemini-pro"
+AI_TIMEOUT = 90              # segundos até desistir de uma resposta
+AI_WORKERS = 4               # gerações simultâneas no servidor
+AI_CACHE_PATH = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], "ia_respostas.db")
+AI_CACHE_TTL = 7 * 86400
+AI_CACHE_MAX_ENTRIES = 2000
+# PREGADOR_AI_BACKEND=stub responde localmente, sem rede nem chave (testes/offline)
+AI_BACKEND = os.environ.get("PREGADOR_AI_BACKEND", "gemini")
+
+class GeminiBackend:
+    """google.generativeai com um GenerativeModel reaproveitado por (chave, modelo)."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+        self._configured_key = None
+
+    def _model(self, api_key, model):
+        genai = lazy_import("google.generativeai")
+        if genai is None:
+            raise RuntimeError("Biblioteca `google.generativeai` não está instalada.")
+        with self._lock:
+            # configure() é global na biblioteca: só refaz quando a chave muda
+            if api_key != self._configured_key:
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+                self._models.clear()
+            if model not in self._models:
+                self._models[model] = genai.GenerativeModel(model)
+            return self._models[model]
+
+    def stream(self, prompt, api_key, model):
+        for chunk in self._model(api_key, model).generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+class StubBackend:
+    """Backend local: devolve um texto determinístico em pedaços."""
+
+    name = "stub"
+
+    def __init__(self, reply=None, delay=0.0):
+        self.reply = reply or (lambda prompt, model: f"[{model}] {prompt[:400]}")
+        self.delay = delay
+        self.calls = 0
+
+    def stream(self, prompt, api_key, model):
+        self.calls += 1
+        for word in self.reply(prompt, model).split(" "):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + " "
+
+class _Flight:
+    # uma geração em andamento; todos que pedirem o mesmo prompt leem daqui
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def feed(self, text=None, error=None, done=False):
+        with self.cond:
+            if text:
+                self.chunks.append(text)
+            self.error = error or self.error
+            self.done = done or self.done
+            self.cond.notify_all()
+
+    def follow(self, timeout):
+        deadline = time.monotonic() + timeout
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.chunks) and not self.done:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("A IA não respondeu a tempo.")
+                    self.cond.wait(remaining)
+                new, i = self.chunks[i:], len(self.chunks)
+                finished, error = self.done, self.error
+            yield from new
+            if finished and i >= len(self.chunks):
+                if error:
+                    raise error
+                return
+
+class AIGateway:
+    """Ponto único para as consultas de IA dos apps.
+
+    - respostas em cache no disco por (modo, hash do prompt, modelo);
+    - pedidos idênticos em andamento são servidos pela mesma geração;
+    - a geração roda num pool de threads e chega em pedaços (stream());
+    - o backend é plugável (GeminiBackend ou StubBackend).
+    """
+
+    def __init__(self, backend=None, cache=None, workers=AI_WORKERS, timeout=AI_TIMEOUT):
+        self.backend = backend or (StubBackend() if AI_BACKEND == "stub" else GeminiBackend())
+        self.cache = cache if cache is not None else ResultCache(AI_CACHE_PATH, AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES)
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ia")
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _key(self, prompt, mode, model):
+        return cache_key(self.backend.name, mode, model, cache_key(prompt))
+
+    def stream(self, prompt, api_key=None, mode="", model=AI_MODEL):
+        """Gera a resposta em pedaços (para st.write_stream); levanta TimeoutError/RuntimeError."""
+        key = self._key(prompt, mode, model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = _Flight()
+                self._pool.submit(self._run, key, flight, prompt, api_key, model)
+        yield from flight.follow(self.timeout)
+
+    def ask(self, prompt, api_key=None, mode="", model=AI_MODEL):
+        return "".join(self.stream(prompt, api_key, mode, model))
+
+    def _finish(self, key, flight, error=None):
+        # sai do _inflight antes de encerrar: quem chegar depois não entra num voo já terminado
+        with self._lock:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.feed(error=error, done=True)
+
+    def _run(self, key, flight, prompt, api_key, model):
+        try:
+            for text in self.backend.stream(prompt, api_key, model):
+                flight.feed(text)
+            self.cache.put(key, "".join(flight.chunks))
+        except Exception as e:
+            logging.error(f"IA: falha na geração ({self.backend.name}/{model}): {e}")
+            self._finish(key, flight, e if isinstance(e, (RuntimeError, TimeoutError)) else RuntimeError(str(e)))
+        else:
+            self._finish(key, flight)
+
+_GATEWAY = None
+_GATEWAY_LOCK = threading.Lock()
+
+def get_ai_gateway():
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = AIGateway()
+        return _GATEWAY
+
+def set_ai_gateway(gateway):
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        _GATEWAY = gateway
@@ -0,0 +1,138 @@
+import threading, logging
+from collections import OrderedDict
+from .core import get_storage
+from .startup import lazy_import
+
+# Escala fixa do check-in (dashboard): código 1..5; 0 = humor desconhecido.
+MOOD_SCALE = ("Esgotamento", "Cansaço", "Neutro", "Bem", "Pleno")
+ROLLING_DAYS = 7
+BURNOUT_MAX_CODE = 2        # Esgotamento ou Cansaço
+BURNOUT_ALERT_STREAK = 3    # dias seguidos de check-in nessa faixa
+WEEKDAYS = ("Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom")
+REPORT_CACHE_SIZE = 32
+
+def encode_history(records, user=None):
+    """Colunas compactas do histórico: user (category), day (datetime64), mood (int8).
+
+    Com `user`, todos os registros (inclusive os antigos sem usuário) contam para ele.
+    """
+    pd = lazy_import("pandas")
+    np = lazy_import("numpy")
+    if pd is None or np is None:
+        return None
+    users, dates, moods = [], [], []
+    for r in records:
+        if not isinstance(r, dict):
+            continue
+        users.append(user if user is not None else (r.get("user") or r.get("autor") or ""))
+        dates.append(str(r.get("data") or r.get("created") or "")[:10])
+        moods.append(r.get("humor", r.get("estado")))
+    frame = pd.DataFrame({
+        "user": pd.Categorical(users),
+        "day": pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce"),
+        "mood": (pd.Categorical(moods, categories=MOOD_SCALE).codes + 1).astype(np.int8),
+    })
+    return frame[frame["day"].notna() & (frame["mood"] > 0)]
+
+def _daily(frame):
+    # média do dia por usuário, ordenada por (usuário, dia)
+    daily = frame.groupby(["user", "day"], observed=True, sort=True)["mood"].agg(["sum", "count"]).reset_index()
+    daily["mean"] = daily["sum"] / daily["count"]
+    return daily
+
+def _rolling(daily, np):
+    # janela móvel de ROLLING_DAYS dias por usuário, sem groupby().rolling():
+    # chave (usuário, dia) ordenada + somas acumuladas + searchsorted
+    day_num = daily["day"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    key = daily["user"].cat.codes.to_numpy().astype(np.int64) * 10_000_000 + day_num
+    sums = np.concatenate(([0], np.cumsum(daily["sum"].to_numpy(dtype=np.float64))))
+    counts = np.concatenate(([0], np.cumsum(daily["count"].to_numpy(dtype=np.int64))))
+    left = np.searchsorted(key, key - (ROLLING_DAYS - 1), side="left")
+    right = np.arange(1, len(key) + 1)
+    return (sums[right] - sums[left]) / (counts[right] - counts[left])
+
+def _streaks(daily, np):
+    # sequências de check-ins seguidos na faixa de esgotamento, por usuário
+    low = daily["mean"].to_numpy() <= BURNOUT_MAX_CODE
+    codes = daily["user"].cat.codes.to_numpy()
+    boundary = np.ones(len(low), dtype=bool)
+    boundary[1:] = (low[1:] != low[:-1]) | (codes[1:] != codes[:-1])
+    run_id = np.cumsum(boundary)
+    run_start = np.flatnonzero(boundary)
+    position = np.arange(len(low)) - run_start[run_id - 1] + 1
+    return np.where(low, position, 0)
+
+def compute_mood_report(frame):
+    np = lazy_import("numpy")
+    if frame is None or np is None:
+        return None
+    if frame.empty:
+        return {"entries": 0}
+    daily = _daily(frame)
+    daily["rolling"] = _rolling(daily, np)
+    daily["streak"] = _streaks(daily, np)
+    last = daily.groupby("user", observed=True).tail(1).set_index("user")
+    per_user = daily.groupby("user", observed=True).agg(
+        entries=("count", "sum"), days=("day", "size"), mean=("mean", "mean"), longest_streak=("streak", "max"))
+    per_user["current_streak"] = last["streak"]
+    per_user["last_day"] = last["day"]
+    per_user["alert"] = per_user["current_streak"] >= BURNOUT_ALERT_STREAK
+
+    weekday = frame.groupby(frame["day"].dt.weekday)["mood"].agg(["mean", "size"]).reindex(range(7))
+    weekday.index = list(WEEKDAYS)
+    distribution = np.bincount(frame["mood"].to_numpy(), minlength=len(MOOD_SCALE) + 1)[1:]
+    trend = daily.groupby("day")[["mean", "rolling"]].mean()
+    return {
+        "entries": int(len(frame)),
+        "trend": trend,
+        "weekday": weekday.rename(columns={"mean": "média", "size": "registros"}),
+        "distribution": dict(zip(MOOD_SCALE, distribution.tolist())),
+        "users": per_user,
+        "alerts": per_user.index[per_user["alert"]].tolist(),
+    }
+
+class _ReportCache:
+    """Relatórios já calculados, por (backend, usuário, versão do histórico)."""
+
+    def __init__(self, max_entries=REPORT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+_REPORTS = _ReportCache()
+
+def get_mood_report(user=None):
+    """Tendência, dias da semana, sequências de esgotamento e distribuição de humor.
+
+    user=None cobre todos os pastores da instância. Devolve None sem
+    numpy/pandas e {"error": mensagem} se o cálculo falhar (erro não fica em cache).
+    """
+    if lazy_import("pandas") is None or lazy_import("numpy") is None:
+        return None
+    storage = get_storage()
+    version = storage.history_version("SOUL_METRICS", user)
+
+    def compute():
+        if user is None:
+            records = storage.read_records("SOUL_METRICS")
+        else:
+            records = storage.window("SOUL_METRICS", user, "0000", "9999")
+        return compute_mood_report(encode_history(records, user))
+
+    try:
+        return _REPORTS.get_or_compute((storage.name, user, version), compute)
+    except Exception as e:
+        logging.error(f"Análise de humor falhou: {e}")
+        return {"error": str(e)}
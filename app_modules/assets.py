@@ -0,0 +1,154 @@
+import os, re, json, time, base64, hashlib, logging, threading
+from .core import DIRECTORY_STRUCTURE, _read_json_safe, _write_json_atomic, _write_text_atomic
+from .startup import lazy_import
+
+ASSET_DIR = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], "assets")
+BUNDLED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ASSET_MAX_AGE = 7 * 86400     # depois disso revalida (ETag/Last-Modified) em segundo plano
+ASSET_RETRY = 600             # espera entre tentativas quando a rede falha
+ASSET_TIMEOUT = 6
+FONT_SUBSETS = ("latin",)     # português cabe no subconjunto latin; evita embutir cirílico etc.
+# o Google Fonts só entrega woff2 para navegadores que ele reconhece
+FONT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+LOTTIE_BOOK_URL = "https://lottie.host/5a666e37-d2c4-4a47-98d9-247544062a4d/lB6y7y6a1W.json"
+GOOGLE_FONTS_URL = "https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700&family=Inter:wght@300;400;600&display=swap"
+
+_FONT_BLOCK = re.compile(r"/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{[^}]*\})")
+_CSS_URL = re.compile(r"url\((['\"]?)(https?://[^)'\"]+)\1\)")
+
+class AssetCache:
+    """Arquivos remotos (animação Lottie, CSS de fontes) baixados uma vez.
+
+    O conteúdo fica em disco com os metadados de validação (ETag,
+    Last-Modified, validade) e depois em memória. A rede só é usada por
+    uma thread em segundo plano: get() nunca espera download; sem cópia
+    local devolve o fallback empacotado até o download terminar.
+    """
+
+    def __init__(self, root=ASSET_DIR, max_age=ASSET_MAX_AGE):
+        self.root = root
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._mem = {}
+        self._next_try = {}
+        self._refreshing = set()
+
+    def _paths(self, url, kind):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        ext = "css" if kind == "font_css" else "json"
+        return os.path.join(self.root, f"{name}.{ext}"), os.path.join(self.root, f"{name}.meta.json")
+
+    def _load_disk(self, url, kind):
+        content_path, meta_path = self._paths(url, kind)
+        meta = _read_json_safe(meta_path, default=None, use_cache=False)
+        if not meta:
+            return None
+        try:
+            with open(content_path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            value = json.loads(raw) if kind == "json" else raw
+        except (OSError, ValueError) as e:
+            logging.warning(f"Asset corrompido {content_path}: {e}")
+            return None
+        return {"value": value, "meta": meta}
+
+    def get(self, url, kind="json", fallback=None):
+        with self._lock:
+            entry = self._mem.get(url)
+        if entry is None:
+            entry = self._load_disk(url, kind)
+            if entry is not None:
+                with self._lock:
+                    self._mem[url] = entry
+        if entry is None or entry["meta"].get("expires", 0) <= time.time():
+            self._refresh_async(url, kind, entry)
+        return entry["value"] if entry is not None else fallback
+
+    def _refresh_async(self, url, kind, entry):
+        now = time.time()
+        with self._lock:
+            if url in self._refreshing or self._next_try.get(url, 0) > now:
+                return
+            self._refreshing.add(url)
+            self._next_try[url] = now + ASSET_RETRY
+        threading.Thread(target=self._refresh, args=(url, kind, entry), daemon=True, name="asset-refresh").start()
+
+    def _refresh(self, url, kind, entry):
+        try:
+            requests = lazy_import("requests")
+            if requests is None:
+                return
+            meta = dict(entry["meta"]) if entry else {"url": url}
+            headers = {"User-Agent": FONT_USER_AGENT} if kind == "font_css" else {}
+            if entry and meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if entry and meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+            r = requests.get(url, headers=headers, timeout=ASSET_TIMEOUT)
+            content_path, meta_path = self._paths(url, kind)
+            if r.status_code == 304 and entry:
+                value = entry["value"]
+            else:
+                r.raise_for_status()
+                if kind == "json":
+                    value = r.json()
+                    raw = json.dumps(value, ensure_ascii=False)
+                else:
+                    value = raw = self._embed_fonts(requests, r.text)
+                if not _write_text_atomic(content_path, raw):
+                    return
+                meta.update(etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+            meta.update(fetched=time.time(), expires=time.time() + self.max_age)
+            _write_json_atomic(meta_path, meta, indent=None)
+            with self._lock:
+                self._mem[url] = {"value": value, "meta": meta}
+                self._next_try.pop(url, None)
+            logging.info(f"Asset atualizado: {url}")
+        except Exception as e:
+            logging.warning(f"Asset indisponível ({url}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    @staticmethod
+    def _embed_fonts(requests, css):
+        # troca as URLs dos arquivos de fonte por data URIs: o navegador não
+        # precisa acessar o Google e o servidor não serve arquivos estáticos
+        blocks = [block for subset, block in _FONT_BLOCK.findall(css) if subset in FONT_SUBSETS]
+        out = []
+        for block in blocks:
+            def inline(m):
+                font = requests.get(m.group(2), headers={"User-Agent": FONT_USER_AGENT}, timeout=ASSET_TIMEOUT)
+                font.raise_for_status()
+                mime = "font/woff2" if m.group(2).endswith(".woff2") else "font/ttf"
+                return f"url(data:{mime};base64,{base64.b64encode(font.content).decode('ascii')})"
+            out.append(_CSS_URL.sub(inline, block))
+        if not out:
+            raise ValueError("CSS de fontes sem blocos utilizáveis")
+        return "\n".join(out)
+
+    # ---------- atalhos ----------
+    def lottie(self, url=LOTTIE_BOOK_URL, bundled="lottie_book.json"):
+        return self.get(url, "json", fallback=_bundled_json(bundled))
+
+    def font_css(self, url=GOOGLE_FONTS_URL):
+        """@font-face embutidos; vazio até o primeiro download (ficam as fontes do sistema)."""
+        return self.get(url, "font_css", fallback="")
+
+_BUNDLED = {}
+
+def _bundled_json(name):
+    if name not in _BUNDLED:
+        _BUNDLED[name] = _read_json_safe(os.path.join(BUNDLED_DIR, name), default=None)
+    return _BUNDLED[name]
+
+_ASSETS = None
+_ASSETS_LOCK = threading.Lock()
+
+def get_asset_cache():
+    global _ASSETS
+    with _ASSETS_LOCK:
+        if _ASSETS is None:
+            _ASSETS = AssetCache()
+        return _ASSETS
@@ -1,25 +1,248 @@
-from .core import _read_json_safe, _write_json_atomic, DB_FILES
-import hashlib, logging
+from .core import get_storage, SYSTEM_ROOT, _read_json_safe
+import os, hmac, time, base64, hashlib, logging, threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Hash de senha: scrypt (ou PBKDF2 se o OpenSSL não tiver scrypt), com sal.
+# Mudar os parâmetros faz as senhas antigas serem refeitas no próximo login.
+AUTH_SCHEME = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+PBKDF2_ITERATIONS = 600_000
+AUTH_HASH_WORKERS = 4       # hashes simultâneos (limita CPU/memória no pico de logins)
+AUTH_MAX_FAILURES = 5       # falhas dentro da janela antes do bloqueio
+AUTH_FAILURE_WINDOW = 300   # segundos
+AUTH_LOCKOUT_SECONDS = 300
+LEGACY_USERS_PATH = os.path.join(SYSTEM_ROOT, "db", "users.json")
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+def hash_password(password, scheme=None):
+    scheme = scheme or AUTH_SCHEME
+    salt = os.urandom(16)
+    if scheme == "scrypt":
+        dk = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                            maxmem=256 * SCRYPT_N * SCRYPT_R, dklen=32)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(dk)}"
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(dk)}"
+
+def verify_password(password, stored):
+    """Devolve (confere, precisa_refazer). Aceita o sha256 puro antigo."""
+    stored = str(stored or "")
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            dk = hashlib.scrypt(password.encode(), salt=base64.b64decode(parts[4]), n=n, r=r, p=p,
+                                maxmem=256 * n * r, dklen=32)
+            ok = hmac.compare_digest(_b64(dk), parts[5])
+            return ok, AUTH_SCHEME != "scrypt" or (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            iterations = int(parts[1])
+            dk = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(parts[2]), iterations)
+            ok = hmac.compare_digest(_b64(dk), parts[3])
+            return ok, AUTH_SCHEME != "pbkdf2_sha256" or iterations != PBKDF2_ITERATIONS
+    except (ValueError, TypeError) as e:
+        logging.error(f"Hash de senha inválido: {e}")
+        return False, False
+    if len(stored) == 64:
+        # legado: sha256 sem sal
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest().encode(), stored.lower().encode()), True
+    return False, False
+
+def new_user_record(password, role="PASTOR"):
+    return {
+        "password": hash_password(password),
+        "created": datetime.utcnow().isoformat(),
+        "active": True,
+        "role": role,
+    }
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _hash_pool():
+    # o script do Streamlit só espera o resultado; o hash roda fora dele e no
+    # máximo AUTH_HASH_WORKERS por vez, em vez de um por sessão simultânea
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="auth-hash")
+        return _POOL
+
+class _UserIndex:
+    """Registros de USERS_DB já consultados (LRU), descartados quando o documento muda."""
+
+    MAX_ENTRIES = 1024   # nomes inexistentes também entram; o limite impede crescer sem fim
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = OrderedDict()
+        self._count = None
+
+    def _sync(self, storage):
+        version = (storage.name, storage.doc_version("USERS_DB"))
+        if version != self._version:
+            self._entries.clear()
+            self._count = None
+            self._version = version
+        return version
+
+    def get(self, username):
+        storage = get_storage()
+        with self._lock:
+            version = self._sync(storage)
+            if username in self._entries:
+                self._entries.move_to_end(username)
+                return self._entries[username]
+        record = storage.get_doc_item("USERS_DB", username)
+        with self._lock:
+            if self._version == version:
+                self._entries[username] = record
+                while len(self._entries) > self.MAX_ENTRIES:
+                    self._entries.popitem(last=False)
+        return record
+
+    def count(self):
+        storage = get_storage()
+        with self._lock:
+            version = self._sync(storage)
+            if self._count is not None:
+                return self._count
+        count = storage.count_doc_items("USERS_DB")
+        with self._lock:
+            if self._version == version:
+                self._count = count
+        return count
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+class _LoginThrottle:
+    """Bloqueio por usuário após AUTH_MAX_FAILURES falhas em AUTH_FAILURE_WINDOW segundos."""
+
+    MAX_TRACKED = 10_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._locked_until = {}
+
+    def retry_after(self, username):
+        with self._lock:
+            remaining = self._locked_until.get(username, 0) - time.monotonic()
+            if remaining <= 0:
+                self._locked_until.pop(username, None)
+                return 0
+            return int(remaining) + 1
+
+    def failure(self, username):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._failures) >= self.MAX_TRACKED:
+                self._purge(now)
+            recent = self._failures.setdefault(username, deque(maxlen=AUTH_MAX_FAILURES))
+            recent.append(now)
+            if len(recent) == AUTH_MAX_FAILURES and now - recent[0] <= AUTH_FAILURE_WINDOW:
+                self._locked_until[username] = now + AUTH_LOCKOUT_SECONDS
+                recent.clear()
+                logging.warning(f"Login bloqueado por {AUTH_LOCKOUT_SECONDS}s: {username}")
+
+    def success(self, username):
+        with self._lock:
+            self._failures.pop(username, None)
+
+    def _purge(self, now):
+        for name in [n for n, d in self._failures.items() if not d or now - d[-1] > AUTH_FAILURE_WINDOW]:
+            del self._failures[name]
+
+_USERS = _UserIndex()
+_THROTTLE = _LoginThrottle()
+_DUMMY = {}
+
+def _dummy_hash():
+    # usuário inexistente gasta o mesmo tempo de hash (não revela quem existe)
+    if "hash" not in _DUMMY:
+        _DUMMY["hash"] = hash_password(os.urandom(8).hex())
+    return _DUMMY["hash"]
+
+def _stored_hash(record):
+    return record.get("password") if isinstance(record, dict) else record
 
 class AccessGate:
     @staticmethod
     def login_check(username, password):
-        db = _read_json_safe(DB_FILES["USERS_DB"])
-        if username == "ADMIN" and password == "1234" and len(db) <= 1:
+        username = (username or "").upper().strip()
+        if not username or not password:
+            return False
+        if _THROTTLE.retry_after(username):
+            return False
+        if username == "ADMIN" and hmac.compare_digest(str(password).encode(), b"1234") and _USERS.count() <= 1:
+            logging.warning("Login de instalação (ADMIN/1234): cadastre usuários e troque a senha.")
             return True
-        user_hash = db.get(username.upper())
-        if not user_hash:
+        record = _USERS.get(username)
+        if isinstance(record, dict) and record.get("active") is False:
+            record = None
+        stored = _stored_hash(record) if record else None
+        ok, rehash = _hash_pool().submit(verify_password, password, stored or _dummy_hash()).result()
+        if not (ok and stored):
+            _THROTTLE.failure(username)
             logging.warning(f"Login fail: {username}")
             return False
-        pass_hash = hashlib.sha256(password.encode()).hexdigest()
-        return pass_hash == user_hash
+        _THROTTLE.success(username)
+        if rehash:
+            AccessGate._rehash(username, record, password)
+        return True
+
+    @staticmethod
+    def _rehash(username, record, password):
+        new_hash = _hash_pool().submit(hash_password, password).result()
+        if isinstance(record, dict):
+            updated = dict(record, password=new_hash)
+        else:
+            updated = {"password": new_hash, "created": None, "active": True, "role": "PASTOR"}
+        if get_storage().set_doc_item("USERS_DB", username, updated):
+            _USERS.invalidate()
+            logging.info(f"Senha de {username} migrada para {AUTH_SCHEME}.")
 
     @staticmethod
-    def create_account(username, password):
-        db = _read_json_safe(DB_FILES["USERS_DB"])
-        if username.upper() in db:
+    def retry_after(username):
+        """Segundos até o usuário poder tentar de novo (0 = liberado)."""
+        return _THROTTLE.retry_after((username or "").upper().strip())
+
+    @staticmethod
+    def create_account(username, password, role="PASTOR"):
+        username = (username or "").upper().strip()
+        if not username or not password:
+            return False, "Usuário e senha obrigatórios."
+        if _USERS.get(username) is not None:
             return False, "Usuário Duplicado."
-        db[username.upper()] = hashlib.sha256(password.encode()).hexdigest()
-        if _write_json_atomic(DB_FILES["USERS_DB"], db):
+        record = _hash_pool().submit(new_user_record, password, role).result()
+        inserted = get_storage().insert_doc_item("USERS_DB", username, record)
+        _USERS.invalidate()
+        if inserted:
+            logging.info(f"Conta criada: {username}")
             return True, "Conta criada."
-        return False, "Erro ao gravar."
\ No newline at end of file
+        if inserted is False:
+            return False, "Usuário Duplicado."
+        return False, "Erro ao gravar."
+
+def migrate_legacy_users():
+    """Leva as contas do db/users.json (app.py antigo) para o USERS_DB; hashes são refeitos no login."""
+    if not os.path.exists(LEGACY_USERS_PATH):
+        return 0
+    legacy = _read_json_safe(LEGACY_USERS_PATH, use_cache=False)
+    storage = get_storage()
+    moved = 0
+    for username, record in (legacy or {}).items():
+        if isinstance(record, dict) and record.get("password"):
+            if storage.insert_doc_item("USERS_DB", username.upper(), dict(record)):
+                moved += 1
+    os.replace(LEGACY_USERS_PATH, f"{LEGACY_USERS_PATH}.migrated")
+    _USERS.invalidate()
+    logging.info(f"Usuários: {moved} contas de {LEGACY_USERS_PATH} migradas.")
+    return moved
@@ -0,0 +1,248 @@
+import os, json, difflib, hashlib, threading, logging
+from datetime import datetime
+from .core import DIRECTORY_STRUCTURE, _write_text_atomic, _stat_signature, _path_cache_name
+from .utils import TextUtils
+
+AUTOSAVE_DEBOUNCE = 3.0       # segundos sem edição antes de gravar
+AUTOSAVE_RETRY_MAX = 60.0     # gravação que falhou é tentada de novo, dobrando a espera até aqui
+REVISION_FULL_EVERY = 20      # a cada N revisões grava o texto inteiro
+HISTORY_DIR = os.path.join(DIRECTORY_STRUCTURE["SERMONS"], "historico")
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _diff_ops(old, new):
+    # operações (i1, i2, linhas novas) sobre a lista de linhas antiga
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag != "equal":
+            ops.append([i1, i2, "".join(b[j1:j2])])
+    return ops
+
+def _apply_ops(text, ops):
+    lines = text.splitlines(keepends=True)
+    for i1, i2, repl in reversed(ops):
+        lines[i1:i2] = repl.splitlines(keepends=True)
+    return "".join(lines)
+
+class RevisionHistory:
+    """Histórico de um sermão: JSONL com texto cheio a cada REVISION_FULL_EVERY
+    revisões e, entre elas, só o diff por linhas em relação à anterior."""
+
+    def __init__(self, sermon_path, history_dir=HISTORY_DIR):
+        # caminho relativo (como os apps usam): o histórico acompanha a pasta de dados se ela mudar de lugar
+        self.path = os.path.join(history_dir, f"{_path_cache_name(sermon_path, absolute=False)}.jsonl")
+        legacy = os.path.join(history_dir, f"{TextUtils.sanitize_filename(os.path.normpath(sermon_path).replace(os.sep, '__'))}.jsonl")
+        if not os.path.exists(self.path) and os.path.exists(legacy):
+            try:
+                os.replace(legacy, self.path)
+            except OSError as e:
+                logging.error(f"Histórico: não foi possível renomear {legacy}: {e}")
+        self._last_text = None
+        self._since_full = None
+        # índice das linhas (t, h, offset, tamanho, cheia?); os textos ficam no disco
+        self._index = []
+        self._indexed = 0
+
+    def _refresh_index(self):
+        # só lê os bytes acrescentados desde a última vez
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._indexed:
+            self._index, self._indexed = [], 0
+        if size == self._indexed:
+            return self._index
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed)
+            chunk = f.read(size - self._indexed)
+        offset = self._indexed
+        for line in chunk[:chunk.rfind(b"\n") + 1].splitlines(keepends=True):
+            if line.strip():
+                try:
+                    e = json.loads(line)
+                    self._index.append((e["t"], e["h"], offset, len(line), "full" in e))
+                except (ValueError, KeyError):
+                    logging.error(f"Histórico: linha inválida em {self.path}")
+            offset += len(line)
+        self._indexed = offset
+        return self._index
+
+    def revisions(self):
+        return [{"n": n, "t": t, "h": h, "full": full} for n, (t, h, _, _, full) in enumerate(self._refresh_index())]
+
+    def text_at(self, n):
+        index = self._refresh_index()
+        if not 0 <= n < len(index):
+            return None
+        start = n
+        while start >= 0 and not index[start][4]:
+            start -= 1
+        if start < 0:
+            return None
+        # um único read do texto cheio até a revisão pedida
+        first, last = index[start][2], index[n][2] + index[n][3]
+        with open(self.path, "rb") as f:
+            f.seek(first)
+            lines = f.read(last - first).splitlines()
+        entries = [json.loads(line) for line in lines if line.strip()]
+        text = entries[0]["full"]
+        for e in entries[1:]:
+            text = _apply_ops(text, e["ops"])
+        return text
+
+    def _load_tail(self):
+        index = self._refresh_index()
+        if not index:
+            self._last_text, self._since_full = None, 0
+            return
+        self._last_text = self.text_at(len(index) - 1)
+        last_full = max(i for i, entry in enumerate(index) if entry[4])
+        self._since_full = len(index) - 1 - last_full
+
+    def append(self, text):
+        if self._since_full is None:
+            self._load_tail()
+        entry = {"t": datetime.now().isoformat(timespec="seconds"), "h": _hash(text)}
+        if self._last_text is None or self._since_full + 1 >= REVISION_FULL_EVERY:
+            entry["full"] = text
+            self._since_full = 0
+        else:
+            entry["ops"] = _diff_ops(self._last_text, text)
+            self._since_full += 1
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._last_text = text
+
+class AutoSaver:
+    """Gravação automática com debounce: cada edição reinicia o timer e só a
+    última versão é escrita (atômica), e só se o hash mudou."""
+
+    def __init__(self, debounce=AUTOSAVE_DEBOUNCE, on_save=None):
+        self.debounce = debounce
+        self.on_save = on_save
+        self.writes = 0
+        self._lock = threading.RLock()
+        self._saved_hash = {}
+        self._pending = {}
+        self._timers = {}
+        self._failures = {}
+        self._histories = {}
+
+    def _disk_hash(self, path):
+        # o hash vale enquanto a assinatura do arquivo não muda (edição por fora é percebida)
+        sig = _stat_signature(path)
+        cached = self._saved_hash.get(path)
+        if cached is None or cached[0] != sig:
+            digest = None
+            if sig is not None:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        digest = _hash(f.read())
+                except OSError:
+                    pass
+            cached = self._saved_hash[path] = (sig, digest)
+        return cached[1]
+
+    def history(self, path):
+        with self._lock:
+            hist = self._histories.get(path)
+            if hist is None:
+                hist = self._histories[path] = RevisionHistory(path)
+            return hist
+
+    def read(self, path, reader=None):
+        """Texto atual do sermão: a versão pendente, se houver, senão o disco (ou reader)."""
+        with self._lock:
+            if path in self._pending:
+                return self._pending[path]
+        if reader is not None:
+            return reader(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def submit(self, path, text):
+        with self._lock:
+            disk = self._disk_hash(path)
+            if _hash(text) == disk or (disk is None and not text):
+                self._pending.pop(path, None)
+                self._cancel(path)
+                return "unchanged"
+            self._pending[path] = text
+            self._schedule(path, self.debounce)
+            return "pending"
+
+    def save_now(self, path, text):
+        with self._lock:
+            self._pending[path] = text
+            self._cancel(path)
+        return self.flush(path)
+
+    def _schedule(self, path, delay):
+        self._cancel(path)
+        timer = threading.Timer(delay, self.flush, args=(path,))
+        timer.daemon = True
+        self._timers[path] = timer
+        timer.start()
+
+    def _cancel(self, path):
+        timer = self._timers.pop(path, None)
+        if timer is not None:
+            timer.cancel()
+
+    def flush(self, path):
+        with self._lock:
+            text = self._pending.pop(path, None)
+            self._timers.pop(path, None)
+            if text is None:
+                return True
+            digest = _hash(text)
+            if digest == self._disk_hash(path):
+                return True
+            if not _write_text_atomic(path, text):
+                self._pending.setdefault(path, text)
+                # sem novo timer a edição ficaria só na memória até a próxima digitação
+                failures = self._failures[path] = self._failures.get(path, 0) + 1
+                if path not in self._timers:
+                    self._schedule(path, min(AUTOSAVE_RETRY_MAX, self.debounce * 2 ** failures))
+                return False
+            self._failures.pop(path, None)
+            self._saved_hash[path] = (_stat_signature(path), digest)
+            self.writes += 1
+            try:
+                self.history(path).append(text)
+            except Exception as e:
+                logging.error(f"Erro no histórico de {path}: {e}")
+        if self.on_save is not None:
+            try:
+                self.on_save(path, text)
+            except Exception as e:
+                logging.error(f"Erro pós-gravação de {path}: {e}")
+        return True
+
+    def flush_all(self):
+        with self._lock:
+            paths = list(self._pending)
+        return all(self.flush(p) for p in paths)
+
+    def forget(self, path):
+        # arquivo alterado por fora (renomeado/apagado): recalcula o hash na próxima vez
+        with self._lock:
+            self._saved_hash.pop(path, None)
+
+_SAVERS = {}
+_SAVERS_LOCK = threading.Lock()
+
+def get_autosaver(name="default", on_save=None):
+    # uma instância por processo: os timers sobrevivem aos reruns do Streamlit
+    with _SAVERS_LOCK:
+        saver = _SAVERS.get(name)
+        if saver is None:
+            saver = _SAVERS[name] = AutoSaver(on_save=on_save)
+        return saver
@@ -0,0 +1,294 @@
+import os, sys, time, zlib, uuid, hashlib, sqlite3, tempfile, threading, logging
+from datetime import datetime, timedelta
+from .core import DIRECTORY_STRUCTURE, SYSTEM_ROOT, get_storage, _write_json_atomic, _read_json_safe
+
+VAULT = DIRECTORY_STRUCTURE["BACKUP_VAULT"]
+CHUNK_SIZE = 256 * 1024
+BACKUP_INTERVALS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+BACKUP_KEEP_LAST = 7
+BACKUP_KEEP_DAILY = 30
+_SKIP_SUFFIXES = (".lock", "-wal", "-shm", "-journal")
+
+class BackupVault:
+    """Cofre de snapshots deduplicados por conteúdo.
+
+    Arquivos são cortados em blocos de CHUNK_SIZE; cada bloco é gravado uma
+    vez (zlib) em objects/<sha256>. Um snapshot é só um manifesto JSON com a
+    lista de blocos de cada arquivo. Arquivos com tamanho e mtime iguais aos
+    do snapshot anterior nem são lidos. Como logs e journals só crescem, os
+    blocos iniciais deles se repetem e não ocupam espaço de novo.
+    """
+
+    def __init__(self, source=SYSTEM_ROOT, vault=VAULT):
+        self.source = source
+        self.vault = vault
+        self.objects_dir = os.path.join(vault, "objects")
+        self.snapshots_dir = os.path.join(vault, "snapshots")
+        self._lock = threading.Lock()
+
+    # ---------- objetos ----------
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put_chunk(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = zlib.compress(data, 6)
+        # nome único: o agendador e a CLI (ou duas sessões) podem gravar o mesmo bloco ao mesmo tempo
+        temp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(blob)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return digest, len(blob)
+
+    def _get_chunk(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise IOError(f"Bloco corrompido no cofre: {digest}")
+        return data
+
+    # ---------- manifestos ----------
+    def list_snapshots(self):
+        try:
+            names = sorted(n[:-5] for n in os.listdir(self.snapshots_dir) if n.endswith(".json"))
+        except OSError:
+            return []
+        return names
+
+    def load_manifest(self, snapshot_id):
+        return _read_json_safe(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), use_cache=False)
+
+    def last_snapshot_time(self):
+        snaps = self.list_snapshots()
+        if not snaps:
+            return None
+        return datetime.strptime(snaps[-1][:15], "%Y%m%dT%H%M%S")
+
+    def _iter_files(self):
+        vault = os.path.abspath(self.vault)
+        for dirpath, dirnames, files in os.walk(self.source):
+            if os.path.abspath(dirpath).startswith(vault):
+                dirnames[:] = []
+                continue
+            for name in files:
+                if name.endswith(_SKIP_SUFFIXES) or ".tmp." in name:
+                    continue
+                full = os.path.join(dirpath, name)
+                yield full, os.path.relpath(full, self.source).replace(os.sep, "/")
+
+    def _chunk_file(self, path):
+        chunks, stored = [], 0
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    break
+                digest, size = self._put_chunk(data)
+                chunks.append(digest)
+                stored += size
+        return chunks, stored
+
+    def _chunk_sqlite(self, path):
+        # cópia consistente via API de backup do SQLite (o banco pode estar em uso, em WAL)
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            src, dst = sqlite3.connect(path), sqlite3.connect(temp_path)
+            try:
+                src.backup(dst)
+            finally:
+                src.close()
+                dst.close()
+            return self._chunk_file(temp_path)
+        finally:
+            os.remove(temp_path)
+
+    @staticmethod
+    def _wal_signature(path):
+        # em WAL as gravações ficam no -wal até o checkpoint; o .db sozinho não muda
+        try:
+            st = os.stat(f"{path}-wal")
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def snapshot(self):
+        with self._lock:
+            started = time.perf_counter()
+            snaps = self.list_snapshots()
+            previous = self.load_manifest(snaps[-1]).get("files", {}) if snaps else {}
+            files, reused, read, stored = {}, 0, 0, 0
+            for full, rel in self._iter_files():
+                try:
+                    st = os.stat(full)
+                    wal = self._wal_signature(full) if full.endswith(".db") else None
+                    old = previous.get(rel)
+                    if (old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns
+                            and old.get("wal") == wal):
+                        chunks = old["chunks"]
+                        reused += 1
+                    else:
+                        chunks, size = self._chunk_sqlite(full) if full.endswith(".db") else self._chunk_file(full)
+                        stored += size
+                        read += 1
+                except (OSError, sqlite3.Error) as e:
+                    logging.error(f"Backup: falha ao ler {full}: {e}")
+                    continue
+                files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "mode": st.st_mode & 0o777, "chunks": chunks}
+                if wal is not None:
+                    files[rel]["wal"] = wal
+            snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+            if snapshot_id in snaps:
+                snapshot_id += f"-{len(snaps)}"
+            manifest = {
+                "id": snapshot_id,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "files": files,
+                "stats": {"files": len(files), "reused": reused, "read": read, "stored_bytes": stored,
+                          "seconds": round(time.perf_counter() - started, 3)},
+            }
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            _write_json_atomic(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), manifest, indent=None)
+            logging.info(f"Backup: snapshot {snapshot_id} ({manifest['stats']}).")
+            return manifest
+
+    def restore(self, snapshot_id, target=None, paths=None):
+        """Restaura o snapshot em `target` (padrão: a própria pasta de dados)."""
+        target = target or self.source
+        manifest = self.load_manifest(snapshot_id)
+        if not manifest:
+            raise ValueError(f"Snapshot inexistente: {snapshot_id}")
+        restored = 0
+        for rel, entry in manifest["files"].items():
+            if paths and rel not in paths:
+                continue
+            dest = os.path.join(target, *rel.split("/"))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            temp_path = f"{dest}.restore.tmp.{uuid.uuid4().hex}"
+            with open(temp_path, "wb") as f:
+                for digest in entry["chunks"]:
+                    f.write(self._get_chunk(digest))
+            os.chmod(temp_path, entry.get("mode", 0o644))
+            if dest.endswith(".db"):
+                # o snapshot já tem o WAL aplicado; um -wal antigo seria reaplicado sobre o banco restaurado
+                for suffix in ("-wal", "-shm", "-journal"):
+                    if os.path.exists(dest + suffix):
+                        os.remove(dest + suffix)
+            os.replace(temp_path, dest)
+            restored += 1
+        logging.info(f"Backup: snapshot {snapshot_id} restaurado em {target} ({restored} arquivos).")
+        return restored
+
+    def prune(self, keep_last=BACKUP_KEEP_LAST, keep_daily=BACKUP_KEEP_DAILY):
+        """Mantém os `keep_last` mais recentes e o último de cada um dos `keep_daily` dias."""
+        with self._lock:
+            snaps = self.list_snapshots()
+            keep = set(snaps[-keep_last:]) if keep_last else set()
+            days = {}
+            for snap in snaps:
+                days[snap[:8]] = snap
+            for day in sorted(days)[-keep_daily:] if keep_daily else []:
+                keep.add(days[day])
+            removed = [s for s in snaps if s not in keep]
+            for snap in removed:
+                os.remove(os.path.join(self.snapshots_dir, f"{snap}.json"))
+            freed = self._gc()
+            logging.info(f"Backup: {len(removed)} snapshots removidos, {freed} blocos liberados.")
+            return removed, freed
+
+    def _gc(self):
+        live = set()
+        for snap in self.list_snapshots():
+            for entry in self.load_manifest(snap).get("files", {}).values():
+                live.update(entry["chunks"])
+        freed = 0
+        for dirpath, _, files in os.walk(self.objects_dir):
+            for name in files:
+                # ".tmp." é um bloco sendo gravado agora por outro backup
+                if name not in live and ".tmp." not in name:
+                    os.remove(os.path.join(dirpath, name))
+                    freed += 1
+        return freed
+
+class BackupScheduler(threading.Thread):
+    """Thread de fundo que tira snapshots conforme "backup_frequency" do config."""
+
+    def __init__(self, vault=None, check_every=300):
+        super().__init__(name="backup-scheduler", daemon=True)
+        self.vault = vault or BackupVault()
+        self.check_every = check_every
+        self._stop_event = threading.Event()
+
+    def _due(self):
+        cfg = get_storage().read_doc("CONFIG")
+        interval = BACKUP_INTERVALS.get(str(cfg.get("backup_frequency", "Daily")).lower())
+        if interval is None:
+            return False, cfg
+        last = self.vault.last_snapshot_time()
+        return last is None or datetime.now() - last >= interval, cfg
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                due, cfg = self._due()
+                if due:
+                    self.vault.snapshot()
+                    self.vault.prune(cfg.get("backup_keep_last", BACKUP_KEEP_LAST),
+                                     cfg.get("backup_keep_daily", BACKUP_KEEP_DAILY))
+            except Exception as e:
+                logging.error(f"Backup agendado falhou: {e}")
+            self._stop_event.wait(self.check_every)
+
+    def stop(self):
+        self._stop_event.set()
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def start_backup_scheduler():
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or not _SCHEDULER.is_alive():
+            _SCHEDULER = BackupScheduler()
+            _SCHEDULER.start()
+        return _SCHEDULER
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m app_modules.backup", description="Cofre de backups do O Pregador")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("snapshot", help="tira um snapshot agora")
+    sub.add_parser("list", help="lista os snapshots")
+    p_restore = sub.add_parser("restore", help="restaura um snapshot")
+    p_restore.add_argument("snapshot_id")
+    p_restore.add_argument("--target", help="pasta de destino (padrão: a pasta de dados)")
+    p_restore.add_argument("--path", action="append", help="restaura só este arquivo (relativo); pode repetir")
+    p_prune = sub.add_parser("prune", help="aplica a retenção e remove blocos órfãos")
+    p_prune.add_argument("--keep-last", type=int, default=BACKUP_KEEP_LAST)
+    p_prune.add_argument("--keep-daily", type=int, default=BACKUP_KEEP_DAILY)
+    args = parser.parse_args(argv)
+
+    vault = BackupVault()
+    if args.cmd == "snapshot":
+        manifest = vault.snapshot()
+        print(f"{manifest['id']}: {manifest['stats']}")
+    elif args.cmd == "list":
+        for snap in vault.list_snapshots():
+            print(f"{snap}: {vault.load_manifest(snap).get('stats', {})}")
+    elif args.cmd == "restore":
+        print(f"{vault.restore(args.snapshot_id, args.target, args.path)} arquivos restaurados.")
+    elif args.cmd == "prune":
+        removed, freed = vault.prune(args.keep_last, args.keep_daily)
+        print(f"{len(removed)} snapshots removidos, {freed} blocos liberados.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
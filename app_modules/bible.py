@@ -0,0 +1,281 @@
+import re
+from collections import namedtuple
+from .utils import TextUtils
+
+# Numeração theWord: livros 1..66, versificação KJV (31102 versículos).
+# Índice de versículo (vi) = livro<<24 | capítulo<<16 | versículo<<8 | span.
+
+VerseRef = namedtuple("VerseRef", "book chapter verse span")
+
+# (nome pt, abreviação pt, nome en, abreviação en)
+BOOKS = (
+    ('Gênesis', 'Gn', 'Genesis', 'Gen'),
+    ('Êxodo', 'Êx', 'Exodus', 'Exo'),
+    ('Levítico', 'Lv', 'Leviticus', 'Lev'),
+    ('Números', 'Nm', 'Numbers', 'Num'),
+    ('Deuteronômio', 'Dt', 'Deuteronomy', 'Deu'),
+    ('Josué', 'Js', 'Joshua', 'Jos'),
+    ('Juízes', 'Jz', 'Judges', 'Jdg'),
+    ('Rute', 'Rt', 'Ruth', 'Rut'),
+    ('1 Samuel', '1Sm', '1 Samuel', '1Sa'),
+    ('2 Samuel', '2Sm', '2 Samuel', '2Sa'),
+    ('1 Reis', '1Rs', '1 Kings', '1Ki'),
+    ('2 Reis', '2Rs', '2 Kings', '2Ki'),
+    ('1 Crônicas', '1Cr', '1 Chronicles', '1Ch'),
+    ('2 Crônicas', '2Cr', '2 Chronicles', '2Ch'),
+    ('Esdras', 'Ed', 'Ezra', 'Ezr'),
+    ('Neemias', 'Ne', 'Nehemiah', 'Neh'),
+    ('Ester', 'Et', 'Esther', 'Est'),
+    ('Jó', 'Jó', 'Job', 'Job'),
+    ('Salmos', 'Sl', 'Psalms', 'Psa'),
+    ('Provérbios', 'Pv', 'Proverbs', 'Pro'),
+    ('Eclesiastes', 'Ec', 'Ecclesiastes', 'Ecc'),
+    ('Cânticos', 'Ct', 'Song of Solomon', 'Son'),
+    ('Isaías', 'Is', 'Isaiah', 'Isa'),
+    ('Jeremias', 'Jr', 'Jeremiah', 'Jer'),
+    ('Lamentações', 'Lm', 'Lamentations', 'Lam'),
+    ('Ezequiel', 'Ez', 'Ezekiel', 'Eze'),
+    ('Daniel', 'Dn', 'Daniel', 'Dan'),
+    ('Oséias', 'Os', 'Hosea', 'Hos'),
+    ('Joel', 'Jl', 'Joel', 'Joe'),
+    ('Amós', 'Am', 'Amos', 'Amo'),
+    ('Obadias', 'Ob', 'Obadiah', 'Oba'),
+    ('Jonas', 'Jn', 'Jonah', 'Jon'),
+    ('Miquéias', 'Mq', 'Micah', 'Mic'),
+    ('Naum', 'Na', 'Nahum', 'Nah'),
+    ('Habacuque', 'Hc', 'Habakkuk', 'Hab'),
+    ('Sofonias', 'Sf', 'Zephaniah', 'Zep'),
+    ('Ageu', 'Ag', 'Haggai', 'Hag'),
+    ('Zacarias', 'Zc', 'Zechariah', 'Zec'),
+    ('Malaquias', 'Ml', 'Malachi', 'Mal'),
+    ('Mateus', 'Mt', 'Matthew', 'Mat'),
+    ('Marcos', 'Mc', 'Mark', 'Mar'),
+    ('Lucas', 'Lc', 'Luke', 'Luk'),
+    ('João', 'Jo', 'John', 'Joh'),
+    ('Atos', 'At', 'Acts', 'Act'),
+    ('Romanos', 'Rm', 'Romans', 'Rom'),
+    ('1 Coríntios', '1Co', '1 Corinthians', '1Co'),
+    ('2 Coríntios', '2Co', '2 Corinthians', '2Co'),
+    ('Gálatas', 'Gl', 'Galatians', 'Gal'),
+    ('Efésios', 'Ef', 'Ephesians', 'Eph'),
+    ('Filipenses', 'Fp', 'Philippians', 'Php'),
+    ('Colossenses', 'Cl', 'Colossians', 'Col'),
+    ('1 Tessalonicenses', '1Ts', '1 Thessalonians', '1Th'),
+    ('2 Tessalonicenses', '2Ts', '2 Thessalonians', '2Th'),
+    ('1 Timóteo', '1Tm', '1 Timothy', '1Ti'),
+    ('2 Timóteo', '2Tm', '2 Timothy', '2Ti'),
+    ('Tito', 'Tt', 'Titus', 'Tit'),
+    ('Filemom', 'Fm', 'Philemon', 'Phm'),
+    ('Hebreus', 'Hb', 'Hebrews', 'Heb'),
+    ('Tiago', 'Tg', 'James', 'Jas'),
+    ('1 Pedro', '1Pe', '1 Peter', '1Pe'),
+    ('2 Pedro', '2Pe', '2 Peter', '2Pe'),
+    ('1 João', '1Jo', '1 John', '1Jo'),
+    ('2 João', '2Jo', '2 John', '2Jo'),
+    ('3 João', '3Jo', '3 John', '3Jo'),
+    ('Judas', 'Jd', 'Jude', 'Jud'),
+    ('Apocalipse', 'Ap', 'Revelation', 'Rev'),
+)
+
+# outras formas de escrever o nome (singular usado em sermões: "Salmo 23")
+BOOK_ALIASES = {
+    'Salmo': 19, 'Psalm': 19,
+    'Provérbio': 20,
+    'Cantares': 22, 'Cântico dos Cânticos': 22,
+}
+
+# versículos por capítulo, na ordem de BOOKS
+CHAPTER_VERSES = (
+    (31, 25, 24, 26, 32, 22, 24, 22, 29, 32, 32, 20, 18, 24, 21, 16, 27, 33, 38, 18, 34, 24, 20, 67,
+     34, 35, 46, 22, 35, 43, 55, 32, 20, 31, 29, 43, 36, 30, 23, 23, 57, 38, 34, 34, 28, 34, 31, 22,
+     33, 26),
+    (22, 25, 22, 31, 23, 30, 25, 32, 35, 29, 10, 51, 22, 31, 27, 36, 16, 27, 25, 26, 36, 31, 33, 18,
+     40, 37, 21, 43, 46, 38, 18, 35, 23, 35, 35, 38, 29, 31, 43, 38),
+    (17, 16, 17, 35, 19, 30, 38, 36, 24, 20, 47, 8, 59, 57, 33, 34, 16, 30, 37, 27, 24, 33, 44, 23,
+     55, 46, 34),
+    (54, 34, 51, 49, 31, 27, 89, 26, 23, 36, 35, 16, 33, 45, 41, 50, 13, 32, 22, 29, 35, 41, 30, 25,
+     18, 65, 23, 31, 40, 16, 54, 42, 56, 29, 34, 13),
+    (46, 37, 29, 49, 33, 25, 26, 20, 29, 22, 32, 32, 18, 29, 23, 22, 20, 22, 21, 20, 23, 30, 25, 22,
+     19, 19, 26, 68, 29, 20, 30, 52, 29, 12),
+    (18, 24, 17, 24, 15, 27, 26, 35, 27, 43, 23, 24, 33, 15, 63, 10, 18, 28, 51, 9, 45, 34, 16, 33),
+    (36, 23, 31, 24, 31, 40, 25, 35, 57, 18, 40, 15, 25, 20, 20, 31, 13, 31, 30, 48, 25),
+    (22, 23, 18, 22),
+    (28, 36, 21, 22, 12, 21, 17, 22, 27, 27, 15, 25, 23, 52, 35, 23, 58, 30, 24, 42, 15, 23, 29, 22,
+     44, 25, 12, 25, 11, 31, 13),
+    (27, 32, 39, 12, 25, 23, 29, 18, 13, 19, 27, 31, 39, 33, 37, 23, 29, 33, 43, 26, 22, 51, 39,
+     25),
+    (53, 46, 28, 34, 18, 38, 51, 66, 28, 29, 43, 33, 34, 31, 34, 34, 24, 46, 21, 43, 29, 53),
+    (18, 25, 27, 44, 27, 33, 20, 29, 37, 36, 21, 21, 25, 29, 38, 20, 41, 37, 37, 21, 26, 20, 37, 20,
+     30),
+    (54, 55, 24, 43, 26, 81, 40, 40, 44, 14, 47, 40, 14, 17, 29, 43, 27, 17, 19, 8, 30, 19, 32, 31,
+     31, 32, 34, 21, 30),
+    (17, 18, 17, 22, 14, 42, 22, 18, 31, 19, 23, 16, 22, 15, 19, 14, 19, 34, 11, 37, 20, 12, 21, 27,
+     28, 23, 9, 27, 36, 27, 21, 33, 25, 33, 27, 23),
+    (11, 70, 13, 24, 17, 22, 28, 36, 15, 44),
+    (11, 20, 32, 23, 19, 19, 73, 18, 38, 39, 36, 47, 31),
+    (22, 23, 15, 17, 14, 14, 10, 17, 32, 3),
+    (22, 13, 26, 21, 27, 30, 21, 22, 35, 22, 20, 25, 28, 22, 35, 22, 16, 21, 29, 29, 34, 30, 17, 25,
+     6, 14, 23, 28, 25, 31, 40, 22, 33, 37, 16, 33, 24, 41, 30, 24, 34, 17),
+    (6, 12, 8, 8, 12, 10, 17, 9, 20, 18, 7, 8, 6, 7, 5, 11, 15, 50, 14, 9, 13, 31, 6, 10, 22, 12,
+     14, 9, 11, 12, 24, 11, 22, 22, 28, 12, 40, 22, 13, 17, 13, 11, 5, 26, 17, 11, 9, 14, 20, 23,
+     19, 9, 6, 7, 23, 13, 11, 11, 17, 12, 8, 12, 11, 10, 13, 20, 7, 35, 36, 5, 24, 20, 28, 23, 10,
+     12, 20, 72, 13, 19, 16, 8, 18, 12, 13, 17, 7, 18, 52, 17, 16, 15, 5, 23, 11, 13, 12, 9, 9, 5,
+     8, 28, 22, 35, 45, 48, 43, 13, 31, 7, 10, 10, 9, 8, 18, 19, 2, 29, 176, 7, 8, 9, 4, 8, 5, 6, 5,
+     6, 8, 8, 3, 18, 3, 3, 21, 26, 9, 8, 24, 13, 10, 7, 12, 15, 21, 10, 20, 14, 9, 6),
+    (33, 22, 35, 27, 23, 35, 27, 36, 18, 32, 31, 28, 25, 35, 33, 33, 28, 24, 29, 30, 31, 29, 35, 34,
+     28, 28, 27, 28, 27, 33, 31),
+    (18, 26, 22, 16, 20, 12, 29, 17, 18, 20, 10, 14),
+    (17, 17, 11, 16, 16, 13, 13, 14),
+    (31, 22, 26, 6, 30, 13, 25, 22, 21, 34, 16, 6, 22, 32, 9, 14, 14, 7, 25, 6, 17, 25, 18, 23, 12,
+     21, 13, 29, 24, 33, 9, 20, 24, 17, 10, 22, 38, 22, 8, 31, 29, 25, 28, 28, 25, 13, 15, 22, 26,
+     11, 23, 15, 12, 17, 13, 12, 21, 14, 21, 22, 11, 12, 19, 12, 25, 24),
+    (19, 37, 25, 31, 31, 30, 34, 22, 26, 25, 23, 17, 27, 22, 21, 21, 27, 23, 15, 18, 14, 30, 40, 10,
+     38, 24, 22, 17, 32, 24, 40, 44, 26, 22, 19, 32, 21, 28, 18, 16, 18, 22, 13, 30, 5, 28, 7, 47,
+     39, 46, 64, 34),
+    (22, 22, 66, 22, 22),
+    (28, 10, 27, 17, 17, 14, 27, 18, 11, 22, 25, 28, 23, 23, 8, 63, 24, 32, 14, 49, 32, 31, 49, 27,
+     17, 21, 36, 26, 21, 26, 18, 32, 33, 31, 15, 38, 28, 23, 29, 49, 26, 20, 27, 31, 25, 24, 23,
+     35),
+    (21, 49, 30, 37, 31, 28, 28, 27, 27, 21, 45, 13),
+    (11, 23, 5, 19, 15, 11, 16, 14, 17, 15, 12, 14, 16, 9),
+    (20, 32, 21),
+    (15, 16, 15, 13, 27, 14, 17, 14, 15),
+    (21,),
+    (17, 10, 10, 11),
+    (16, 13, 12, 13, 15, 16, 20),
+    (15, 13, 19),
+    (17, 20, 19),
+    (18, 15, 20),
+    (15, 23),
+    (21, 13, 10, 14, 11, 15, 14, 23, 17, 12, 17, 14, 9, 21),
+    (14, 17, 18, 6),
+    (25, 23, 17, 25, 48, 34, 29, 34, 38, 42, 30, 50, 58, 36, 39, 28, 27, 35, 30, 34, 46, 46, 39, 51,
+     46, 75, 66, 20),
+    (45, 28, 35, 41, 43, 56, 37, 38, 50, 52, 33, 44, 37, 72, 47, 20),
+    (80, 52, 38, 44, 39, 49, 50, 56, 62, 42, 54, 59, 35, 35, 32, 31, 37, 43, 48, 47, 38, 71, 56,
+     53),
+    (51, 25, 36, 54, 47, 71, 53, 59, 41, 42, 57, 50, 38, 31, 27, 33, 26, 40, 42, 31, 25),
+    (26, 47, 26, 37, 42, 15, 60, 40, 43, 48, 30, 25, 52, 28, 41, 40, 34, 28, 41, 38, 40, 30, 35, 27,
+     27, 32, 44, 31),
+    (32, 29, 31, 25, 21, 23, 25, 39, 33, 21, 36, 21, 14, 23, 33, 27),
+    (31, 16, 23, 21, 13, 20, 40, 13, 27, 33, 34, 31, 13, 40, 58, 24),
+    (24, 17, 18, 18, 21, 18, 16, 24, 15, 18, 33, 21, 14),
+    (24, 21, 29, 31, 26, 18),
+    (23, 22, 21, 32, 33, 24),
+    (30, 30, 21, 23),
+    (29, 23, 25, 18),
+    (10, 20, 13, 18, 28),
+    (12, 17, 18),
+    (20, 15, 16, 16, 25, 21),
+    (18, 26, 17, 22),
+    (16, 15, 15),
+    (25,),
+    (14, 18, 19, 16, 14, 20, 28, 13, 28, 39, 40, 29, 25),
+    (27, 26, 18, 17, 20),
+    (25, 25, 22, 19, 14),
+    (21, 22, 18),
+    (10, 29, 24, 21, 21),
+    (13,),
+    (14,),
+    (25,),
+    (20, 29, 22, 11, 14, 17, 17, 13, 21, 11, 19, 17, 18, 20, 8, 21, 18, 24, 21, 15, 27, 21),
+)
+TOTAL_VERSES = 31102
+
+# ordinal (0..31101) do primeiro versículo de cada capítulo
+_CHAPTER_START = []
+_n = 0
+for _chapters in CHAPTER_VERSES:
+    _starts = []
+    for _count in _chapters:
+        _starts.append(_n)
+        _n += _count
+    _CHAPTER_START.append(tuple(_starts))
+_CHAPTER_START = tuple(_CHAPTER_START)
+del _n, _chapters, _starts, _count
+
+def encode_vi(book, chapter, verse, span=0):
+    return (book << 24) | (chapter << 16) | (verse << 8) | span
+
+def decode_vi(vi):
+    return VerseRef((vi >> 24) & 0x7F, (vi >> 16) & 0xFF, (vi >> 8) & 0xFF, vi & 0xFF)
+
+def chapter_count(book):
+    return len(CHAPTER_VERSES[book - 1])
+
+def verse_count(book, chapter):
+    return CHAPTER_VERSES[book - 1][chapter - 1]
+
+def is_valid(book, chapter, verse=1):
+    return (1 <= book <= 66 and 1 <= chapter <= chapter_count(book)
+            and 1 <= verse <= verse_count(book, chapter))
+
+def verse_ordinal(book, chapter, verse):
+    if not is_valid(book, chapter, verse):
+        raise ValueError(f"Referência inválida: {book}:{chapter}:{verse}")
+    return _CHAPTER_START[book - 1][chapter - 1] + verse - 1
+
+def ordinal_to_ref(ordinal):
+    if not 0 <= ordinal < TOTAL_VERSES:
+        raise ValueError(f"Ordinal fora da Bíblia: {ordinal}")
+    lo, hi = 0, 65
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _CHAPTER_START[mid][0] <= ordinal: lo = mid
+        else: hi = mid - 1
+    starts = _CHAPTER_START[lo]
+    ch = len(starts) - 1
+    while starts[ch] > ordinal:
+        ch -= 1
+    return VerseRef(lo + 1, ch + 1, ordinal - starts[ch] + 1, 0)
+
+def format_ref(ref, lang="pt"):
+    abbrev = BOOKS[ref.book - 1][1 if lang == "pt" else 3]
+    text = f"{abbrev} {ref.chapter}:{ref.verse}"
+    if ref.span:
+        text += f"-{ref.verse + ref.span}"
+    return text
+
+fold = TextUtils.fold_accents
+
+def _book_key(name, folded=False):
+    key = name.lower().replace(" ", "").replace(".", "")
+    return fold(key) if folded else key
+
+# Primeiro tenta com acento ("jó" = Jó, "jo" = João); depois sem acento.
+BOOK_LOOKUP = {}
+_BOOK_LOOKUP_FOLDED = {}
+for _i, (_pt, _pt_abbr, _en, _en_abbr) in enumerate(BOOKS, start=1):
+    for _name in (_pt, _pt_abbr, _en, _en_abbr):
+        BOOK_LOOKUP.setdefault(_book_key(_name), _i)
+        _BOOK_LOOKUP_FOLDED.setdefault(_book_key(_name, folded=True), _i)
+for _name, _i in BOOK_ALIASES.items():
+    BOOK_LOOKUP.setdefault(_book_key(_name), _i)
+    _BOOK_LOOKUP_FOLDED.setdefault(_book_key(_name, folded=True), _i)
+del _i, _pt, _pt_abbr, _en, _en_abbr, _name
+
+def lookup_book(name):
+    return BOOK_LOOKUP.get(_book_key(name)) or _BOOK_LOOKUP_FOLDED.get(_book_key(name, folded=True))
+
+_SIMPLE_REF = re.compile(r"^\s*(\d?\s*[^\d\s:][^\d:]*?)\.?\s*(\d+)(?:\s*[:.,]\s*(\d+)(?:\s*-\s*(\d+))?)?\s*$")
+
+def parse_ref(text):
+    """Lê uma referência única ("Sl 23", "Jo 3:16-18") e devolve VerseRef ou None.
+
+    Sem versículo, devolve o capítulo inteiro (verse=1, span até o fim).
+    """
+    m = _SIMPLE_REF.match(text or "")
+    if not m:
+        return None
+    book = lookup_book(m.group(1))
+    chapter = int(m.group(2))
+    if not book or not 1 <= chapter <= chapter_count(book):
+        return None
+    last = verse_count(book, chapter)
+    if m.group(3) is None:
+        return VerseRef(book, chapter, 1, last - 1)
+    verse = int(m.group(3))
+    end = int(m.group(4)) if m.group(4) else verse
+    if not 1 <= verse <= end <= last:
+        return None
+    return VerseRef(book, chapter, verse, end - verse)
@@ -0,0 +1,157 @@
+import re, hashlib, threading
+from collections import namedtuple, OrderedDict
+from .bible import BOOKS, BOOK_ALIASES, VerseRef, lookup_book, chapter_count, verse_count, verse_ordinal, fold, format_ref
+
+REFS_PARAGRAPH_CACHE = 4096
+
+# start/end: posição no texto; first/last: ordinais (0..31101) do trecho;
+# refs: VerseRef por capítulo coberto (prontos para lookup_many/verses).
+RefHit = namedtuple("RefHit", "start end text first last refs")
+
+def _atoms(name):
+    # "1 Coríntios" -> 1, \s?, c, o, ... ; espaços internos viram \s+
+    m = re.match(r"^([123])\s*(.+)$", name.lower())
+    head, rest = ([m.group(1), r"\s?"], m.group(2)) if m else ([], name.lower())
+    return head + [r"\s+" if c == " " else re.escape(c) for c in rest]
+
+def _trie_pattern(names):
+    # alternação fatorada por prefixo ("j(?:o(?:ão|b|el|nas)?|...)"): o motor de
+    # regex testa cada posição do texto contra um caminho só, não contra ~250 nomes
+    trie = {}
+    for name in names:
+        node = trie
+        for atom in _atoms(name):
+            node = node.setdefault(atom, {})
+        node[None] = None
+
+    def emit(node):
+        alts = [atom + emit(child) for atom, child in sorted((k, v) for k, v in node.items() if k is not None)]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if None in node:
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+def _compile():
+    names = set()
+    for name in [n for row in BOOKS for n in row] + list(BOOK_ALIASES):
+        names.update((name, fold(name)))
+    return re.compile(
+        rf"(?<![\w])(?P<book>{_trie_pattern(names)})\.?\s*(?P<ch>\d{{1,3}})"
+        # "3:16", "3.16", "3,16"; vírgula/ponto só colados ("Jo 3, 2 Reis" são duas referências)
+        r"(?:(?:\s*:\s*|[.,])(?P<v>\d{1,3})(?:\s*[-–]\s*(?:(?P<ch2>\d{1,3})\s*[:.]\s*)?(?P<v2>\d{1,3}))?)?(?![\w])",
+        re.IGNORECASE,
+    )
+
+# uma única regex com todos os nomes/abreviações: o texto é lido uma vez só
+_REF_PATTERN = _compile()
+_ABBREVIATIONS = {fold(n.replace(" ", "")) for row in BOOKS for n in (row[1], row[3])}
+# nomes por extenso aceitam minúsculas; os que coincidem com abreviações ("Jó"/"Jo") não
+_FULL_NAMES = ({fold(n.replace(" ", "")) for row in BOOKS for n in (row[0], row[2])}
+               | {fold(n.replace(" ", "")) for n in BOOK_ALIASES}) - _ABBREVIATIONS
+# abreviações que também são palavras comuns ("os 3 pontos", "na 2ª parte"): só com versículo
+_AMBIGUOUS = {"os", "na", "at", "is", "am", "ed", "et", "ob", "ag", "job", "mar", "act", "son"}
+
+def _hit(m, offset=0):
+    token = m.group("book")
+    key = fold(re.sub(r"[\s.]", "", token.lower()))
+    if key not in _FULL_NAMES:
+        letters = token.lstrip("123 ")
+        if not letters[:1].isupper() or (letters.lower() in _AMBIGUOUS and m.group("v") is None):
+            return None
+    book = lookup_book(token)
+    chapter = int(m.group("ch"))
+    if not book or not 1 <= chapter <= chapter_count(book):
+        return None
+    if m.group("v") is None:
+        verse, end_chapter, end_verse = 1, chapter, verse_count(book, chapter)
+    else:
+        verse = int(m.group("v"))
+        end_chapter = int(m.group("ch2")) if m.group("ch2") else chapter
+        end_verse = int(m.group("v2")) if m.group("v2") else verse
+    if not (1 <= verse <= verse_count(book, chapter) and chapter <= end_chapter <= chapter_count(book)
+            and 1 <= end_verse <= verse_count(book, end_chapter)):
+        return None
+    first, last = verse_ordinal(book, chapter, verse), verse_ordinal(book, end_chapter, end_verse)
+    if last < first:
+        return None
+    refs = []
+    for c in range(chapter, end_chapter + 1):
+        v0 = verse if c == chapter else 1
+        v1 = end_verse if c == end_chapter else verse_count(book, c)
+        refs.append(VerseRef(book, c, v0, v1 - v0))
+    return RefHit(offset + m.start(), offset + m.end(), m.group(), first, last, tuple(refs))
+
+class ReferenceScanner:
+    """Acha referências bíblicas em texto corrido, com cache por parágrafo."""
+
+    def __init__(self, cache_size=REFS_PARAGRAPH_CACHE):
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._paragraphs = OrderedDict()
+
+    def _scan_paragraph(self, paragraph):
+        key = hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            hit = self._paragraphs.get(key)
+            if hit is not None:
+                self._paragraphs.move_to_end(key)
+                return hit
+        hits = tuple(h for h in (_hit(m) for m in _REF_PATTERN.finditer(paragraph)) if h)
+        with self._lock:
+            self._paragraphs[key] = hits
+            while len(self._paragraphs) > self.cache_size:
+                self._paragraphs.popitem(last=False)
+        return hits
+
+    def scan(self, text):
+        """RefHit de todo o texto (posições absolutas); só parágrafos alterados são relidos."""
+        out, offset = [], 0
+        for paragraph in (text or "").split("\n"):
+            if paragraph.strip():
+                out.extend(h._replace(start=h.start + offset, end=h.end + offset) for h in self._scan_paragraph(paragraph))
+            offset += len(paragraph) + 1
+        return out
+
+    @staticmethod
+    def resolve(hits, bible=None, xrefs=None):
+        """Texto dos versículos e referências cruzadas de todos os hits (xrefs numa consulta só)."""
+        unique = list(OrderedDict((h.refs, h) for h in hits).values())
+        cross = xrefs.lookup_many([r for h in unique for r in h.refs]) if xrefs is not None else {}
+        out = []
+        for h in unique:
+            texto = []
+            if bible is not None and all(bible.has_book(r.book) for r in h.refs):
+                for r in h.refs:
+                    texto.extend(bible.verses(r))
+            destinos = {}
+            for r in h.refs:
+                for v in range(r.verse, r.verse + r.span + 1):
+                    if cross.get((r.book, r.chapter, v)):
+                        destinos[(r.book, r.chapter, v)] = cross[(r.book, r.chapter, v)]
+            out.append({"hit": h, "ref": "; ".join(format_ref(r) for r in h.refs), "texto": texto, "xrefs": destinos})
+        return out
+
+    @staticmethod
+    def highlight(text, hits, template="**{}**"):
+        """Texto com cada referência envolvida pelo template (markdown por padrão)."""
+        parts, last = [], 0
+        for h in sorted(hits, key=lambda h: h.start):
+            parts.append(text[last:h.start])
+            parts.append(template.format(text[h.start:h.end]))
+            last = h.end
+        parts.append(text[last:])
+        return "".join(parts)
+
+_SCANNER = None
+_SCANNER_LOCK = threading.Lock()
+
+def get_reference_scanner():
+    global _SCANNER
+    with _SCANNER_LOCK:
+        if _SCANNER is None:
+            _SCANNER = ReferenceScanner()
+        return _SCANNER
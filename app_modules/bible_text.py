@@ -0,0 +1,164 @@
+import os, re, mmap, array, struct, threading, logging
+from .core import DIRECTORY_STRUCTURE
+from .bible import TOTAL_VERSES, verse_ordinal, verse_count, chapter_count
+
+# Módulos theWord em texto puro: uma linha por versículo, na ordem KJV.
+# .ont = Bíblia toda, .ot = só AT, .nt = só NT (começa no ordinal de Mateus 1:1).
+MODULE_EXTENSIONS = (".ont", ".ot", ".nt")
+ENCRYPTED_MAGIC = b"TWENCBMOD"
+INDEX_MAGIC = b"PRGIDX01"
+_INDEX_HEADER = struct.Struct("<8sQqII")  # magic, tamanho, mtime_ns, primeiro ordinal, qtd
+_TAGS = re.compile(r"<RF>.*?<Rf>|<[^>]+>")
+
+class BibleModuleError(Exception):
+    pass
+
+class BibleText:
+    """Leitor de módulo bíblico mapeado em memória.
+
+    O índice (array de offsets de cada linha) é salvo em BibliaCache e
+    carregado com uma única leitura; versículos são fatias do mmap e só
+    viram str na hora de decodificar.
+    """
+
+    def __init__(self, path, cache_dir=None):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.cache_dir = cache_dir or DIRECTORY_STRUCTURE["LIBRARY_CACHE"]
+        self.index_path = os.path.join(self.cache_dir, f"{os.path.basename(path)}.idx")
+        ext = os.path.splitext(path)[1].lower()
+        self.first = verse_ordinal(40, 1, 1) if ext == ".nt" else 0
+        self.count = {".ot": verse_ordinal(40, 1, 1), ".nt": TOTAL_VERSES - verse_ordinal(40, 1, 1)}.get(ext, TOTAL_VERSES)
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BibleModuleError(f"Módulo vazio: {path}")
+        if self._mm[:len(ENCRYPTED_MAGIC)] == ENCRYPTED_MAGIC:
+            self.close()
+            raise BibleModuleError(f"{path} é um módulo theWord criptografado; use a versão .ont/.nt/.ot em texto puro.")
+        self._view = memoryview(self._mm)
+        self._offsets = self._load_index() or self._build_index()
+
+    def _source_signature(self):
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if len(raw) < _INDEX_HEADER.size:
+            return None
+        magic, size, mtime_ns, first, count = _INDEX_HEADER.unpack_from(raw)
+        if magic != INDEX_MAGIC or (size, mtime_ns) != self._source_signature() or first != self.first:
+            return None
+        offsets = array.array("I")
+        offsets.frombytes(raw[_INDEX_HEADER.size:])
+        return offsets if len(offsets) == count + 1 else None
+
+    def _build_index(self):
+        mm = self._mm
+        pos = 3 if mm[:3] == b"\xef\xbb\xbf" else 0
+        offsets = array.array("I", [pos])
+        end = len(mm)
+        while len(offsets) <= self.count:
+            nl = mm.find(b"\n", pos)
+            if nl < 0:
+                if pos >= end:
+                    raise BibleModuleError(f"{self.path}: módulo truncado ({len(offsets) - 1} versículos).")
+                nl = end - 1
+            pos = nl + 1
+            offsets.append(pos)
+        size, mtime_ns = self._source_signature()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_INDEX_HEADER.pack(INDEX_MAGIC, size, mtime_ns, self.first, self.count))
+                offsets.tofile(f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logging.error(f"Erro ao gravar índice {self.index_path}: {e}")
+        logging.info(f"BibleText: índice de {self.name} criado ({self.count} versículos).")
+        return offsets
+
+    def _span(self, start, stop):
+        # ordinais absolutos [start, stop) -> memoryview sem cópia
+        lo, hi = start - self.first, stop - self.first
+        if lo < 0 or hi > self.count or lo >= hi:
+            raise BibleModuleError(f"Trecho fora do módulo {self.name}.")
+        return self._view[self._offsets[lo]:self._offsets[hi]], lo, hi
+
+    def raw_range(self, start, stop):
+        return self._span(start, stop)[0]
+
+    def _decode_lines(self, start, stop, markup):
+        raw, lo, hi = self._span(start, stop)
+        base = self._offsets[lo]
+        lines = []
+        for i in range(lo, hi):
+            line = bytes(raw[self._offsets[i] - base:self._offsets[i + 1] - base]).decode("utf-8", "replace").rstrip("\r\n")
+            lines.append(line if markup else _TAGS.sub("", line).strip())
+        return lines
+
+    def verse(self, book, chapter, verse, markup=False):
+        n = verse_ordinal(book, chapter, verse)
+        return self._decode_lines(n, n + 1, markup)[0]
+
+    def verses(self, ref, markup=False):
+        n = verse_ordinal(ref.book, ref.chapter, ref.verse)
+        return self._decode_lines(n, n + ref.span + 1, markup)
+
+    def chapter(self, book, chapter, markup=False):
+        n = verse_ordinal(book, chapter, 1)
+        return self._decode_lines(n, n + verse_count(book, chapter), markup)
+
+    def passage(self, book, chapter, verse, end_chapter, end_verse, markup=False):
+        start = verse_ordinal(book, chapter, verse)
+        stop = verse_ordinal(book, end_chapter, end_verse) + 1
+        return self._decode_lines(start, stop, markup)
+
+    def has_book(self, book):
+        start = verse_ordinal(book, 1, 1)
+        last = chapter_count(book)
+        return self.first <= start and verse_ordinal(book, last, verse_count(book, last)) < self.first + self.count
+
+    def close(self):
+        view = getattr(self, "_view", None)
+        if view is not None:
+            view.release()
+        self._mm.close()
+        self._file.close()
+
+_MODULES = {}
+_MODULES_LOCK = threading.Lock()
+
+def find_modules(dirs=None):
+    dirs = dirs or (DIRECTORY_STRUCTURE["LIBRARY_CACHE"], ".")
+    found = []
+    for d in dirs:
+        try:
+            names = sorted(os.listdir(d))
+        except OSError:
+            continue
+        found += [os.path.join(d, n) for n in names if n.lower().endswith(MODULE_EXTENSIONS)]
+    return found
+
+def open_bible(path):
+    with _MODULES_LOCK:
+        module = _MODULES.get(path)
+        if module is None:
+            module = _MODULES[path] = BibleText(path)
+        return module
+
+def get_default_bible():
+    for path in find_modules():
+        try:
+            return open_bible(path)
+        except BibleModuleError as e:
+            logging.warning(str(e))
+    return None
@@ -1,5 +1,9 @@
-import os, json, shutil, uuid, logging
-from datetime import datetime
+import os, json, time, heapq, shutil, uuid, hashlib, logging, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import quote, unquote
+from .utils import TextUtils
 
 SYSTEM_ROOT = "Dados_Pregador_V31"
 LOG_PATH = os.path.join(SYSTEM_ROOT, "System_Logs")
@@ -34,38 +38,875 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-def _write_json_atomic(path, data):
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Histórico do Livro da Alma: particionado por usuário/mês (ver PartitionedHistory).
+PARTITION_DIRS = {
+    "SOUL_METRICS": os.path.join(DIRECTORY_STRUCTURE["GABINETE"], "Livro_da_Alma"),
+}
+RECORD_KEYS = tuple(PARTITION_DIRS)
+
+# Cache de leitura do _read_json_safe (PREGADOR_JSON_CACHE=0 desliga).
+JSON_CACHE_ENABLED = os.environ.get("PREGADOR_JSON_CACHE", "1") != "0"
+JSON_CACHE_MAX_ENTRIES = 64
+
+class _JsonReadCache:
+    """LRU de documentos já parseados, validado por (mtime_ns, size, inode)."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, sig):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == sig:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, path, sig, value):
+        with self._lock:
+            self._entries[path] = (sig, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path):
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+_JSON_CACHE = _JsonReadCache(JSON_CACHE_MAX_ENTRIES)
+
+def _json_cache_stats():
+    return _JSON_CACHE.stats()
+
+def _write_json_atomic(path, data, indent=4):
     temp_path = f"{path}.tmp.{uuid.uuid4().hex}"
     d = os.path.dirname(path)
     os.makedirs(d, exist_ok=True)
     try:
         with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            json.dump(data, f, indent=indent, ensure_ascii=False)
         shutil.move(temp_path, path)
         return True
     except Exception as e:
         logging.error(f"Erro na escrita atômica {path}: {e}")
         return False
+    finally:
+        _JSON_CACHE.invalidate(path)
 
-def _read_json_safe(path, default=None):
+def _read_json_safe(path, default=None, use_cache=True):
+    # Com cache ativo o objeto devolvido é compartilhado: copie antes de alterar.
     if default is None: default = {}
     try:
-        if not os.path.exists(path): return default
+        sig = _stat_signature(path)
+        if sig is None: return default
+        use_cache = use_cache and JSON_CACHE_ENABLED
+        if use_cache:
+            hit, value = _JSON_CACHE.get(path, sig)
+            if hit: return value
         with open(path, "r", encoding="utf-8") as f:
             content = f.read().strip()
             if not content: return default
-            return json.loads(content)
+            value = json.loads(content)
+        if use_cache:
+            _JSON_CACHE.put(path, sig, value)
+        return value
     except Exception as e:
         logging.error(f"Erro leitura JSON {path}: {e}")
         return default
 
+def _write_text_atomic(path, text):
+    temp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+    d = os.path.dirname(path)
+    if d: os.makedirs(d, exist_ok=True)
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        logging.error(f"Erro na escrita atômica {path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
 def _ensure_empty_json_list(path):
     d = os.path.dirname(path)
     os.makedirs(d, exist_ok=True)
     if not os.path.exists(path):
         _write_json_atomic(path, [])
 
-def genesis_filesystem_integrity_check():
+@contextmanager
+def _file_lock(path):
+    # Lock entre processos (POSIX). Em plataformas sem fcntl fica só o lock de thread.
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lf:
+        fcntl.flock(lf, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lf, fcntl.LOCK_UN)
+
+def _path_cache_name(path, absolute=True):
+    # nome de arquivo estável para um caminho: o último componente legível + hash do caminho
+    # inteiro (trocar "/" por "_" fazia "a/b_c" e "a_b/c" caírem no mesmo arquivo)
+    full = os.path.abspath(path) if absolute else os.path.normpath(path)
+    base = os.path.basename(full.rstrip(os.sep)) or "raiz"
+    return f"{TextUtils.sanitize_filename(base)[:40]}_{hashlib.sha256(full.encode('utf-8')).hexdigest()[:16]}"
+
+def _stat_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _read_legacy_records(path):
+    """Registros de um .json antigo (lista ou {"historico": [...]}), para as migrações."""
+    data = _read_json_safe(path, default=[], use_cache=False)
+    if isinstance(data, dict):
+        data = data.get("historico", [])
+    return data if isinstance(data, list) else []
+
+def _retire_legacy(path):
+    # o original fica ao lado como .migrated
+    if os.path.exists(path):
+        os.replace(path, f"{path}.migrated")
+
+def _month_bucket(created):
+    return (created or "")[:7]
+
+def _week_bucket(created):
+    # segunda-feira da semana (mesma regra do date(..., 'weekday 0', '-6 days') do SQLite)
+    try:
+        day = datetime.strptime((created or "")[:10], "%Y-%m-%d")
+    except ValueError:
+        return ""
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+def _record_mood(record):
+    if not isinstance(record, dict): return "-"
+    mood = record.get("humor", record.get("estado"))
+    return "-" if mood is None else str(mood)
+
+def _add_aggregate(summary, record, delta=1):
+    created = _record_created(record)
+    for period, bucket in (("month", _month_bucket(created)), ("week", _week_bucket(created))):
+        counts = summary.setdefault(period, {}).setdefault(bucket, {})
+        mood = _record_mood(record)
+        counts[mood] = counts.get(mood, 0) + delta
+
+def _decode_cursor(cursor):
+    if not cursor:
+        return None, 0
+    created, _, extra = cursor.rpartition("|")
+    return created, int(extra or 0)
+
+class PartitionedHistory:
+    """Registros particionados por usuário e mês, com agregados incrementais.
+
+    Cada usuário tem uma pasta com um <AAAA-MM>.jsonl por mês e um
+    resumo.json (registros por mês e contagem de humor por mês/semana)
+    atualizado a cada append. Ler os últimos N ou uma janela de datas só
+    abre os meses necessários, então o custo não cresce com os anos de
+    histórico. Registros antigos sem usuário ficam em SHARED_PARTITION e
+    continuam visíveis para todos.
+    """
+
+    SHARED_PARTITION = "@geral"
+
+    def __init__(self, root, legacy_key=None):
+        self.root = root
+        self.legacy_key = legacy_key
+        self._lock = threading.RLock()
+        self._opened = False
+
+    # ---------- layout ----------
+    def _partition_dir(self, user):
+        return os.path.join(self.root, quote(user if user is not None else self.SHARED_PARTITION, safe=""))
+
+    def _summary_path(self, user):
+        return os.path.join(self._partition_dir(user), "resumo.json")
+
+    @property
+    def _stamp_path(self):
+        return os.path.join(self.root, ".versao")
+
+    def _month_path(self, user, month):
+        return os.path.join(self._partition_dir(user), f"{month or '0000-00'}.jsonl")
+
+    def _partition_users(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return [None if n == self.SHARED_PARTITION else unquote(n)
+                for n in names if os.path.isdir(os.path.join(self.root, n))]
+
+    def _summary(self, user):
+        return _read_json_safe(self._summary_path(user))
+
+    def _read_month(self, user, month):
+        rows = []
+        try:
+            with open(self._month_path(user, month), "r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        rows.append(json.loads(raw))
+                    except ValueError:
+                        logging.error(f"Histórico: linha inválida em {self._month_path(user, month)}")
+        except OSError:
+            pass
+        rows.sort(key=lambda r: _record_created(r) or "")
+        return rows
+
+    def _open(self):
+        if self._opened:
+            return
+        with self._lock:
+            if self._opened:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with _file_lock(self.root):
+                if self.legacy_key and not os.listdir(self.root):
+                    self._migrate_legacy()
+            self._opened = True
+
+    def _migrate_legacy(self):
+        # .json antigo -> partições
+        legacy_path = DB_FILES[self.legacy_key]
+        records = _read_legacy_records(legacy_path)
+        self._write_all(records)
+        _retire_legacy(legacy_path)
+        logging.info(f"Histórico: {self.legacy_key} particionado ({len(records)} registros).")
+
+    # ---------- escrita ----------
+    def append(self, record):
+        self._open()
+        user = _record_user(record)
+        summary_path = self._summary_path(user)
+        month = _month_bucket(_record_created(record))
+        try:
+            os.makedirs(self._partition_dir(user), exist_ok=True)
+            with self._lock, _file_lock(summary_path):
+                with open(self._month_path(user, month), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                summary = json.loads(json.dumps(_read_json_safe(summary_path, use_cache=False)))
+                summary["count"] = summary.get("count", 0) + 1
+                months = summary.setdefault("months", {})
+                months[month] = months.get(month, 0) + 1
+                _add_aggregate(summary, record)
+                ok = _write_json_atomic(summary_path, summary, indent=None)
+            self._touch()
+            return ok
+        except Exception as e:
+            logging.error(f"Erro no histórico {self.root}: {e}")
+            return False
+
+    def _write_all(self, records):
+        partitions = {}
+        for record in records:
+            months = partitions.setdefault(_record_user(record), {})
+            months.setdefault(_month_bucket(_record_created(record)), []).append(record)
+        for user, months in partitions.items():
+            os.makedirs(self._partition_dir(user), exist_ok=True)
+            summary = {"count": 0, "months": {}}
+            for month, rows in months.items():
+                rows.sort(key=lambda r: _record_created(r) or "")
+                _write_text_atomic(self._month_path(user, month),
+                                   "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+                summary["count"] += len(rows)
+                summary["months"][month] = len(rows)
+                for r in rows:
+                    _add_aggregate(summary, r)
+            _write_json_atomic(self._summary_path(user), summary, indent=None)
+        self._touch()
+
+    def _touch(self):
+        # o mtime_ns do selo muda a cada escrita: serve de versão barata do histórico inteiro
+        with open(self._stamp_path, "a"):
+            pass
+        now = time.time_ns()
+        os.utime(self._stamp_path, ns=(now, now))
+
+    def version(self, user=None):
+        self._open()
+        if user is None:
+            return _stat_signature(self._stamp_path)
+        return tuple(_stat_signature(self._summary_path(u)) for u in self._visible(user))
+
+    def rewrite(self, records):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.root) or ".", exist_ok=True)
+            if os.path.isdir(self.root):
+                trash = f"{self.root}.old.{uuid.uuid4().hex}"
+                os.replace(self.root, trash)
+                shutil.rmtree(trash, ignore_errors=True)
+            os.makedirs(self.root, exist_ok=True)
+            self._write_all(list(records))
+            self._opened = True
+            return True
+
+    # ---------- leitura ----------
+    def _iter_desc(self, user, until=None):
+        # mais novo -> mais antigo, abrindo um mês por vez
+        months = sorted(self._summary(user).get("months", {}), reverse=True)
+        for month in months:
+            if until is not None and month and month > until[:7]:
+                continue
+            yield from reversed(self._read_month(user, month))
+
+    def _visible(self, user):
+        return [user] if user is None else [user, None]
+
+    def _stream(self, user, until=None):
+        users = self._partition_users() if user is None else self._visible(user)
+        streams = [self._iter_desc(u, until) for u in users]
+        return heapq.merge(*streams, key=lambda r: _record_created(r) or "", reverse=True)
+
+    def page(self, user, limit, cursor=None):
+        """Até `limit` registros, do mais novo ao mais antigo, e o cursor da próxima página."""
+        self._open()
+        before, skip = _decode_cursor(cursor)
+        items, last, seen = [], before, skip
+        for record in self._stream(user, before):
+            created = _record_created(record) or ""
+            if before is not None and created > before:
+                continue
+            if created == before and skip:
+                skip -= 1
+                continue
+            if len(items) >= limit:
+                return items, f"{last}|{seen}"
+            items.append(record)
+            seen = seen + 1 if created == last else 1
+            last = created
+        return items, None
+
+    def window(self, user, start, end):
+        """Registros com start <= data < end, em ordem cronológica."""
+        self._open()
+        users = self._partition_users() if user is None else self._visible(user)
+        rows = []
+        for u in users:
+            for month in sorted(self._summary(u).get("months", {})):
+                if month and start[:7] <= month <= end[:7]:
+                    rows.extend(r for r in self._read_month(u, month) if start <= (_record_created(r) or "") < end)
+        rows.sort(key=lambda r: _record_created(r) or "")
+        return rows
+
+    def aggregates(self, user, period="month"):
+        self._open()
+        users = self._partition_users() if user is None else self._visible(user)
+        merged = {}
+        for u in users:
+            for bucket, counts in self._summary(u).get(period, {}).items():
+                target = merged.setdefault(bucket, {})
+                for mood, n in counts.items():
+                    target[mood] = target.get(mood, 0) + n
+        return dict(sorted(merged.items()))
+
+    def count(self, user=None):
+        self._open()
+        users = self._partition_users() if user is None else self._visible(user)
+        return sum(self._summary(u).get("count", 0) for u in users)
+
+    def tail(self, n, user=None):
+        return list(reversed(self.page(user, n)[0])) if n > 0 else []
+
+    def read(self):
+        self._open()
+        rows = []
+        for user in self._partition_users():
+            for month in sorted(self._summary(user).get("months", {})):
+                rows.extend(self._read_month(user, month))
+        rows.sort(key=lambda r: _record_created(r) or "")
+        return rows
+
+_PARTITIONS = {}
+_PARTITIONS_LOCK = threading.Lock()
+
+def _get_partitioned(key):
+    with _PARTITIONS_LOCK:
+        store = _PARTITIONS.get(key)
+        if store is None:
+            store = _PARTITIONS[key] = PartitionedHistory(PARTITION_DIRS[key], legacy_key=key)
+        return store
+
+# ------------------------------------------------------------------------------
+# Backends de armazenamento. "json" (padrão) usa os arquivos de DB_FILES e as
+# partições; "sqlite" usa um único banco em WAL. A escolha vem de
+# PREGADOR_STORAGE ou de "storage_backend" no config.json (sempre lido do
+# arquivo, pois é ele que decide onde o resto da configuração mora).
+# ------------------------------------------------------------------------------
+DOC_KEYS = ("CONFIG", "USERS_DB", "STATS_METRICS")
+SQLITE_DB_PATH = os.path.join(DIRECTORY_STRUCTURE["USER_CONFIG"], "pregador.db")
+
+class JsonStorage:
+    name = "json"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def read_doc(self, key):
+        return _read_json_safe(DB_FILES[key])
+
+    def get_doc_item(self, key, item, default=None):
+        return self.read_doc(key).get(item, default)
+
+    def count_doc_items(self, key):
+        return len(self.read_doc(key))
+
+    def write_doc(self, key, data):
+        return _write_json_atomic(DB_FILES[key], data)
+
+    def update_doc(self, key, fn):
+        # read-modify-write sob lock de thread + arquivo: evita update perdido
+        path = DB_FILES[key]
+        with self._lock, _file_lock(path):
+            doc = dict(_read_json_safe(path, use_cache=False))
+            result = fn(doc)
+            if result is False:
+                return False
+            return _write_json_atomic(path, doc)
+
+    def insert_doc_item(self, key, item, value):
+        # True = inserido, False = já existia, None = erro de escrita
+        status = {}
+        def _add(doc):
+            if item in doc:
+                status["dup"] = True
+                return False
+            doc[item] = value
+        if self.update_doc(key, _add):
+            return True
+        return False if status.get("dup") else None
+
+    def set_doc_item(self, key, item, value):
+        def _set(doc):
+            doc[item] = value
+        return self.update_doc(key, _set)
+
+    def doc_version(self, key):
+        # muda a cada escrita do arquivo (mesma assinatura usada pelo cache de leitura)
+        return _stat_signature(DB_FILES[key])
+
+    def append(self, key, record):
+        return _get_partitioned(key).append(record)
+
+    def read_records(self, key):
+        return _get_partitioned(key).read()
+
+    def tail(self, key, n, user=None):
+        return _get_partitioned(key).tail(n, user)
+
+    def page(self, key, user, limit, cursor=None):
+        return _get_partitioned(key).page(user, limit, cursor)
+
+    def window(self, key, user, start, end):
+        return _get_partitioned(key).window(user, start, end)
+
+    def aggregates(self, key, user, period="month"):
+        return _get_partitioned(key).aggregates(user, period)
+
+    def count_records(self, key, user=None):
+        return _get_partitioned(key).count(user)
+
+    def history_version(self, key, user=None):
+        return _get_partitioned(key).version(user)
+
+    def rewrite_records(self, key, records):
+        return _get_partitioned(key).rewrite(records)
+
+def _record_user(record):
+    if not isinstance(record, dict): return None
+    return record.get("user") or record.get("autor") or record.get("author")
+
+def _record_created(record):
+    if not isinstance(record, dict): return None
+    return record.get("data") or record.get("created") or record.get("ts")
+
+class SqliteStorage:
+    name = "sqlite"
+
+    # tabelas de registros: mesmo formato, indexadas por usuário e data
+    RECORD_TABLES = {
+        "SOUL_METRICS": "soul_metrics",
+    }
+    DOC_TABLES = {
+        "CONFIG": ("config", "name"),
+        "USERS_DB": ("users", "username"),
+        "STATS_METRICS": ("stats", "name"),
+    }
+    # contagem de humor por mês/semana, mantida por triggers a cada insert/delete
+    AGGREGATE_TABLES = {"SOUL_METRICS": "soul_metrics_agg"}
+    _MOOD_SQL = "coalesce(json_extract({0}.payload, '$.humor'), json_extract({0}.payload, '$.estado'), '-')"
+    _BUCKETS_SQL = (
+        ("month", "substr({0}.created, 1, 7)"),
+        ("week", "ifnull(date({0}.created, 'weekday 0', '-6 days'), '')"),
+    )
+
+    def __init__(self, path=SQLITE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._ensure_schema()
+
+    def _conn(self):
+        # uma conexão por thread; o cache de statements do sqlite3 reaproveita
+        # os prepared statements porque o SQL de cada tabela é constante
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write_tx(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_schema(self):
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS meta(name TEXT PRIMARY KEY, value TEXT)")
+        for table, col in self.DOC_TABLES.values():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table}({col} TEXT PRIMARY KEY, payload TEXT)")
+            conn.execute("INSERT OR IGNORE INTO meta(name, value) VALUES (?, '0')", (f"{table}_version",))
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN "
+                    f"UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = '{table}_version'; END"
+                )
+        for table in self.RECORD_TABLES.values():
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user TEXT, created TEXT, payload TEXT)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_user_created ON {table}(user, created)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table}(created)")
+        for key, agg in self.AGGREGATE_TABLES.items():
+            self._ensure_aggregates(conn, self.RECORD_TABLES[key], agg)
+
+    def _ensure_aggregates(self, conn, table, agg):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {agg}(user TEXT, period TEXT, bucket TEXT, humor TEXT, n INTEGER, "
+            "PRIMARY KEY(user, period, bucket, humor)) WITHOUT ROWID"
+        )
+        for event, row, delta in (("INSERT", "NEW", 1), ("DELETE", "OLD", -1)):
+            steps = "".join(
+                f"INSERT INTO {agg}(user, period, bucket, humor, n) VALUES (ifnull({row}.user, ''), '{period}', "
+                f"{bucket.format(row)}, {self._MOOD_SQL.format(row)}, {delta}) "
+                f"ON CONFLICT(user, period, bucket, humor) DO UPDATE SET n = n + {delta}; "
+                for period, bucket in self._BUCKETS_SQL
+            )
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_agg_{event.lower()} AFTER {event} ON {table} BEGIN {steps}END")
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN "
+                f"UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = '{table}_version'; END"
+            )
+        conn.execute("INSERT OR IGNORE INTO meta(name, value) VALUES (?, '0')", (f"{table}_version",))
+        if conn.execute("SELECT 1 FROM meta WHERE name = ?", (f"{agg}_ready",)).fetchone():
+            return
+        # banco criado antes dos triggers: preenche os agregados uma vez
+        with self._write_tx() as tx:
+            tx.execute(f"DELETE FROM {agg}")
+            for period, bucket in self._BUCKETS_SQL:
+                tx.execute(
+                    f"INSERT INTO {agg}(user, period, bucket, humor, n) SELECT ifnull(t.user, ''), '{period}', "
+                    f"{bucket.format('t')}, {self._MOOD_SQL.format('t')}, COUNT(*) FROM {table} t GROUP BY 1, 3, 4"
+                )
+            tx.execute("INSERT OR REPLACE INTO meta(name, value) VALUES (?, '1')", (f"{agg}_ready",))
+
+    def get_meta(self, name, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, name, value):
+        self._conn().execute("INSERT OR REPLACE INTO meta(name, value) VALUES (?, ?)", (name, value))
+
+    def read_doc(self, key):
+        table, col = self.DOC_TABLES[key]
+        rows = self._conn().execute(f"SELECT {col}, payload FROM {table}").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def get_doc_item(self, key, item, default=None):
+        table, col = self.DOC_TABLES[key]
+        row = self._conn().execute(f"SELECT payload FROM {table} WHERE {col} = ?", (item,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def count_doc_items(self, key):
+        table, _ = self.DOC_TABLES[key]
+        return self._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _replace_doc(self, conn, key, old, new):
+        table, col = self.DOC_TABLES[key]
+        removed = [(k,) for k in old if k not in new]
+        changed = [(k, json.dumps(v, ensure_ascii=False)) for k, v in new.items() if k not in old or old[k] != v]
+        if removed:
+            conn.executemany(f"DELETE FROM {table} WHERE {col} = ?", removed)
+        if changed:
+            conn.executemany(f"INSERT OR REPLACE INTO {table}({col}, payload) VALUES (?, ?)", changed)
+
+    def write_doc(self, key, data):
+        try:
+            with self._write_tx() as conn:
+                self._replace_doc(conn, key, self.read_doc(key), data)
+            return True
+        except Exception as e:
+            logging.error(f"Erro SQLite write_doc {key}: {e}")
+            return False
+
+    def insert_doc_item(self, key, item, value):
+        table, col = self.DOC_TABLES[key]
+        try:
+            cur = self._conn().execute(
+                f"INSERT INTO {table}({col}, payload) VALUES (?, ?) ON CONFLICT({col}) DO NOTHING",
+                (item, json.dumps(value, ensure_ascii=False))
+            )
+            return cur.rowcount == 1
+        except Exception as e:
+            logging.error(f"Erro SQLite insert_doc_item {key}: {e}")
+            return None
+
+    def set_doc_item(self, key, item, value):
+        table, col = self.DOC_TABLES[key]
+        try:
+            self._conn().execute(
+                f"INSERT OR REPLACE INTO {table}({col}, payload) VALUES (?, ?)", (item, json.dumps(value, ensure_ascii=False))
+            )
+            return True
+        except Exception as e:
+            logging.error(f"Erro SQLite set_doc_item {key}: {e}")
+            return False
+
+    def doc_version(self, key):
+        # contador mantido por triggers na tabela do documento
+        table, _ = self.DOC_TABLES[key]
+        return self.get_meta(f"{table}_version")
+
+    def update_doc(self, key, fn):
+        try:
+            with self._write_tx() as conn:
+                old = self.read_doc(key)
+                doc = dict(old)
+                if fn(doc) is False:
+                    return False
+                self._replace_doc(conn, key, old, doc)
+            return True
+        except Exception as e:
+            logging.error(f"Erro SQLite update_doc {key}: {e}")
+            return False
+
+    def _record_rows(self, records):
+        return [(_record_user(r), _record_created(r) or "", json.dumps(r, ensure_ascii=False)) for r in records]
+
+    def append(self, key, record):
+        table = self.RECORD_TABLES[key]
+        try:
+            self._conn().execute(
+                f"INSERT INTO {table}(user, created, payload) VALUES (?, ?, ?)", self._record_rows([record])[0]
+            )
+            return True
+        except Exception as e:
+            logging.error(f"Erro SQLite append {key}: {e}")
+            return False
+
+    def read_records(self, key):
+        table = self.RECORD_TABLES[key]
+        rows = self._conn().execute(f"SELECT payload FROM {table} ORDER BY id").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def tail(self, key, n, user=None):
+        table = self.RECORD_TABLES[key]
+        if n <= 0: return []
+        if user is None:
+            rows = self._conn().execute(f"SELECT payload FROM {table} ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+        else:
+            rows = self._conn().execute(
+                f"SELECT payload FROM {table} WHERE user = ? OR user IS NULL ORDER BY created DESC, id DESC LIMIT ?",
+                (user, n)
+            ).fetchall()
+        return [json.loads(r[0]) for r in reversed(rows)]
+
+    def _visible_sql(self, user):
+        # o usuário vê os próprios registros e os antigos sem usuário; None = todos
+        if user is None:
+            return "1", ()
+        return "(user = ? OR user IS NULL)", (user,)
+
+    def page(self, key, user, limit, cursor=None):
+        table = self.RECORD_TABLES[key]
+        where, params = self._visible_sql(user)
+        if cursor:
+            created, _, last_id = cursor.rpartition("|")
+            where += " AND (created < ? OR (created = ? AND id < ?))"
+            params += (created, created, int(last_id))
+        rows = self._conn().execute(
+            f"SELECT id, created, payload FROM {table} WHERE {where} ORDER BY created DESC, id DESC LIMIT ?",
+            params + (limit + 1,)
+        ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][1]}|{rows[-1][0]}" if more and rows else None
+        return [json.loads(r[2]) for r in rows], next_cursor
+
+    def window(self, key, user, start, end):
+        table = self.RECORD_TABLES[key]
+        where, params = self._visible_sql(user)
+        rows = self._conn().execute(
+            f"SELECT payload FROM {table} WHERE {where} AND created >= ? AND created < ? ORDER BY created, id",
+            params + (start, end)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def aggregates(self, key, user, period="month"):
+        agg = self.AGGREGATE_TABLES[key]
+        where, params = ("1", ()) if user is None else ("user IN (?, '')", (user,))
+        rows = self._conn().execute(
+            f"SELECT bucket, humor, SUM(n) FROM {agg} WHERE period = ? AND {where} "
+            "GROUP BY bucket, humor HAVING SUM(n) > 0 ORDER BY bucket",
+            (period,) + params
+        ).fetchall()
+        merged = {}
+        for bucket, mood, n in rows:
+            merged.setdefault(bucket, {})[mood] = n
+        return merged
+
+    def count_records(self, key, user=None):
+        table = self.RECORD_TABLES[key]
+        where, params = self._visible_sql(user)
+        return self._conn().execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+
+    def history_version(self, key, user=None):
+        table = self.RECORD_TABLES[key]
+        if user is None:
+            return self.get_meta(f"{table}_version")
+        where, params = self._visible_sql(user)
+        return tuple(self._conn().execute(f"SELECT COUNT(*), MAX(id) FROM {table} WHERE {where}", params).fetchone())
+
+    def rewrite_records(self, key, records):
+        table = self.RECORD_TABLES[key]
+        try:
+            with self._write_tx() as conn:
+                conn.execute(f"DELETE FROM {table}")
+                conn.executemany(
+                    f"INSERT INTO {table}(user, created, payload) VALUES (?, ?, ?)", self._record_rows(records)
+                )
+            return True
+        except Exception as e:
+            logging.error(f"Erro SQLite rewrite {key}: {e}")
+            return False
+
+def migrate_json_to_sqlite(target=None, force=False):
+    target = target or SqliteStorage()
+    if target.get_meta("migrated_from_json") and not force:
+        return False
+    source = JsonStorage()
+    with target._write_tx() as conn:
+        for key in DOC_KEYS:
+            doc = source.read_doc(key)
+            if isinstance(doc, dict):
+                target._replace_doc(conn, key, target.read_doc(key), doc)
+        for key in RECORD_KEYS:
+            table = target.RECORD_TABLES[key]
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                f"INSERT INTO {table}(user, created, payload) VALUES (?, ?, ?)",
+                target._record_rows(source.read_records(key))
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO meta(name, value) VALUES (?, ?)",
+            ("migrated_from_json", datetime.now().isoformat(timespec="seconds"))
+        )
+    logging.info(f"Migração JSON -> SQLite concluída em {target.path}.")
+    return True
+
+_STORAGE = None
+_STORAGE_LOCK = threading.Lock()
+
+def _selected_backend():
+    name = os.environ.get("PREGADOR_STORAGE")
+    if not name:
+        name = _read_json_safe(DB_FILES["CONFIG"]).get("storage_backend", "json")
+    return str(name).lower()
+
+def set_storage(storage):
+    # troca o backend do processo (benchmarks, ferramentas de manutenção)
+    global _STORAGE
+    with _STORAGE_LOCK:
+        _STORAGE = storage
+        return storage
+
+def get_storage():
+    global _STORAGE
+    with _STORAGE_LOCK:
+        if _STORAGE is None:
+            if _selected_backend() == "sqlite":
+                _STORAGE = SqliteStorage()
+                migrate_json_to_sqlite(_STORAGE)
+            else:
+                _STORAGE = JsonStorage()
+        return _STORAGE
+
+# Pastas e arquivos iniciais são conferidos uma vez por processo (o flag em
+# memória evita repetir a cada rerun do Streamlit). O selo em User_Data só
+# pula as migrações: incrementar quando surgir uma migração nova.
+GENESIS_VERSION = "6"
+GENESIS_STAMP = os.path.join(DIRECTORY_STRUCTURE["USER_CONFIG"], ".genesis_version")
+_GENESIS_DONE = False
+_GENESIS_LOCK = threading.Lock()
+
+def _genesis_stamp_ok():
+    try:
+        with open(GENESIS_STAMP, "r", encoding="utf-8") as f:
+            return f.read().strip() == GENESIS_VERSION
+    except OSError:
+        return False
+
+def genesis_filesystem_integrity_check(force=False):
+    global _GENESIS_DONE
+    with _GENESIS_LOCK:
+        if _GENESIS_DONE and not force:
+            return False
+        _genesis_full_check()
+        if force or not _genesis_stamp_ok():
+            _genesis_migrations()
+            _write_text_atomic(GENESIS_STAMP, GENESIS_VERSION)
+        _GENESIS_DONE = True
+        return True
+
+def _genesis_full_check():
     logging.info("Genesis: checagem de integridade iniciada.")
     for key, path in DIRECTORY_STRUCTURE.items():
         os.makedirs(path, exist_ok=True)
@@ -84,6 +925,7 @@ def genesis_filesystem_integrity_check():
             "font_family": "Inter",
             "security_level": "High",
             "backup_frequency": "Daily",
+            "storage_backend": "json",
             "module_active_word": True,
             "module_active_network": True,
             "rotina_pastoral": [
@@ -95,14 +937,26 @@ def genesis_filesystem_integrity_check():
         }
         _write_json_atomic(DB_FILES["CONFIG"], default_config)
 
+    from .auth import new_user_record
     if not os.path.exists(DB_FILES["USERS_DB"]):
-        admin_hash = hashlib_sha256("admin")
-        _write_json_atomic(DB_FILES["USERS_DB"], {"ADMIN": admin_hash})
+        _write_json_atomic(DB_FILES["USERS_DB"], {"ADMIN": new_user_record("admin", role="ADMIN")})
+
+def _genesis_migrations():
+    from .auth import migrate_legacy_users
+    for key in PARTITION_DIRS:
+        _get_partitioned(key)._open()  # particiona o histórico antigo
+    from .members import get_member_registry
+    from .feed import get_feed
+    get_member_registry()  # members.json -> membros.db
+    get_feed()             # feed_data.json -> feed.db
 
-    _ensure_empty_json_list(DB_FILES["NETWORK_FEED"])
-    _ensure_empty_json_list(DB_FILES["MEMBERS_DB"])
-    _ensure_empty_json_list(DB_FILES["SOUL_METRICS"])
+    get_storage()
+    migrate_legacy_users()  # db/users.json do app.py antigo -> USERS_DB
 
-def hashlib_sha256(value):
-    import hashlib
-    return hashlib.sha256(value.encode()).hexdigest()
\ No newline at end of file
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["migrate-sqlite"]:
+        ok = migrate_json_to_sqlite(force="--force" in sys.argv)
+        print("Migração concluída." if ok else "Banco já migrado (use --force para refazer).")
+    else:
+        print("Uso: python -m app_modules.core migrate-sqlite [--force]")
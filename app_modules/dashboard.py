@@ -1,11 +1,12 @@
 import streamlit as st
 from datetime import datetime
-from .core import _read_json_safe, _write_json_atomic, DB_FILES
+from .core import get_storage
+from .analytics import get_mood_report, ROLLING_DAYS
 from .utils import TextUtils
 
 def render_dashboard():
     st.title("🛡️ Painel de Controle e Cuidado")
-    tabs_care = st.tabs(["📝 Check-in Emocional", "⚖️ Teoria da Permissão", "📋 Rotina & Liturgia"])
+    tabs_care = st.tabs(["📝 Check-in Emocional", "📈 Tendências", "⚖️ Teoria da Permissão", "📋 Rotina & Liturgia"])
 
     # Check-in
     with tabs_care[0]:
@@ -15,40 +16,74 @@ def render_dashboard():
             input_mood = st.select_slider("Como você se sente?", options=["Esgotamento","Cansaço","Neutro","Bem","Pleno"])
             input_note = st.text_area("Observações do dia", height=100)
             if st.button("REGISTRAR ESTADO"):
-                data = _read_json_safe(DB_FILES["SOUL_METRICS"])
-                if isinstance(data, list): data = {"historico": data}
-                elif not isinstance(data, dict): data = {"historico": []}
-                data.setdefault("historico", []).append({
+                registro = {
+                    "user": st.session_state.get("current_user"),
                     "data": datetime.now().strftime("%Y-%m-%d %H:%M"),
                     "humor": input_mood,
                     "nota": input_note
-                })
-                if _write_json_atomic(DB_FILES["SOUL_METRICS"], data):
+                }
+                if get_storage().append("SOUL_METRICS", registro):
+                    st.session_state["soul_cursors"] = [None]
                     st.success("Registro gravado.")
                 else:
                     st.error("Erro ao gravar.")
 
         with c2:
+            user = st.session_state.get("current_user")
+            storage = get_storage()
+            month_key = datetime.now().strftime("%Y-%m")
+            month_counts = storage.aggregates("SOUL_METRICS", user, "month").get(month_key, {})
+            if month_counts:
+                st.caption("Este mês: " + " · ".join(f"{mood}: {n}" for mood, n in month_counts.items()))
             st.markdown("**Histórico Recente**")
-            data = _read_json_safe(DB_FILES["SOUL_METRICS"])
-            history = data.get("historico", [])[-5:] if isinstance(data, dict) else (data[-5:] if isinstance(data, list) else [])
-            for item in reversed(history):
-                if isinstance(item, dict):
-                    date = item.get('data','-'); humor = item.get('humor', item.get('estado','-')); nota = item.get('nota', item.get('obs','-'))
-                else:
-                    date = str(item); humor = '-'; nota = '-'
-                st.info(f"{date} | Estado: {humor} | Obs: {nota}")
+            # cada "carregar mais" guarda só o cursor; nenhuma página antiga é relida inteira
+            cursors = st.session_state.setdefault("soul_cursors", [None])
+            next_cursor = None
+            for cursor in cursors:
+                history, next_cursor = storage.page("SOUL_METRICS", user, 5, cursor)
+                for item in history:
+                    if isinstance(item, dict):
+                        date = item.get('data','-'); humor = item.get('humor', item.get('estado','-')); nota = item.get('nota', item.get('obs','-'))
+                    else:
+                        date = str(item); humor = '-'; nota = '-'
+                    st.info(f"{date} | Estado: {humor} | Obs: {nota}")
+            if next_cursor and st.button("Carregar mais"):
+                cursors.append(next_cursor)
+                st.rerun()
 
-    # Permissão & Rotina: (mantener lo principal, puedes extender)
+    # Tendências: relatório em cache pela versão do histórico (só recalcula após novo check-in)
     with tabs_care[1]:
+        user = st.session_state.get("current_user")
+        report = get_mood_report(user)
+        if report is None:
+            st.info("Instale numpy e pandas para ver as tendências do humor.")
+        elif "error" in report:
+            st.error(f"Não foi possível calcular as tendências: {report['error']}")
+        elif not report["entries"]:
+            st.info("Ainda não há check-ins suficientes.")
+        else:
+            user_row = report["users"].loc[user] if user in report["users"].index else report["users"].iloc[0]
+            if user_row["alert"]:
+                st.warning(f"{int(user_row['current_streak'])} check-ins seguidos em Esgotamento/Cansaço. Considere pausar e buscar apoio.")
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Registros", report["entries"])
+            m2.metric(f"Média ({ROLLING_DAYS} dias)", f"{report['trend']['rolling'].iloc[-1]:.1f} / 5")
+            m3.metric("Maior sequência de esgotamento", int(user_row["longest_streak"]))
+            st.line_chart(report["trend"].rename(columns={"mean": "dia", "rolling": f"média {ROLLING_DAYS}d"}))
+            st.markdown("**Humor por dia da semana**")
+            st.bar_chart(report["weekday"]["média"])
+            st.caption(" · ".join(f"{mood}: {n}" for mood, n in report["distribution"].items()))
+
+    # Permissão & Rotina: (mantener lo principal, puedes extender)
+    with tabs_care[2]:
         st.markdown("Teoria da Permissão - versão modular")
         p_fail = st.slider("Permissão para Falhar/Não Saber", 0, 100, 50)
         p_feel = st.slider("Permissão para Sentir Dor/Ira", 0, 100, 50)
         p_rest = st.slider("Permissão para Parar/Descansar", 0, 100, 50)
         st.metric("Média de Permissão", f"{(p_fail+p_feel+p_rest)//3}%")
 
-    with tabs_care[2]:
-        cfg = _read_json_safe(DB_FILES["CONFIG"])
+    with tabs_care[3]:
+        cfg = get_storage().read_doc("CONFIG")
         routine = cfg.get("rotina_pastoral", [])
         st.subheader("Liturgia Pessoal & Rotina")
         progress = 0
@@ -0,0 +1,189 @@
+import os, io, time, logging, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+from .startup import lazy_import
+
+EXPORT_FORMATS = ("docx", "pdf")
+EXPORT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+EXPORT_INLINE_MAX = 2          # lotes pequenos não pagam a partida dos processos
+EXPORT_FONT = "Georgia"        # DOCX; o PDF usa Times (fonte base, cobre o português)
+
+_BULLETS = ("- ", "• ", "* ")
+
+def _blocks(text):
+    """[(tipo, texto)] do esboço: 'h' título de seção, 'li' item, 'p' parágrafo."""
+    out = []
+    for raw in text.replace("\r\n", "\n").split("\n\n"):
+        lines = [line.strip() for line in raw.split("\n") if line.strip()]
+        if not lines:
+            continue
+        if len(lines) == 1 and (lines[0].startswith("#") or (lines[0].isupper() and len(lines[0]) <= 80)):
+            out.append(("h", lines[0].lstrip("# ")))
+            continue
+        para = []
+        for line in lines:
+            if line.startswith(_BULLETS):
+                if para:
+                    out.append(("p", " ".join(para)))
+                    para = []
+                out.append(("li", line[2:].strip()))
+            else:
+                para.append(line)
+        if para:
+            out.append(("p", " ".join(para)))
+    return out
+
+# ---------- renderizadores (um conjunto por processo) ----------
+# estilos, template e fontes são montados uma vez por processo e reaproveitados
+_WORKER = {}
+
+def _docx_template():
+    if "docx" not in _WORKER:
+        docx = lazy_import("docx")
+        if docx is None:
+            raise RuntimeError("python-docx não instalado")
+        shared = lazy_import("docx.shared")
+        doc = docx.Document()
+        normal = doc.styles["Normal"]
+        normal.font.name = EXPORT_FONT
+        normal.font.size = shared.Pt(12)
+        for name in ("Title", "Heading 1"):
+            doc.styles[name].font.name = EXPORT_FONT
+            doc.styles[name].font.color.rgb = shared.RGBColor(0x8B, 0x6F, 0x1E)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        _WORKER["docx"] = (docx, buffer.getvalue())
+    return _WORKER["docx"]
+
+def _render_docx(title, blocks, target):
+    docx, template = _docx_template()
+    doc = docx.Document(io.BytesIO(template))
+    # o python-docx procura o estilo pelo nome a cada parágrafo; resolve uma vez só
+    styles = {"h": doc.styles["Heading 1"], "li": doc.styles["List Bullet"], "p": None}
+    doc.add_paragraph(title, style=doc.styles["Title"])
+    for kind, text in blocks:
+        doc.add_paragraph(text, style=styles[kind])
+    doc.save(target)
+
+def _pdf_styles():
+    if "pdf" not in _WORKER:
+        platypus = lazy_import("reportlab.platypus")
+        if platypus is None:
+            _WORKER["pdf"] = None
+        else:
+            styles = lazy_import("reportlab.lib.styles")
+            pagesizes = lazy_import("reportlab.lib.pagesizes")
+            base = styles.getSampleStyleSheet()
+            _WORKER["pdf"] = (platypus, pagesizes.A4, {
+                "title": styles.ParagraphStyle("SermaoTitulo", parent=base["Title"], fontName="Times-Bold"),
+                "h": styles.ParagraphStyle("SermaoSecao", parent=base["Heading2"], fontName="Times-Bold"),
+                "p": styles.ParagraphStyle("SermaoTexto", parent=base["BodyText"], fontName="Times-Roman",
+                                           fontSize=12, leading=16, spaceAfter=6),
+                "li": styles.ParagraphStyle("SermaoItem", parent=base["BodyText"], fontName="Times-Roman",
+                                            fontSize=12, leading=16, leftIndent=14, bulletIndent=4),
+            })
+    return _WORKER["pdf"]
+
+def _render_pdf(title, blocks, target):
+    loaded = _pdf_styles()
+    if loaded is None:
+        return _render_pdf_fpdf(title, blocks, target)
+    platypus, page, styles = loaded
+    story = [platypus.Paragraph(escape(title), styles["title"])]
+    for kind, text in blocks:
+        story.append(platypus.Paragraph(escape(text), styles[kind], bulletText="•" if kind == "li" else None))
+    # o reportlab escreve direto no arquivo; o documento inteiro não passa por um buffer
+    platypus.SimpleDocTemplate(target, pagesize=page, title=title).build(story)
+
+def _render_pdf_fpdf(title, blocks, target):
+    fpdf = lazy_import("fpdf", "FPDF")
+    if fpdf is None:
+        raise RuntimeError("nem reportlab nem fpdf instalados")
+    latin = lambda s: s.encode("latin-1", "replace").decode("latin-1")
+    pdf = fpdf()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Times", "B", 18)
+    pdf.multi_cell(0, 9, latin(title))
+    for kind, text in blocks:
+        pdf.set_font("Times", "B" if kind == "h" else "", 14 if kind == "h" else 12)
+        pdf.multi_cell(0, 7, latin(f"• {text}" if kind == "li" else text))
+        pdf.ln(2)
+    pdf.output(target)
+
+_RENDERERS = {"docx": _render_docx, "pdf": _render_pdf}
+
+def _export_one(src, out_dir, formats):
+    """Roda no processo de trabalho: lê o .txt e grava um arquivo por formato."""
+    title = os.path.splitext(os.path.basename(src))[0]
+    started = time.perf_counter()
+    try:
+        with open(src, "r", encoding="utf-8", errors="replace") as f:
+            blocks = _blocks(f.read())
+    except OSError as e:
+        return [{"origem": src, "formato": fmt, "saida": None, "segundos": 0.0, "erro": str(e)} for fmt in formats]
+    read_time = time.perf_counter() - started
+    results = []
+    for fmt in formats:
+        target = os.path.join(out_dir, f"{title}.{fmt}")
+        started = time.perf_counter()
+        tmp = f"{target}.tmp.{os.getpid()}"
+        try:
+            _RENDERERS[fmt](title, blocks, tmp)
+            os.replace(tmp, target)
+            results.append({"origem": src, "formato": fmt, "saida": target,
+                             "segundos": round(read_time + time.perf_counter() - started, 4), "erro": None})
+        except Exception as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            results.append({"origem": src, "formato": fmt, "saida": None,
+                            "segundos": round(time.perf_counter() - started, 4), "erro": str(e)})
+    return results
+
+def available_formats():
+    out = []
+    if lazy_import("docx") is not None:
+        out.append("docx")
+    if lazy_import("reportlab") is not None or lazy_import("fpdf") is not None:
+        out.append("pdf")
+    return out
+
+def export_sermons(paths, out_dir, formats=EXPORT_FORMATS, workers=EXPORT_WORKERS, progress=None):
+    """Exporta os .txt para out_dir; um registro por documento/formato, com o tempo de cada um.
+
+    Cada sermão é um trabalho independente num pool de processos (o
+    reportlab e o python-docx são puro Python, threads não escalariam).
+    progress(feitos, total) é chamado no processo principal.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths, formats = list(paths), tuple(formats)
+    results, done = [], 0
+    started = time.perf_counter()
+    if len(paths) <= EXPORT_INLINE_MAX or workers <= 1:
+        for src in paths:
+            results.extend(_export_one(src, out_dir, formats))
+            done += 1
+            if progress:
+                progress(done, len(paths))
+    else:
+        # spawn: o Streamlit mantém threads vivas, fork herdaria locks no meio do caminho
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths)), mp_context=ctx) as pool:
+            futures = [pool.submit(_export_one, src, out_dir, formats) for src in paths]
+            for future in as_completed(futures):
+                results.extend(future.result())
+                done += 1
+                if progress:
+                    progress(done, len(paths))
+    erros = sum(1 for r in results if r["erro"])
+    logging.info(f"Exportação: {len(paths)} sermões, {len(results) - erros} arquivos, {erros} erros "
+                 f"em {time.perf_counter() - started:.2f}s")
+    return results
+
+def export_folder(folder, out_dir, formats=EXPORT_FORMATS, workers=EXPORT_WORKERS, progress=None):
+    """Exporta todos os .txt de uma pasta (série/categoria)."""
+    try:
+        names = sorted(n for n in os.listdir(folder) if n.endswith(".txt"))
+    except OSError:
+        names = []
+    return export_sermons([os.path.join(folder, n) for n in names], out_dir, formats, workers, progress)
@@ -0,0 +1,250 @@
+import os, json, sqlite3, threading, logging
+from collections import deque
+from datetime import datetime
+from .core import DIRECTORY_STRUCTURE, DB_FILES, _read_legacy_records, _retire_legacy, _record_user, _record_created
+
+FEED_DB_PATH = os.path.join(DIRECTORY_STRUCTURE["NETWORK_LAYER"], "feed.db")
+FEED_RING_SIZE = 200
+FEED_PAGE_SIZE = 20
+FEED_REACTIONS = ("🙏", "❤️", "🔥", "🙌")
+
+class FeedEngine:
+    """Feed da Rede Ministerial em SQLite, com paginação por cursor.
+
+    O id da publicação é crescente, então serve de cursor e de ordem
+    temporal: page() anda para trás (id < cursor) e since() para frente
+    (id > cursor), pelo índice primário ou pelo índice (autor, id). As
+    FEED_RING_SIZE publicações mais recentes ficam num anel em memória; a
+    primeira página e a atualização incremental saem dele sem consultar o
+    banco. Triggers mantêm um contador de versão: se outro processo gravar,
+    o anel é recarregado (custo limitado ao tamanho do anel).
+    """
+
+    def __init__(self, path=FEED_DB_PATH, ring_size=FEED_RING_SIZE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._ring = deque(maxlen=ring_size)
+        self._ring_version = None
+        self._ring_complete = False  # o anel contém o feed inteiro
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS meta(name TEXT PRIMARY KEY, value TEXT);"
+            "INSERT OR IGNORE INTO meta(name, value) VALUES ('versao', '0');"
+            "CREATE TABLE IF NOT EXISTS posts(id INTEGER PRIMARY KEY AUTOINCREMENT, autor TEXT, created TEXT, "
+            "texto TEXT, reacoes TEXT, extra TEXT);"
+            "CREATE INDEX IF NOT EXISTS posts_autor ON posts(autor, id);"
+            "CREATE TABLE IF NOT EXISTS reacoes(post_id INTEGER, user TEXT, emoji TEXT, "
+            "PRIMARY KEY(post_id, user, emoji)) WITHOUT ROWID;"
+            "CREATE TRIGGER IF NOT EXISTS posts_versao AFTER INSERT ON posts BEGIN "
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'versao'; END;"
+            "CREATE TRIGGER IF NOT EXISTS posts_versao_del AFTER DELETE ON posts BEGIN "
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'versao'; END;"
+            "CREATE TRIGGER IF NOT EXISTS reacoes_versao AFTER INSERT ON reacoes BEGIN "
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'versao'; END;"
+            "CREATE TRIGGER IF NOT EXISTS reacoes_versao_del AFTER DELETE ON reacoes BEGIN "
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'versao'; END;"
+        )
+        self._migrate_legacy()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate_legacy(self):
+        legacy_path = DB_FILES["NETWORK_FEED"]
+        if not os.path.exists(legacy_path):
+            return
+        if self._conn().execute("SELECT 1 FROM posts LIMIT 1").fetchone():
+            return
+        records = sorted((r for r in _read_legacy_records(legacy_path) if isinstance(r, dict)),
+                         key=lambda r: _record_created(r) or "")
+        rows = []
+        for r in records:
+            extra = {k: v for k, v in r.items() if k not in ("user", "autor", "author", "data", "created", "ts", "texto")}
+            texto = r.get("texto") or extra.pop("mensagem", None) or extra.pop("conteudo", None) or extra.pop("msg", "")
+            rows.append((_record_user(r), _record_created(r) or "", texto, "{}", json.dumps(extra, ensure_ascii=False)))
+        if rows:
+            self._tx(lambda conn: conn.executemany(
+                "INSERT INTO posts(autor, created, texto, reacoes, extra) VALUES (?, ?, ?, ?, ?)", rows))
+        _retire_legacy(legacy_path)
+        logging.info(f"Rede Ministerial: {len(rows)} publicações migradas para {self.path}.")
+
+    # ---------- anel em memória ----------
+    def _version(self):
+        return self._conn().execute("SELECT value FROM meta WHERE name = 'versao'").fetchone()[0]
+
+    def _post(self, row):
+        post_id, autor, created, texto, reacoes, extra = row
+        post = json.loads(extra) if extra else {}
+        post.update(id=post_id, autor=autor, created=created, texto=texto, reacoes=json.loads(reacoes or "{}"))
+        return post
+
+    def _fresh_ring(self):
+        # chamado sob self._lock; devolve o anel em ordem decrescente de id
+        version = self._version()
+        if version != self._ring_version:
+            rows = self._conn().execute(
+                "SELECT id, autor, created, texto, reacoes, extra FROM posts ORDER BY id DESC LIMIT ?",
+                (self._ring.maxlen,)
+            ).fetchall()
+            self._ring.clear()
+            self._ring.extend(self._post(r) for r in rows)
+            self._ring_complete = len(rows) < self._ring.maxlen
+            self._ring_version = version
+        return self._ring
+
+    def _apply_local(self, version_before, apply):
+        # escrita própria: se ninguém mais gravou no meio, atualiza o anel no lugar
+        with self._lock:
+            version = self._version()
+            same = version_before is not None and self._ring_version == version_before
+            if same and int(version) == int(version_before) + 1:
+                apply()
+                self._ring_version = version
+            else:
+                self._ring_version = None
+
+    # ---------- escrita ----------
+    def post(self, autor, texto, **extra):
+        texto = (texto or "").strip()
+        if not texto:
+            raise ValueError("Publicação vazia.")
+        created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        version_before = self._ring_version
+        post_id = self._tx(lambda conn: conn.execute(
+            "INSERT INTO posts(autor, created, texto, reacoes, extra) VALUES (?, ?, ?, '{}', ?)",
+            (autor, created, texto, json.dumps(extra, ensure_ascii=False) if extra else None)
+        ).lastrowid)
+        post = dict(extra, id=post_id, autor=autor, created=created, texto=texto, reacoes={})
+
+        def apply():
+            # anel cheio: a mais antiga sai, então ele deixa de ter o feed inteiro
+            self._ring_complete = self._ring_complete and len(self._ring) < self._ring.maxlen
+            self._ring.appendleft(post)
+
+        self._apply_local(version_before, apply)
+        return post
+
+    def react(self, post_id, user, emoji):
+        """Alterna a reação do usuário; devolve as contagens atualizadas ou None se o post não existe."""
+        version_before = self._ring_version
+
+        def run(conn):
+            row = conn.execute("SELECT reacoes FROM posts WHERE id = ?", (post_id,)).fetchone()
+            if row is None:
+                return None
+            counts = json.loads(row[0] or "{}")
+            removed = conn.execute(
+                "DELETE FROM reacoes WHERE post_id = ? AND user = ? AND emoji = ?", (post_id, user, emoji)
+            ).rowcount
+            if removed:
+                counts[emoji] = counts.get(emoji, 1) - 1
+                if counts[emoji] <= 0:
+                    counts.pop(emoji)
+            else:
+                conn.execute("INSERT INTO reacoes(post_id, user, emoji) VALUES (?, ?, ?)", (post_id, user, emoji))
+                counts[emoji] = counts.get(emoji, 0) + 1
+            conn.execute("UPDATE posts SET reacoes = ? WHERE id = ?", (json.dumps(counts, ensure_ascii=False), post_id))
+            return counts
+
+        counts = self._tx(run)
+        if counts is not None:
+            def apply():
+                for post in self._ring:
+                    if post["id"] == post_id:
+                        post["reacoes"] = dict(counts)
+                        break
+            self._apply_local(version_before, apply)
+        return counts
+
+    def my_reactions(self, user, post_ids):
+        if not post_ids:
+            return {}
+        marks = ", ".join("?" * len(post_ids))
+        rows = self._conn().execute(
+            f"SELECT post_id, emoji FROM reacoes WHERE user = ? AND post_id IN ({marks})", (user, *post_ids)
+        ).fetchall()
+        mine = {}
+        for post_id, emoji in rows:
+            mine.setdefault(post_id, set()).add(emoji)
+        return mine
+
+    # ---------- leitura ----------
+    def page(self, limit=FEED_PAGE_SIZE, cursor=None, autor=None):
+        """Publicações mais novas primeiro; devolve (posts, cursor da próxima página)."""
+        before = int(cursor) if cursor else None
+        with self._lock:
+            ring = self._fresh_ring()
+            if autor is None and ring:
+                oldest = ring[-1]["id"]
+                if before is None or before > oldest:
+                    posts = [dict(p) for p in ring if before is None or p["id"] < before][:limit]
+                    if len(posts) == limit or self._ring_complete:
+                        return posts, self._next_cursor(posts, limit)
+        where, params = [], []
+        if autor is not None:
+            where.append("autor = ?")
+            params.append(autor)
+        if before is not None:
+            where.append("id < ?")
+            params.append(before)
+        rows = self._conn().execute(
+            f"SELECT id, autor, created, texto, reacoes, extra FROM posts "
+            f"WHERE {' AND '.join(where) or '1'} ORDER BY id DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        posts = [self._post(r) for r in rows]
+        return posts, self._next_cursor(posts, limit)
+
+    @staticmethod
+    def _next_cursor(posts, limit):
+        return str(posts[-1]["id"]) if len(posts) == limit else None
+
+    def since(self, cursor, limit=FEED_PAGE_SIZE * 5, autor=None):
+        """Publicações com id > cursor, da mais antiga para a mais nova (atualização incremental)."""
+        after = int(cursor or 0)
+        with self._lock:
+            ring = self._fresh_ring()
+            if autor is None and ring and (self._ring_complete or after >= ring[-1]["id"]):
+                return [dict(p) for p in reversed(ring) if p["id"] > after][:limit]
+        where, params = ["id > ?"], [after]
+        if autor is not None:
+            where.append("autor = ?")
+            params.append(autor)
+        rows = self._conn().execute(
+            f"SELECT id, autor, created, texto, reacoes, extra FROM posts WHERE {' AND '.join(where)} ORDER BY id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [self._post(r) for r in rows]
+
+    def authors(self):
+        rows = self._conn().execute(
+            "SELECT autor, COUNT(*) FROM posts WHERE autor IS NOT NULL GROUP BY autor ORDER BY autor"
+        ).fetchall()
+        return {a: n for a, n in rows}
+
+_FEED = None
+_FEED_LOCK = threading.Lock()
+
+def get_feed():
+    global _FEED
+    with _FEED_LOCK:
+        if _FEED is None:
+            _FEED = FeedEngine()
+        return _FEED
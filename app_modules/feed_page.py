@@ -0,0 +1,54 @@
+import streamlit as st
+from .feed import get_feed, FEED_PAGE_SIZE, FEED_REACTIONS
+
+def render_network():
+    st.title("🤝 Rede Ministerial")
+    feed = get_feed()
+    user = st.session_state.get("current_user")
+
+    with st.form("nova_publicacao", clear_on_submit=True):
+        texto = st.text_area("Compartilhe com a rede", height=100)
+        if st.form_submit_button("PUBLICAR") and texto.strip():
+            feed.post(user, texto)
+            st.session_state["feed_cursores"] = [None]
+
+    autores = feed.authors()
+    autor = st.selectbox("Publicações de", [""] + list(autores), format_func=lambda a: a or "Toda a rede")
+    if st.session_state.get("feed_autor") != autor:
+        st.session_state["feed_autor"] = autor
+        st.session_state["feed_cursores"] = [None]
+    cursores = st.session_state.setdefault("feed_cursores", [None])
+
+    # atualização incremental: só conta o que chegou depois do topo já exibido
+    topo = st.session_state.get("feed_topo")
+    if topo:
+        novas = feed.since(topo, autor=autor or None)
+        if novas and st.button(f"🔄 {len(novas)} novas publicações"):
+            st.session_state["feed_cursores"] = [None]
+            st.rerun()
+
+    posts, next_cursor = [], None
+    for cursor in cursores:
+        pagina, next_cursor = feed.page(FEED_PAGE_SIZE, cursor, autor=autor or None)
+        posts.extend(pagina)
+    if posts and cursores == [None]:
+        st.session_state["feed_topo"] = str(posts[0]["id"])
+
+    minhas = feed.my_reactions(user, [p["id"] for p in posts])
+    for post in posts:
+        with st.container(border=True):
+            st.markdown(f"**{post.get('autor') or 'Anônimo'}** · {post.get('created', '')}")
+            st.write(post.get("texto", ""))
+            cols = st.columns(len(FEED_REACTIONS) + 2)
+            for col, emoji in zip(cols, FEED_REACTIONS):
+                n = post["reacoes"].get(emoji, 0)
+                marcado = emoji in minhas.get(post["id"], ())
+                label = f"{emoji} {n}" if n else emoji
+                if col.button(label, key=f"reacao_{post['id']}_{emoji}", type="primary" if marcado else "secondary"):
+                    feed.react(post["id"], user, emoji)
+                    st.rerun()
+    if not posts:
+        st.info("Nenhuma publicação ainda.")
+    if next_cursor and st.button("Carregar mais"):
+        cursores.append(next_cursor)
+        st.rerun()
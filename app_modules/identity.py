@@ -0,0 +1,194 @@
+import os, json, atexit, logging, threading
+from datetime import datetime
+from .core import SYSTEM_ROOT, _read_json_safe, _write_json_atomic, _file_lock, _stat_signature
+
+IDENTITY_DIR = os.path.join(SYSTEM_ROOT, "identity")
+IDENTITY_FLUSH_EVERY = 20      # entradas de histórico pendentes antes de gravar
+IDENTITY_FLUSH_SECONDS = 30    # ou, no máximo, esse tempo depois da primeira alteração pendente (timer)
+IDENTITY_TAIL_BLOCK = 8192
+
+def _tail_lines(path, n):
+    # lê o arquivo de trás para frente: custo proporcional a n, não ao tamanho
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return []
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos, data = f.tell(), b""
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(IDENTITY_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # primeira linha pode estar cortada
+    return lines[-n:] if n > 0 else []
+
+class IdentityRecord:
+    """Identidade de um usuário em memória.
+
+    O perfil fica em identity/<USER>.json e o histórico em
+    identity/<USER>.history.jsonl (só acréscimo, lido sob demanda).
+    Alterações ficam pendentes e são gravadas juntas por flush().
+    """
+
+    def __init__(self, core, user, profile, signature):
+        self._core = core
+        self.user = user
+        self.profile = profile
+        self._signature = signature
+        self._lock = threading.RLock()
+        self._pending = []
+        self._dirty = False
+        self._timer = None
+
+    def __getitem__(self, key):
+        return self.profile[key]
+
+    def get(self, key, default=None):
+        return self.profile.get(key, default)
+
+    def update(self, **fields):
+        with self._lock:
+            self.profile.update(fields)
+            self._dirty = True
+            self._maybe_flush()
+
+    def add_history(self, entry):
+        with self._lock:
+            entry = dict(entry)
+            entry.setdefault("created", datetime.utcnow().isoformat())
+            self._pending.append(entry)
+            self._maybe_flush()
+
+    def history(self, n=20):
+        """Últimas n entradas, da mais antiga para a mais nova."""
+        with self._lock:
+            pending = list(self._pending)
+        if len(pending) >= n:
+            return pending[-n:] if n > 0 else []
+        stored = []
+        for raw in _tail_lines(self._core._history_path(self.user), n - len(pending)):
+            try:
+                stored.append(json.loads(raw))
+            except ValueError:
+                logging.error(f"Identidade: linha inválida no histórico de {self.user}")
+        return stored + pending
+
+    @property
+    def dirty(self):
+        return self._dirty or bool(self._pending)
+
+    def _maybe_flush(self):
+        if len(self._pending) >= IDENTITY_FLUSH_EVERY:
+            self.flush()
+        else:
+            self._schedule()
+
+    def _schedule(self):
+        # o timer nasce com a primeira alteração pendente; flush() o desarma
+        if self._timer is None:
+            self._timer = threading.Timer(IDENTITY_FLUSH_SECONDS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return True
+            ok = True
+            profile_path = self._core._profile_path(self.user)
+            with _file_lock(profile_path):
+                if self._pending:
+                    try:
+                        with open(self._core._history_path(self.user), "a", encoding="utf-8") as f:
+                            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self._pending))
+                        self.profile["history_count"] = self.profile.get("history_count", 0) + len(self._pending)
+                        self._pending.clear()
+                        self._dirty = True
+                    except OSError as e:
+                        logging.error(f"Identidade: erro ao gravar histórico de {self.user}: {e}")
+                        ok = False
+                if self._dirty:
+                    if _write_json_atomic(profile_path, self.profile, indent=2):
+                        self._dirty = False
+                        self._signature = _stat_signature(profile_path)
+                    else:
+                        ok = False
+            if not ok:
+                self._schedule()  # tenta de novo mais tarde
+            return ok
+
+class SpiritualIdentity:
+    """Núcleo de identidade: um IdentityRecord por usuário, compartilhado pelas sessões."""
+
+    def __init__(self, path=IDENTITY_DIR):
+        self.PATH = path
+        self._lock = threading.Lock()
+        self._records = {}
+        os.makedirs(self.PATH, exist_ok=True)
+
+    def _profile_path(self, user):
+        return os.path.join(self.PATH, f"{user}.json")
+
+    def _history_path(self, user):
+        return os.path.join(self.PATH, f"{user}.history.jsonl")
+
+    def load(self, user):
+        with self._lock:
+            record = self._records.get(user)
+            path = self._profile_path(user)
+            signature = _stat_signature(path)
+            if record is not None and (record.dirty or record._signature == signature):
+                return record
+            if signature is None:
+                profile = {
+                    "user": user,
+                    "calling": "",
+                    "tradition": "Reformada",
+                    "created": datetime.utcnow().isoformat(),
+                    "history_count": 0,
+                }
+                _write_json_atomic(path, profile, indent=2)
+            else:
+                profile = _read_json_safe(path, default={}, use_cache=False) or {}
+                if "history" in profile:
+                    profile = self._split_history(user, profile)
+            record = IdentityRecord(self, user, profile, _stat_signature(path))
+            self._records[user] = record
+            return record
+
+    def _split_history(self, user, profile):
+        # formato antigo: histórico dentro do perfil -> segmento .history.jsonl
+        profile = dict(profile)
+        history = profile.pop("history") or []
+        with _file_lock(self._profile_path(user)):
+            if history:
+                with open(self._history_path(user), "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in history))
+            profile["history_count"] = profile.get("history_count", 0) + len(history)
+            _write_json_atomic(self._profile_path(user), profile, indent=2)
+        logging.info(f"Identidade: histórico de {user} separado ({len(history)} entradas).")
+        return profile
+
+    def flush_all(self):
+        with self._lock:
+            records = list(self._records.values())
+        for record in records:
+            record.flush()
+
+_IDENTITY = None
+_IDENTITY_LOCK = threading.Lock()
+
+def get_identity_core():
+    global _IDENTITY
+    with _IDENTITY_LOCK:
+        if _IDENTITY is None:
+            _IDENTITY = SpiritualIdentity()
+            atexit.register(_IDENTITY.flush_all)
+        return _IDENTITY
@@ -0,0 +1,275 @@
+import os, re, sys, json, html, time, hashlib, logging, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from .core import DIRECTORY_STRUCTURE, _write_text_atomic
+from .utils import TextUtils
+from .startup import lazy_import
+
+IMPORT_EXTENSIONS = (".docx", ".html", ".htm")
+IMPORT_BATCH = 64              # arquivos convertidos/gravados/registrados no journal por vez
+IMPORT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+IMPORT_JOURNAL_DIR = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], "importacao")
+
+_BLOCK_TAGS = ("p", "div", "section", "article", "blockquote", "pre", "table", "tr", "ul", "ol")
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+# ---------- conversão (roda nos processos de trabalho) ----------
+def _tidy(text):
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+def _html_to_text(markup):
+    """Texto do esboço: blocos separados por linha em branco, '# ' em títulos e '- ' em itens."""
+    bs4 = lazy_import("bs4")
+    if bs4 is None:
+        return _tidy(html.unescape(TextUtils.clean_html_tags(markup if isinstance(markup, str) else markup.decode("utf-8", "replace"))))
+    soup = bs4.BeautifulSoup(markup, "html.parser")
+    for tag in soup(["script", "style", "head", "noscript"]):
+        tag.decompose()
+    for tag in soup.find_all("br"):
+        tag.replace_with("\n")
+    for tag in soup.find_all(_HEADINGS):
+        tag.insert_before("\n\n# ")
+        tag.insert_after("\n\n")
+    for tag in soup.find_all("li"):
+        tag.insert_before("\n- ")
+    for tag in soup.find_all(_BLOCK_TAGS):
+        tag.insert_before("\n\n")
+        tag.insert_after("\n\n")
+    return _tidy(soup.get_text())
+
+def _convert(path):
+    """(path, texto, erro): DOCX pelo mammoth (vira HTML), HTML direto."""
+    try:
+        if path.lower().endswith(".docx"):
+            mammoth = lazy_import("mammoth")
+            if mammoth is None:
+                return path, None, "mammoth não instalado"
+            with open(path, "rb") as f:
+                markup = mammoth.convert_to_html(f).value
+        else:
+            with open(path, "rb") as f:
+                markup = f.read()
+        return path, _html_to_text(markup), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+def _content_hash(text):
+    # espaços/quebras não contam: o mesmo sermão salvo em .docx e .html é duplicado
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+# ---------- job ----------
+class ImportJob(threading.Thread):
+    """Importa uma pasta de .docx/.html para uma categoria da biblioteca.
+
+    A conversão roda num pool de processos, em lotes de IMPORT_BATCH; cada
+    lote é gravado e registrado no journal (jsonl) antes do próximo. Um job
+    interrompido e iniciado de novo com a mesma origem/destino pula o que o
+    journal já tem. Conteúdo repetido (na origem ou já na categoria) é
+    descartado pelo hash do texto.
+    """
+
+    def __init__(self, source, library_root, category="", workers=IMPORT_WORKERS, on_save=None):
+        super().__init__(name="importacao", daemon=True)
+        self.source = source
+        self.library_root = library_root
+        self.category = category
+        self.dest = os.path.join(library_root, category)
+        self.workers = workers
+        self.on_save = on_save
+        key = hashlib.sha256(f"{os.path.abspath(source)}|{os.path.abspath(self.dest)}".encode("utf-8")).hexdigest()[:16]
+        self.journal_path = os.path.join(IMPORT_JOURNAL_DIR, f"{key}.jsonl")
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.status = {"total": 0, "feitos": 0, "gravados": 0, "duplicados": 0, "vazios": 0, "erros": 0,
+                       "retomados": 0, "rodando": False, "erro": None, "segundos": 0.0}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.status)
+
+    def _bump(self, **counts):
+        with self._lock:
+            for k, v in counts.items():
+                self.status[k] += v
+
+    def _journaled(self):
+        done = {}
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue   # última linha cortada por uma queda
+                    if entry.get("status") != "erro":
+                        done[entry["origem"]] = tuple(entry["sig"])
+        except OSError:
+            pass
+        return done
+
+    def _pending(self):
+        done = self._journaled()
+        pending, skipped = [], 0
+        for dirpath, _, files in os.walk(self.source):
+            for name in sorted(files):
+                if not name.lower().endswith(IMPORT_EXTENSIONS) or name.startswith("~$"):
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                sig = (st.st_mtime_ns, st.st_size)
+                if done.get(os.path.relpath(full, self.source).replace(os.sep, "/")) == sig:
+                    skipped += 1
+                else:
+                    pending.append((full, sig))
+        return pending, skipped
+
+    def _existing(self):
+        hashes, names = {}, set()
+        os.makedirs(self.dest, exist_ok=True)
+        with os.scandir(self.dest) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".txt"):
+                    names.add(entry.name.lower())
+                    try:
+                        with open(entry.path, "r", encoding="utf-8", errors="replace") as f:
+                            hashes[_content_hash(f.read())] = entry.name
+                    except OSError:
+                        pass
+        return hashes, names
+
+    @staticmethod
+    def _free_name(title, names):
+        base = TextUtils.sanitize_filename(title)[:120] or "Sermao_importado"
+        name, n = f"{base}.txt", 2
+        while name.lower() in names:
+            name, n = f"{base}_{n}.txt", n + 1
+        names.add(name.lower())
+        return name
+
+    def _write_batch(self, batch, sigs, hashes, names, journal):
+        lines = []
+        for path, text, error in batch:
+            rel = os.path.relpath(path, self.source).replace(os.sep, "/")
+            entry = {"origem": rel, "sig": sigs[path]}
+            if error:
+                entry.update(status="erro", erro=error)
+                self._bump(erros=1)
+            elif not text:
+                entry.update(status="vazio")
+                self._bump(vazios=1)
+            else:
+                digest = _content_hash(text)
+                if digest in hashes:
+                    entry.update(status="duplicado", destino=hashes[digest])
+                    self._bump(duplicados=1)
+                else:
+                    name = self._free_name(os.path.splitext(os.path.basename(path))[0], names)
+                    target = os.path.join(self.dest, name)
+                    if _write_text_atomic(target, text + "\n"):
+                        hashes[digest] = name
+                        entry.update(status="gravado", destino=name)
+                        self._bump(gravados=1)
+                        if self.on_save:
+                            self.on_save(target, text + "\n")
+                    else:
+                        entry.update(status="erro", erro="falha ao gravar")
+                        self._bump(erros=1)
+            lines.append(json.dumps(entry, ensure_ascii=False))
+        # o lote só entra no journal depois de gravado; numa queda ele é refeito
+        journal.write("\n".join(lines) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+        self._bump(feitos=len(batch))
+
+    def _gather(self, futures):
+        # espera o lote olhando o pedido de parada (um .docx pode levar décimos de segundo no mammoth)
+        while True:
+            _, pending = wait(futures, timeout=0.5)
+            if not pending:
+                return [f.result() for f in futures]
+            if self._stop_event.is_set():
+                for f in pending:
+                    f.cancel()
+                return None
+
+    def run(self):
+        started = time.perf_counter()
+        with self._lock:
+            self.status["rodando"] = True
+        try:
+            pending, skipped = self._pending()
+            with self._lock:
+                self.status.update(total=len(pending) + skipped, feitos=skipped, retomados=skipped)
+            if not pending:
+                return
+            hashes, names = self._existing()
+            sigs = dict(pending)
+            paths = [p for p, _ in pending]
+            batches = [paths[i:i + IMPORT_BATCH] for i in range(0, len(paths), IMPORT_BATCH)]
+            os.makedirs(IMPORT_JOURNAL_DIR, exist_ok=True)
+            # spawn pelo mesmo motivo da exportação: threads vivas no processo do Streamlit
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths)), mp_context=ctx) as pool, \
+                    open(self.journal_path, "a", encoding="utf-8") as journal:
+                # o próximo lote já converte enquanto o atual é gravado
+                ahead = [pool.submit(_convert, p) for p in batches[0]]
+                for i in range(len(batches)):
+                    current = self._gather(ahead)
+                    if current is None or self._stop_event.is_set():
+                        break
+                    ahead = [pool.submit(_convert, p) for p in batches[i + 1]] if i + 1 < len(batches) else []
+                    self._write_batch(current, sigs, hashes, names, journal)
+                for f in ahead:
+                    f.cancel()
+        except Exception as e:
+            logging.error(f"Importação falhou ({self.source}): {e}")
+            with self._lock:
+                self.status["erro"] = str(e)
+        finally:
+            with self._lock:
+                self.status.update(rodando=False, segundos=round(time.perf_counter() - started, 2))
+            logging.info(f"Importação {self.source} -> {self.dest}: {self.snapshot()}")
+
+    def stop(self):
+        self._stop_event.set()
+
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+def start_import(source, library_root, category="", on_save=None):
+    """Inicia (ou devolve, se ainda rodando) o job para o destino."""
+    dest = os.path.abspath(os.path.join(library_root, category))
+    with _JOBS_LOCK:
+        job = _JOBS.get(dest)
+        if job is None or not job.is_alive():
+            job = _JOBS[dest] = ImportJob(source, library_root, category, on_save=on_save)
+            job.start()
+        return job
+
+def get_import_job(library_root, category=""):
+    with _JOBS_LOCK:
+        return _JOBS.get(os.path.abspath(os.path.join(library_root, category)))
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m app_modules.importer", description="Importa sermões .docx/.html")
+    parser.add_argument("source", help="pasta com os arquivos")
+    parser.add_argument("library_root", help="pasta da biblioteca (ex.: Meus_Estudos)")
+    parser.add_argument("--category", default="", help="subpasta/categoria de destino")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    args = parser.parse_args(argv)
+    job = ImportJob(args.source, args.library_root, args.category, workers=args.workers)
+    job.start()
+    while job.is_alive():
+        job.join(2)
+        s = job.snapshot()
+        print(f"{s['feitos']}/{s['total']} · {s['gravados']} gravados, {s['duplicados']} duplicados, {s['erros']} erros",
+              file=sys.stderr)
+    print(json.dumps(job.snapshot(), ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
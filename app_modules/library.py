@@ -0,0 +1,211 @@
+import os, atexit, threading, logging
+from collections import OrderedDict
+from .core import DIRECTORY_STRUCTURE, _read_json_safe, _write_json_atomic, _path_cache_name
+from .utils import TextUtils
+
+LIBRARY_BODY_CACHE = 32        # textos de sermão mantidos em memória
+LIBRARY_MANIFEST_VERSION = 1
+LIBRARY_FLUSH_SECONDS = 5      # o manifesto vai para o disco no máximo a cada 5 s (e na saída)
+_SORT_KEYS = {
+    "title": lambda e: TextUtils.fold_accents(e["title"]),
+    "mtime": lambda e: e["mtime"],
+    "words": lambda e: e["words"],
+    "size": lambda e: e["size"],
+}
+
+class LibraryManifest:
+    """Manifesto em memória dos .txt de uma biblioteca (raiz + subpastas = categorias).
+
+    Cada pasta só é relida quando o mtime dela muda (arquivo criado,
+    apagado, renomeado ou gravado por rename atômico); nesse caso só os
+    arquivos com mtime/tamanho diferentes são abertos. Quem grava no
+    próprio arquivo chama update(). O manifesto vai para o BibliaCache
+    para a próxima inicialização não precisar abrir todos os arquivos;
+    a gravação é adiada (LIBRARY_FLUSH_SECONDS), então salvar um sermão não
+    reescreve o manifesto inteiro a cada vez.
+    """
+
+    def __init__(self, root, manifest_path=None):
+        self.root = root
+        if manifest_path is None:
+            manifest_path = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], f"manifesto_{_path_cache_name(root)}.json")
+        self.manifest_path = manifest_path
+        self._lock = threading.RLock()
+        self._dirs = {}       # categoria -> mtime_ns da pasta
+        self._entries = {}    # rel -> entrada
+        self._bodies = OrderedDict()
+        self._dirty = False
+        self._timer = None
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        data = _read_json_safe(self.manifest_path, default={}, use_cache=False) or {}
+        if data.get("versao") == LIBRARY_MANIFEST_VERSION and data.get("root") == os.path.abspath(self.root):
+            self._entries = {e["rel"]: dict(e, path=os.path.join(self.root, e["rel"])) for e in data.get("entries", [])}
+            # mtimes das pastas não vão para o disco: a primeira refresh() confere tudo pelo stat
+
+    def _mark_dirty(self):
+        # chamado com self._lock
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(LIBRARY_FLUSH_SECONDS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save()
+
+    def _save(self):
+        entries = [{k: v for k, v in e.items() if k != "path"} for e in self._entries.values()]
+        _write_json_atomic(self.manifest_path, {"versao": LIBRARY_MANIFEST_VERSION, "root": os.path.abspath(self.root),
+                                                "entries": entries}, indent=None)
+
+    @staticmethod
+    def _describe(path, stat):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            text = ""
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+        return {"words": len(text.split()), "first_line": first_line[:160],
+                "mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _categories(self):
+        cats = [""]
+        try:
+            with os.scandir(self.root) as it:
+                cats += sorted(e.name for e in it if e.is_dir() and not e.name.startswith(("_", ".")))
+        except OSError:
+            pass
+        return cats
+
+    def refresh(self):
+        """Confere o mtime das pastas; devolve quantas entradas mudaram."""
+        changed = 0
+        with self._lock:
+            seen = set()
+            for cat in self._categories():
+                folder = os.path.join(self.root, cat)
+                seen.add(cat)
+                try:
+                    mtime = os.stat(folder).st_mtime_ns
+                except OSError:
+                    continue
+                if self._dirs.get(cat) == mtime:
+                    continue
+                self._dirs[cat] = mtime
+                changed += self._rescan(cat, folder)
+            for cat in set(self._dirs) - seen:
+                del self._dirs[cat]
+                changed += self._drop(lambda e: e["category"] == cat)
+            if changed:
+                self._mark_dirty()
+        return changed
+
+    def _drop(self, predicate):
+        gone = [rel for rel, e in self._entries.items() if predicate(e)]
+        for rel in gone:
+            del self._entries[rel]
+        return len(gone)
+
+    def _rescan(self, cat, folder):
+        changed, present = 0, set()
+        try:
+            with os.scandir(folder) as it:
+                files = [e for e in it if e.is_file() and e.name.endswith(".txt")]
+        except OSError:
+            files = []
+        for f in files:
+            rel = f"{cat}/{f.name}" if cat else f.name
+            present.add(rel)
+            stat = f.stat()
+            old = self._entries.get(rel)
+            if old and (old["mtime"], old["size"]) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            self._entries[rel] = dict(self._describe(f.path, stat), rel=rel, name=f.name, path=f.path,
+                                      category=cat, title=f.name[:-4])
+            changed += 1
+        return changed + self._drop(lambda e: e["category"] == cat and e["rel"] not in present)
+
+    def update(self, path, text=None):
+        """Atualiza uma entrada depois de gravar o arquivo (escrita no lugar não muda o mtime da pasta)."""
+        with self._lock:
+            rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._drop(lambda e: e["rel"] == rel)
+                self._mark_dirty()
+                return
+            cat, name = (rel.rsplit("/", 1) if "/" in rel else ("", rel))
+            if text is not None:
+                first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+                info = {"words": len(text.split()), "first_line": first_line[:160],
+                        "mtime": stat.st_mtime_ns, "size": stat.st_size}
+                self._remember((path, stat.st_mtime_ns, stat.st_size), text)
+            else:
+                info = self._describe(path, stat)
+            self._entries[rel] = dict(info, rel=rel, name=name, path=path, category=cat, title=name[:-4])
+            self._mark_dirty()
+
+    def list(self, category=None, sort="title", reverse=False, query=None):
+        self.refresh()
+        with self._lock:
+            entries = [e for e in self._entries.values() if category is None or e["category"] == category]
+        if query:
+            q = TextUtils.fold_accents(query)
+            entries = [e for e in entries if q in TextUtils.fold_accents(e["title"])]
+        entries.sort(key=_SORT_KEYS.get(sort, _SORT_KEYS["title"]), reverse=reverse)
+        return entries
+
+    def names(self, category=""):
+        """Nomes de arquivo da categoria, em ordem alfabética (para radio/selectbox)."""
+        self.refresh()
+        with self._lock:
+            return sorted(e["name"] for e in self._entries.values() if e["category"] == category)
+
+    def read(self, path):
+        """Texto do sermão, em cache enquanto mtime/tamanho não mudarem."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return ""
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                return body
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logging.error(f"Biblioteca: erro ao ler {path}: {e}")
+            return ""
+        self._remember(key, body)
+        return body
+
+    def _remember(self, key, body):
+        with self._lock:
+            self._bodies[key] = body
+            while len(self._bodies) > LIBRARY_BODY_CACHE:
+                self._bodies.popitem(last=False)
+
+_LIBRARIES = {}
+_LIBRARIES_LOCK = threading.Lock()
+
+def get_library(root):
+    with _LIBRARIES_LOCK:
+        library = _LIBRARIES.get(root)
+        if library is None:
+            library = _LIBRARIES[root] = LibraryManifest(root)
+        return library
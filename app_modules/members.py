@@ -0,0 +1,316 @@
+import os, io, re, csv, json, sqlite3, threading, logging
+from datetime import date, datetime
+from .core import DIRECTORY_STRUCTURE, DB_FILES, _read_legacy_records, _retire_legacy
+from .utils import TextUtils
+
+MEMBERS_DB_PATH = os.path.join(DIRECTORY_STRUCTURE["MEMBERSHIP"], "membros.db")
+MEMBER_FIELDS = ("id", "nome", "ministerio", "status", "nascimento", "telefone", "email", "user", "created", "updated")
+MEMBER_STATUS = ("Ativo", "Visitante", "Afastado", "Transferido", "Falecido")
+CSV_CHUNK_SIZE = 1000
+# nomes alternativos de campos (cabeçalhos de planilha já sem acento/minúsculos)
+CSV_HEADER_ALIASES = {
+    "name": "nome", "nome_completo": "nome", "ministerios": "ministerio", "departamento": "ministerio",
+    "situacao": "status", "data_de_nascimento": "nascimento", "aniversario": "nascimento",
+    "nasc": "nascimento", "fone": "telefone", "celular": "telefone", "e-mail": "email",
+}
+_PREFIX_END = "\U0010ffff"
+
+def _fold(text):
+    return " ".join(TextUtils.fold_accents(str(text or "")).split())
+
+_DATE_ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DATE_BR = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})$")
+
+def _parse_date(value):
+    # AAAA-MM-DD (com ou sem hora) ou DD/MM/AAAA; strptime pesa demais numa importação grande
+    value = str(value or "").strip()
+    m = _DATE_ISO.match(value)
+    if m:
+        y, mo, d = m.groups()
+    else:
+        m = _DATE_BR.match(value)
+        if not m:
+            return None
+        d, mo, y = m.groups()
+        if len(y) == 2:
+            y = f"19{y}" if int(y) > datetime.now().year % 100 else f"20{y}"
+    try:
+        return date(int(y), int(mo), int(d)).isoformat()
+    except ValueError:
+        return None
+
+class MemberRegistry:
+    """Cadastro de membros em SQLite com índices por id, nome, ministério,
+    status e mês de aniversário.
+
+    A busca por nome ignora acentos e casa o prefixo de qualquer palavra do
+    nome ("jo" acha "João da Silva" e "Ana Joaquina") por faixa na tabela de
+    termos, sem varrer o cadastro. Importação e exportação CSV andam em blocos
+    de CSV_CHUNK_SIZE linhas, então memória não cresce com a congregação.
+    """
+
+    def __init__(self, path=MEMBERS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS membros(id INTEGER PRIMARY KEY, nome TEXT NOT NULL, nome_busca TEXT NOT NULL, "
+            "ministerio TEXT, status TEXT, nascimento TEXT, mes_nascimento INTEGER, dia_nascimento INTEGER, "
+            "telefone TEXT, email TEXT, user TEXT, created TEXT, updated TEXT, extra TEXT);"
+            "CREATE TABLE IF NOT EXISTS membros_termos(termo TEXT, membro_id INTEGER, "
+            "PRIMARY KEY(termo, membro_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS membros_nome ON membros(nome_busca, id);"
+            "CREATE INDEX IF NOT EXISTS membros_ministerio ON membros(ministerio, nome_busca);"
+            "CREATE INDEX IF NOT EXISTS membros_status ON membros(status, nome_busca);"
+            "CREATE INDEX IF NOT EXISTS membros_aniversario ON membros(mes_nascimento, dia_nascimento);"
+            "CREATE INDEX IF NOT EXISTS membros_termos_id ON membros_termos(membro_id);"
+        )
+        self._migrate_legacy()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self, fn):
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _migrate_legacy(self):
+        # members.json (lista) vira linhas do banco uma única vez
+        legacy_path = DB_FILES["MEMBERS_DB"]
+        if not os.path.exists(legacy_path):
+            return
+        if self._conn().execute("SELECT 1 FROM membros LIMIT 1").fetchone():
+            return
+        records = [r for r in _read_legacy_records(legacy_path) if isinstance(r, dict)]
+        if records:
+            self.import_records(records)
+        _retire_legacy(legacy_path)
+        logging.info(f"Membresia: {len(records)} membros migrados para {self.path}.")
+
+    # ---------- escrita ----------
+    def _row(self, member, now=None):
+        member = {CSV_HEADER_ALIASES.get(k, k): v for k, v in member.items()}
+        nome = str(member.pop("nome", "") or "").strip()
+        nascimento = _parse_date(member.pop("nascimento", None))
+        member.pop("updated", None)
+        now = now or datetime.now().isoformat(timespec="seconds")
+        try:
+            member_id = int(member.pop("id", None) or 0) or None
+        except (TypeError, ValueError):
+            member_id = None
+        row = {
+            "id": member_id,
+            "nome": nome,
+            "nome_busca": _fold(nome),
+            "ministerio": (str(member.pop("ministerio", "") or "").strip() or None),
+            "status": (str(member.pop("status", "") or "").strip() or "Ativo"),
+            "nascimento": nascimento,
+            "mes_nascimento": int(nascimento[5:7]) if nascimento else None,
+            "dia_nascimento": int(nascimento[8:10]) if nascimento else None,
+            "telefone": member.pop("telefone", None),
+            "email": member.pop("email", None),
+            "user": member.pop("user", None),
+            "created": member.pop("created", None) or now,
+            "updated": now,
+        }
+        row["extra"] = json.dumps(member, ensure_ascii=False) if member else None
+        return row
+
+    def _write_rows(self, conn, rows):
+        cols = ("id", "nome", "nome_busca", "ministerio", "status", "nascimento", "mes_nascimento",
+                "dia_nascimento", "telefone", "email", "user", "created", "updated", "extra")
+        sql = f"INSERT OR REPLACE INTO membros({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        # ids novos saem em sequência dentro da transação (BEGIN IMMEDIATE), para um único executemany
+        next_id = conn.execute("SELECT IFNULL(MAX(id), 0) FROM membros").fetchone()[0]
+        for row in rows:
+            if not row["id"]:
+                next_id += 1
+                row["id"] = next_id
+        conn.executemany(sql, [tuple(row[c] for c in cols) for row in rows])
+        ids = [row["id"] for row in rows]
+        conn.executemany("DELETE FROM membros_termos WHERE membro_id = ?", [(i,) for i in ids])
+        conn.executemany(
+            "INSERT OR IGNORE INTO membros_termos(termo, membro_id) VALUES (?, ?)",
+            [(term, i) for i, row in zip(ids, rows) for term in set(row["nome_busca"].split())]
+        )
+        return ids
+
+    def add(self, member):
+        row = self._row(member)
+        if not row["nome"]:
+            raise ValueError("Nome do membro é obrigatório.")
+        return self._tx(lambda conn: self._write_rows(conn, [row]))[0]
+
+    def update(self, member_id, **fields):
+        current = self.get(member_id)
+        if current is None:
+            return False
+        current.update(fields)
+        current["id"] = member_id
+        self._tx(lambda conn: self._write_rows(conn, [self._row(current)]))
+        return True
+
+    def remove(self, member_id):
+        def run(conn):
+            conn.execute("DELETE FROM membros_termos WHERE membro_id = ?", (member_id,))
+            return conn.execute("DELETE FROM membros WHERE id = ?", (member_id,)).rowcount > 0
+        return self._tx(run)
+
+    def import_records(self, records, chunk_size=CSV_CHUNK_SIZE):
+        """Grava (insere ou substitui por id) em transações de chunk_size registros."""
+        stats = {"gravados": 0, "ignorados": 0}
+        chunk = []
+        now = datetime.now().isoformat(timespec="seconds")
+
+        def flush():
+            if chunk:
+                self._tx(lambda conn: self._write_rows(conn, chunk))
+                stats["gravados"] += len(chunk)
+                chunk.clear()
+
+        for record in records:
+            row = self._row(record, now)
+            if not row["nome"]:
+                stats["ignorados"] += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                flush()
+        flush()
+        return stats
+
+    # ---------- leitura ----------
+    def _member(self, row):
+        if row is None:
+            return None
+        member = {k: row[k] for k in MEMBER_FIELDS}
+        if row["extra"]:
+            member.update(json.loads(row["extra"]))
+        return member
+
+    def get(self, member_id):
+        return self._member(self._conn().execute("SELECT * FROM membros WHERE id = ?", (member_id,)).fetchone())
+
+    def _filters(self, prefix=None, ministerio=None, status=None, mes_nascimento=None):
+        where, params = [], []
+        for term in _fold(prefix).split():
+            where.append("id IN (SELECT membro_id FROM membros_termos WHERE termo >= ? AND termo < ?)")
+            params += [term, term + _PREFIX_END]
+        for col, value in (("ministerio", ministerio), ("status", status), ("mes_nascimento", mes_nascimento)):
+            if value:
+                where.append(f"{col} = ?")
+                params.append(value)
+        return (" AND ".join(where) or "1"), params
+
+    def search(self, prefix=None, ministerio=None, status=None, mes_nascimento=None, limit=50, after=None):
+        """Página ordenada por nome; `after` é o (nome_busca, id) do último item da página anterior."""
+        where, params = self._filters(prefix, ministerio, status, mes_nascimento)
+        if after:
+            where += " AND (nome_busca, id) > (?, ?)"
+            params += list(after)
+        rows = self._conn().execute(
+            f"SELECT * FROM membros WHERE {where} ORDER BY nome_busca, id LIMIT ?", params + [limit]
+        ).fetchall()
+        next_after = (rows[-1]["nome_busca"], rows[-1]["id"]) if len(rows) == limit else None
+        return [self._member(r) for r in rows], next_after
+
+    def count(self, prefix=None, ministerio=None, status=None, mes_nascimento=None):
+        where, params = self._filters(prefix, ministerio, status, mes_nascimento)
+        return self._conn().execute(f"SELECT COUNT(*) FROM membros WHERE {where}", params).fetchone()[0]
+
+    def birthdays(self, month):
+        rows = self._conn().execute(
+            "SELECT * FROM membros WHERE mes_nascimento = ? ORDER BY dia_nascimento, nome_busca", (month,)
+        ).fetchall()
+        return [self._member(r) for r in rows]
+
+    def ministries(self):
+        rows = self._conn().execute(
+            "SELECT ministerio, COUNT(*) FROM membros WHERE ministerio IS NOT NULL GROUP BY ministerio ORDER BY ministerio"
+        ).fetchall()
+        return {m: n for m, n in rows}
+
+    def iter_members(self, chunk_size=CSV_CHUNK_SIZE, **filters):
+        where, params = self._filters(**filters)
+        cur = self._conn().execute(f"SELECT * FROM membros WHERE {where} ORDER BY id", params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._member(row)
+
+    def extra_fields(self, **filters):
+        """Colunas livres (as que o import_csv guardou em `extra`) dos membros filtrados, em ordem."""
+        where, params = self._filters(**filters)
+        sub = f"SELECT extra FROM membros WHERE ({where}) AND extra IS NOT NULL"
+        try:
+            rows = self._conn().execute(f"SELECT DISTINCT j.key FROM ({sub}) AS m, json_each(m.extra) AS j", params)
+            keys = {k for (k,) in rows}
+        except sqlite3.OperationalError:
+            # SQLite sem JSON1: uma passada só pela coluna extra
+            keys = set()
+            for (extra,) in self._conn().execute(sub, params):
+                keys.update(json.loads(extra))
+        return sorted(keys - set(MEMBER_FIELDS))
+
+    # ---------- CSV ----------
+    def import_csv(self, source, chunk_size=CSV_CHUNK_SIZE, delimiter=None):
+        """Importa de um caminho ou arquivo aberto (texto ou bytes). Cabeçalho obrigatório."""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "r", encoding="utf-8-sig", newline="") as f:
+                return self.import_csv(f, chunk_size, delimiter)
+        if isinstance(source, io.BufferedIOBase) or hasattr(source, "getbuffer"):
+            source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        sample = source.read(4096)
+        delimiter = delimiter or (";" if sample.count(";") > sample.count(",") else ",")
+        reader = csv.DictReader(_chain(sample, source), delimiter=delimiter)
+        reader.fieldnames = [_fold(h).replace(" ", "_") for h in reader.fieldnames or []]
+        rows = ({k: v for k, v in r.items() if k and v not in (None, "")} for r in reader)
+        return self.import_records(rows, chunk_size)
+
+    def export_csv(self, target, chunk_size=CSV_CHUNK_SIZE, **filters):
+        """Escreve o CSV em `target` (caminho ou arquivo texto), bloco a bloco."""
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, "w", encoding="utf-8-sig", newline="") as f:
+                return self.export_csv(f, chunk_size, **filters)
+        # primeira passada só pelas chaves de `extra`: o que o import guardou volta no export
+        writer = csv.DictWriter(target, fieldnames=list(MEMBER_FIELDS) + self.extra_fields(**filters),
+                                extrasaction="ignore")
+        writer.writeheader()
+        total = 0
+        for member in self.iter_members(chunk_size, **filters):
+            writer.writerow(member)
+            total += 1
+        return total
+
+def _chain(head, rest):
+    # devolve as linhas do pedaço já lido para detectar o separador + o resto do arquivo
+    yield from io.StringIO(head + rest.readline())
+    yield from rest
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+def get_member_registry():
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = MemberRegistry()
+        return _REGISTRY
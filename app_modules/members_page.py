@@ -0,0 +1,68 @@
+import io
+import streamlit as st
+from .members import get_member_registry, MEMBER_STATUS
+
+MESES = ["", "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+         "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+PAGE_SIZE = 50
+
+def render_members():
+    st.title("👥 Membresia")
+    registry = get_member_registry()
+    tab_lista, tab_novo, tab_csv = st.tabs(["🔎 Consulta", "➕ Novo Membro", "📄 Importar / Exportar"])
+
+    with tab_lista:
+        c1, c2, c3, c4 = st.columns([3, 2, 2, 2])
+        prefix = c1.text_input("Nome (início de qualquer palavra)")
+        ministerio = c2.selectbox("Ministério", [""] + list(registry.ministries()))
+        status = c3.selectbox("Status", [""] + list(MEMBER_STATUS))
+        mes = c4.selectbox("Aniversário", range(13), format_func=lambda m: MESES[m] or "Todos")
+        filters = {"prefix": prefix, "ministerio": ministerio or None, "status": status or None, "mes_nascimento": mes or None}
+
+        # paginação por cursor; volta à primeira página quando o filtro muda
+        if st.session_state.get("membros_filtro") != filters:
+            st.session_state["membros_filtro"] = filters
+            st.session_state["membros_paginas"] = [None]
+        pages = st.session_state["membros_paginas"]
+        rows, next_after = registry.search(limit=PAGE_SIZE, after=pages[-1], **filters)
+        st.caption(f"{registry.count(**filters)} membros encontrados · página {len(pages)}")
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        b1, b2 = st.columns(2)
+        if len(pages) > 1 and b1.button("◀ Anterior"):
+            pages.pop()
+            st.rerun()
+        if next_after and b2.button("Próxima ▶"):
+            pages.append(next_after)
+            st.rerun()
+
+    with tab_novo:
+        with st.form("novo_membro", clear_on_submit=True):
+            nome = st.text_input("Nome completo")
+            c1, c2 = st.columns(2)
+            ministerio = c1.text_input("Ministério")
+            status = c2.selectbox("Status", MEMBER_STATUS)
+            nascimento = c1.date_input("Nascimento", value=None, format="DD/MM/YYYY")
+            telefone = c2.text_input("Telefone")
+            email = st.text_input("E-mail")
+            if st.form_submit_button("CADASTRAR"):
+                if not nome.strip():
+                    st.error("Informe o nome.")
+                else:
+                    member_id = registry.add({
+                        "nome": nome, "ministerio": ministerio, "status": status,
+                        "nascimento": nascimento.isoformat() if nascimento else None,
+                        "telefone": telefone or None, "email": email or None,
+                        "user": st.session_state.get("current_user"),
+                    })
+                    st.success(f"Membro #{member_id} cadastrado.")
+
+    with tab_csv:
+        upload = st.file_uploader("Planilha CSV (UTF-8, separador , ou ;)", type=["csv"])
+        if upload is not None and st.button("IMPORTAR"):
+            stats = registry.import_csv(upload)
+            st.success(f"{stats['gravados']} membros gravados, {stats['ignorados']} linhas sem nome ignoradas.")
+        if st.button("GERAR CSV"):
+            buffer = io.StringIO()
+            total = registry.export_csv(buffer)
+            st.download_button(f"Baixar membros.csv ({total})", buffer.getvalue().encode("utf-8-sig"),
+                               file_name="membros.csv", mime="text/csv")
@@ -0,0 +1,73 @@
+import os, json, time, sqlite3, hashlib, logging, threading
+
+def cache_key(*parts):
+    """Chave estável para qualquer combinação de textos/números."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Cache em disco (SQLite) com validade (ttl) e limite de entradas.
+
+    Os valores são gravados em JSON. Ao passar de max_entries, as
+    entradas usadas há mais tempo saem primeiro (LRU); entradas vencidas
+    são ignoradas na leitura e apagadas na próxima gravação.
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(
+            "CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, value TEXT, created REAL, used REAL);"
+            "CREATE INDEX IF NOT EXISTS cache_used ON cache(used);"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM cache WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn().execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Cache {self.path}: {e}")
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR REPLACE INTO cache(key, value, created, used) VALUES (?, ?, ?, ?)",
+                         (key, json.dumps(value, ensure_ascii=False), now, now))
+            conn.execute("DELETE FROM cache WHERE created <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used LIMIT "
+                "max(0, (SELECT COUNT(*) FROM cache) - ?))", (self.max_entries,)
+            )
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logging.error(f"Cache {self.path}: {e}")
+            return False
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
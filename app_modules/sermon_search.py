@@ -0,0 +1,227 @@
+import os, re, math, time, array, sqlite3, threading, logging
+from .core import DIRECTORY_STRUCTURE, _path_cache_name
+from .utils import TextUtils
+
+SEARCH_SYNC_INTERVAL = 30  # segundos entre varreduras completas da pasta
+BM25_K1 = 1.2
+BM25_B = 0.75
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_QUERY_PART = re.compile(r'"([^"]+)"|(\S+)')
+
+def tokenize(text):
+    return _TOKEN.findall(TextUtils.fold_accents(text))
+
+class SermonIndex:
+    """Índice invertido (SQLite) dos .txt de uma biblioteca de sermões.
+
+    Cada termo guarda, por documento, a frequência e as posições (para busca
+    por frase). A atualização é por documento: salvar um sermão só regrava as
+    postings dele.
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = root
+        if index_path is None:
+            index_path = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], f"indice_{_path_cache_name(root)}.db")
+        self.index_path = index_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._last_sync = 0
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs(id INTEGER PRIMARY KEY, path TEXT UNIQUE, "
+            "mtime_ns INTEGER, size INTEGER, length INTEGER);"
+            "CREATE TABLE IF NOT EXISTS postings(term TEXT, doc_id INTEGER, tf INTEGER, positions BLOB, "
+            "PRIMARY KEY(term, doc_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id);"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def update(self, path, text=None):
+        """(Re)indexa um sermão. Chamar depois de gravar o arquivo."""
+        rel = self._rel(path)
+        try:
+            st = os.stat(path)
+            if text is None:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+        except OSError:
+            return self.remove(path)
+        positions = {}
+        tokens = tokenize(text)
+        for pos, term in enumerate(tokens):
+            positions.setdefault(term, array.array("I")).append(pos)
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel,)).fetchone()
+                if row:
+                    doc_id = row[0]
+                    conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                    conn.execute(
+                        "UPDATE docs SET mtime_ns = ?, size = ?, length = ? WHERE id = ?",
+                        (st.st_mtime_ns, st.st_size, len(tokens), doc_id)
+                    )
+                else:
+                    doc_id = conn.execute(
+                        "INSERT INTO docs(path, mtime_ns, size, length) VALUES (?, ?, ?, ?)",
+                        (rel, st.st_mtime_ns, st.st_size, len(tokens))
+                    ).lastrowid
+                conn.executemany(
+                    "INSERT INTO postings(term, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+                    [(t, doc_id, len(p), p.tobytes()) for t, p in positions.items()]
+                )
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                logging.error(f"Erro ao indexar {path}: {e}")
+                return False
+        return True
+
+    def remove(self, path):
+        rel = self._rel(path)
+        conn = self._conn()
+        with self._write_lock:
+            row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel,)).fetchone()
+            if row:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+                conn.execute("COMMIT")
+        return True
+
+    def sync(self, force=False):
+        """Reindexa só os arquivos novos/alterados e remove os apagados."""
+        if not force and time.time() - self._last_sync < SEARCH_SYNC_INTERVAL:
+            return 0
+        self._last_sync = time.time()
+        known = {p: (m, s) for p, m, s in self._conn().execute("SELECT path, mtime_ns, size FROM docs")}
+        changed = 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = self._rel(full)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                if known.pop(rel, None) != (st.st_mtime_ns, st.st_size):
+                    self.update(full)
+                    changed += 1
+        for rel in known:
+            self.remove(os.path.join(self.root, rel))
+            changed += 1
+        return changed
+
+    def _postings(self, term):
+        rows = self._conn().execute("SELECT doc_id, tf, positions FROM postings WHERE term = ?", (term,)).fetchall()
+        return {doc_id: (tf, blob) for doc_id, tf, blob in rows}
+
+    @staticmethod
+    def _phrase_match(blobs):
+        first = array.array("I")
+        first.frombytes(blobs[0])
+        rest = []
+        for blob in blobs[1:]:
+            arr = array.array("I")
+            arr.frombytes(blob)
+            rest.append(set(arr))
+        return sum(1 for p in first if all((p + i + 1) in s for i, s in enumerate(rest)))
+
+    def search(self, query, limit=20):
+        """BM25 sobre os termos; trechos entre aspas exigem a frase exata."""
+        terms, phrases = [], []
+        for phrase, word in _QUERY_PART.findall(query):
+            if phrase:
+                toks = tokenize(phrase)
+                if toks:
+                    phrases.append(toks)
+                    terms += toks
+            else:
+                terms += tokenize(word)
+        terms = list(dict.fromkeys(terms))
+        if not terms:
+            return []
+        conn = self._conn()
+        n_docs, avg_len = conn.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+        if not n_docs:
+            return []
+        avg_len = avg_len or 1
+        postings = {t: self._postings(t) for t in terms}
+        candidates = None
+        for t in terms:
+            docs = set(postings[t])
+            candidates = docs if candidates is None else candidates & docs
+        if not candidates:
+            return []
+        for toks in phrases:
+            candidates = {d for d in candidates if self._phrase_match([postings[t][d][1] for t in toks])}
+        if not candidates:
+            return []
+        marks = ",".join("?" * len(candidates))
+        docs = {i: (p, l) for i, p, l in conn.execute(
+            f"SELECT id, path, length FROM docs WHERE id IN ({marks})", tuple(candidates)
+        )}
+        scores = {}
+        for t in terms:
+            plist = postings[t]
+            idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            for d in candidates:
+                tf = plist[d][0]
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * docs[d][1] / avg_len)
+                scores[d] = scores.get(d, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return [
+            {"path": os.path.join(self.root, docs[d][0]), "rel": docs[d][0],
+             "title": os.path.splitext(os.path.basename(docs[d][0]))[0], "score": round(s, 4)}
+            for d, s in ranked
+        ]
+
+    def snippet(self, path, query, width=80):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            return ""
+        # dobra caractere a caractere: "…", "ﬁ", "½" mudam de tamanho no NFKD, então a
+        # posição no texto dobrado é convertida de volta pela tabela de origens
+        parts, origin, seen = [], [], {}
+        for pos, ch in enumerate(text):
+            f = seen.get(ch)
+            if f is None:
+                f = seen[ch] = TextUtils.fold_accents(ch)
+            parts.append(f)
+            origin.extend([pos] * len(f))
+        folded = "".join(parts)
+        for term in tokenize(query.replace('"', " ")):
+            i = folded.find(term)
+            if i >= 0:
+                start = max(0, origin[i] - width // 2)
+                return ("…" if start else "") + text[start:start + width].replace("\n", " ") + "…"
+        return text[:width].replace("\n", " ")
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_sermon_index(root):
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(root)
+        if index is None:
+            index = _INDEXES[root] = SermonIndex(root)
+    index.sync()
+    return index
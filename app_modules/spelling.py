@@ -0,0 +1,239 @@
+import os, re, io, json, time, hashlib, zipfile, logging, threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from .core import DIRECTORY_STRUCTURE, _stat_signature
+
+# Dicionário hunspell (.dic) dentro de um zip; PREGADOR_SPELL_DICT troca o arquivo.
+# Atenção: o spelling.br.twzip do repositório é bretão (br), não português do
+# Brasil. Para pt-BR, aponte a variável para um zip com o pt_BR.dic.
+SPELL_DICT_PATH = os.environ.get(
+    "PREGADOR_SPELL_DICT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "spelling.br.twzip"),
+)
+SPELL_CACHE_DIR = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], "ortografia")
+SPELL_CACHE_FORMAT = 1
+SPELL_PARAGRAPH_CACHE = 4096   # parágrafos já verificados (por hash do texto)
+SPELL_MAX_DISTANCE = 2
+
+_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+class TrieDictionary:
+    """Trie em arrays, montado em largura (BFS).
+
+    O nó i tem as arestas first[i]..first[i+1]-1, com rótulos (code points)
+    em ordem crescente em `labels`; como os ids são dados na mesma ordem em
+    que as arestas são criadas, o filho da aresta e é o nó e + 1 (não há
+    vetor de destinos). `terminal[i]` marca fim de palavra.
+    """
+
+    def __init__(self, first, labels, terminal):
+        self.first = first
+        self.labels = labels
+        self.terminal = terminal
+
+    @classmethod
+    def build(cls, words):
+        words = sorted(set(words))
+        first, labels, terminal = array("I"), array("I"), bytearray()
+        queue = deque([(0, len(words), 0)])
+        while queue:
+            lo, hi, depth = queue.popleft()
+            first.append(len(labels))
+            # a palavra igual ao prefixo vem primeiro na ordem do sort
+            if lo < hi and len(words[lo]) == depth:
+                terminal.append(1)
+                lo += 1
+            else:
+                terminal.append(0)
+            while lo < hi:
+                prefix = words[lo][:depth + 1]
+                end = bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo, hi)
+                labels.append(ord(prefix[-1]))
+                queue.append((lo, end, depth + 1))
+                lo = end
+        first.append(len(labels))
+        return cls(first, labels, terminal)
+
+    def _child(self, node, code):
+        lo, hi = self.first[node], self.first[node + 1]
+        e = bisect_left(self.labels, code, lo, hi)
+        return e + 1 if e < hi and self.labels[e] == code else -1
+
+    def __contains__(self, word):
+        node = 0
+        for ch in word:
+            node = self._child(node, ord(ch))
+            if node < 0:
+                return False
+        return bool(self.terminal[node])
+
+    def __len__(self):
+        return sum(self.terminal)
+
+    def suggest(self, word, max_distance=SPELL_MAX_DISTANCE, limit=5):
+        """Palavras a até max_distance edições (Levenshtein), por busca limitada no trie."""
+        n = len(word)
+        found = []
+        first, labels, terminal = self.first, self.labels, self.terminal
+        stack = [(0, "", list(range(n + 1)))]
+        while stack:
+            node, prefix, row = stack.pop()
+            if terminal[node] and prefix and row[n] <= max_distance:
+                found.append((row[n], abs(len(prefix) - n), prefix))
+            for e in range(first[node], first[node + 1]):
+                ch = chr(labels[e])
+                new = [row[0] + 1]
+                for j in range(1, n + 1):
+                    new.append(min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (word[j - 1] != ch)))
+                if min(new) <= max_distance:
+                    stack.append((e + 1, prefix + ch, new))
+        found.sort()
+        return [w for _, _, w in found[:limit]]
+
+    # ---------- cache em disco ----------
+    def save(self, path, origin):
+        header = json.dumps({"formato": SPELL_CACHE_FORMAT, "origem": origin,
+                             "nos": len(self.terminal), "arestas": len(self.labels)})
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header.encode("ascii") + b"\n")
+            self.first.tofile(f)
+            self.labels.tofile(f)
+            f.write(self.terminal)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, origin):
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("formato") != SPELL_CACHE_FORMAT or header.get("origem") != origin:
+                return None
+            first, labels = array("I"), array("I")
+            first.fromfile(f, header["nos"] + 1)
+            labels.fromfile(f, header["arestas"])
+            terminal = bytearray(f.read(header["nos"]))
+        return cls(first, labels, terminal)
+
+def dictionary_language(zip_path):
+    """Idioma pelo nome do .dic no zip ("br", "pt_BR"...); None se não houver dicionário."""
+    try:
+        with zipfile.ZipFile(zip_path) as z:
+            name = next(n for n in z.namelist() if n.lower().endswith(".dic"))
+    except (OSError, zipfile.BadZipFile, StopIteration):
+        return None
+    return os.path.splitext(os.path.basename(name))[0].replace("-", "_")
+
+def _iter_dic_words(zip_path):
+    # lê o .dic do zip em streaming; descarta a contagem inicial e as flags de afixo
+    with zipfile.ZipFile(zip_path) as z:
+        name = next(n for n in z.namelist() if n.lower().endswith(".dic"))
+        with z.open(name) as raw:
+            lines = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+            next(lines, None)
+            for line in lines:
+                word = line.split("/", 1)[0].strip()
+                if word and not word.startswith("#"):
+                    yield word
+
+class SpellChecker:
+    """Verificação ortográfica com cache por parágrafo.
+
+    O dicionário é carregado só no primeiro uso: do cache em disco se o zip
+    não mudou, senão montado a partir do zip e gravado no cache.
+    """
+
+    def __init__(self, dict_path=SPELL_DICT_PATH, cache_dir=SPELL_CACHE_DIR):
+        self.dict_path = dict_path
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._trie = None
+        self._portuguese = None
+        self._words = {}
+        self._paragraphs = OrderedDict()
+
+    @property
+    def portuguese(self):
+        # o toggle da interface só aparece com dicionário de português (o padrão é bretão)
+        if self._portuguese is None:
+            lang = dictionary_language(self.dict_path)
+            self._portuguese = bool(lang) and lang.lower().startswith("pt")
+        return self._portuguese
+
+    @property
+    def trie(self):
+        with self._lock:
+            if self._trie is None:
+                self._trie = self._load()
+            return self._trie
+
+    def _load(self):
+        sig = _stat_signature(self.dict_path)
+        if sig is None:
+            raise FileNotFoundError(f"Dicionário não encontrado: {self.dict_path}")
+        origin = hashlib.sha256(f"{os.path.abspath(self.dict_path)}|{sig[0]}|{sig[1]}".encode()).hexdigest()[:16]
+        cache_path = os.path.join(self.cache_dir, f"{origin}.trie")
+        started = time.perf_counter()
+        if os.path.exists(cache_path):
+            try:
+                trie = TrieDictionary.load(cache_path, origin)
+                if trie is not None:
+                    logging.info(f"Ortografia: dicionário do cache em {time.perf_counter() - started:.2f}s")
+                    return trie
+            except (OSError, ValueError, EOFError) as e:
+                logging.warning(f"Ortografia: cache inválido {cache_path}: {e}")
+        trie = TrieDictionary.build(_iter_dic_words(self.dict_path))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            trie.save(cache_path, origin)
+        except OSError as e:
+            logging.error(f"Ortografia: não foi possível gravar {cache_path}: {e}")
+        logging.info(f"Ortografia: trie montado ({len(trie.terminal)} nós) em {time.perf_counter() - started:.2f}s")
+        return trie
+
+    def known(self, word):
+        ok = self._words.get(word)
+        if ok is None:
+            trie = self.trie
+            ok = word in trie or word.lower() in trie or (word.isupper() and word.capitalize() in trie)
+            if len(self._words) > 100_000:
+                self._words.clear()
+            self._words[word] = ok
+        return ok
+
+    def _check_paragraph(self, paragraph):
+        key = hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            hit = self._paragraphs.get(key)
+            if hit is not None:
+                self._paragraphs.move_to_end(key)
+                return hit
+        misses = tuple((m.start(), m.group()) for m in _WORD.finditer(paragraph) if not self.known(m.group()))
+        with self._lock:
+            self._paragraphs[key] = misses
+            if len(self._paragraphs) > SPELL_PARAGRAPH_CACHE:
+                self._paragraphs.popitem(last=False)
+        return misses
+
+    def check(self, text):
+        """[(posição, palavra)] desconhecidas; só parágrafos novos/alterados são analisados."""
+        out, offset = [], 0
+        for paragraph in (text or "").split("\n"):
+            if paragraph.strip():
+                out.extend((offset + pos, word) for pos, word in self._check_paragraph(paragraph))
+            offset += len(paragraph) + 1
+        return out
+
+    def suggest(self, word, limit=5):
+        max_distance = 1 if len(word) <= 4 else SPELL_MAX_DISTANCE
+        return self.trie.suggest(word.lower(), max_distance, limit)
+
+_SPELL = None
+_SPELL_LOCK = threading.Lock()
+
+def get_spell_checker():
+    global _SPELL
+    with _SPELL_LOCK:
+        if _SPELL is None:
+            _SPELL = SpellChecker()
+        return _SPELL
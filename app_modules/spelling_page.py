@@ -0,0 +1,28 @@
+import streamlit as st
+from .spelling import get_spell_checker
+
+SPELL_SHOW_WORDS = 30
+SPELL_SUGGEST_WORDS = 8
+
+def render_spell_check(texto, key="ortografia"):
+    checker = get_spell_checker()
+    if not checker.portuguese:
+        st.caption("🔤 Verificação ortográfica indisponível: nenhum dicionário de português configurado "
+                   "(aponte PREGADOR_SPELL_DICT para um zip com pt_BR.dic).")
+        return
+    # o dicionário só é carregado quando o pregador liga a verificação
+    if not st.toggle("🔤 Verificar ortografia", key=key):
+        return
+    try:
+        erros = checker.check(texto)
+    except (OSError, StopIteration) as e:
+        st.warning(f"Dicionário indisponível: {e}")
+        return
+    palavras = list(dict.fromkeys(w for _, w in erros))
+    if not palavras:
+        st.caption("Nenhuma palavra desconhecida.")
+        return
+    with st.expander(f"Palavras desconhecidas ({len(palavras)})"):
+        for n, palavra in enumerate(palavras[:SPELL_SHOW_WORDS]):
+            sugestoes = checker.suggest(palavra) if n < SPELL_SUGGEST_WORDS else []
+            st.markdown(f"**{palavra}**" + (f" → {', '.join(sugestoes)}" if sugestoes else ""))
@@ -0,0 +1,61 @@
+import time, logging, importlib, threading
+from contextlib import contextmanager
+
+# Relatório no estilo de `python -X importtime`: cada fase/import guarda o
+# tempo da primeira execução (partida a frio) e o da última (rerun).
+_TIMINGS = {}
+_MODULES = {}
+_LOCK = threading.Lock()
+
+def _record(kind, name, seconds):
+    with _LOCK:
+        entry = _TIMINGS.get(name)
+        if entry is None:
+            _TIMINGS[name] = {"kind": kind, "first": seconds, "last": seconds, "count": 1}
+        else:
+            entry["last"] = seconds
+            entry["count"] += 1
+
+@contextmanager
+def startup_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record("phase", name, time.perf_counter() - started)
+
+def lazy_import(name, attr=None):
+    """Importa uma dependência pesada/opcional só no primeiro uso.
+
+    Devolve o módulo (ou o atributo `attr` dele) ou None se não estiver
+    instalado; a falha é registrada uma vez no log.
+    """
+    with _LOCK:
+        cached = name in _MODULES
+        module = _MODULES.get(name)
+    if not cached:
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            logging.warning(f"Dependência Falhou: {name} ({e})")
+            module = None
+        _record("import", name, time.perf_counter() - started)
+        with _LOCK:
+            _MODULES[name] = module
+    if module is not None and attr:
+        return getattr(module, attr, None)
+    return module
+
+def startup_report():
+    with _LOCK:
+        return [dict(name=name, **entry) for name, entry in _TIMINGS.items()]
+
+def format_startup_report():
+    lines = ["startup time:   cold [us] |   last [us] |  runs | kind   | name"]
+    for row in startup_report():
+        lines.append(
+            f"startup time: {row['first'] * 1e6:>11.0f} | {row['last'] * 1e6:>11.0f} | {row['count']:>5} "
+            f"| {row['kind']:<6} | {row['name']}"
+        )
+    return "\n".join(lines)
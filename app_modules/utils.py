@@ -1,4 +1,7 @@
 import re
+import unicodedata
+
+_HTML_TAG = re.compile(r"<[^>]*>")   # compilada uma vez; também pega tag quebrada em várias linhas
 
 class TextUtils:
     @staticmethod
@@ -8,10 +11,14 @@ class TextUtils:
 
     @staticmethod
     def clean_html_tags(text):
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '\n', text)
+        return _HTML_TAG.sub('\n', text)
 
     @staticmethod
     def normalize_font(font_name):
         if not font_name: return "Inter"
-        return font_name.split(",")[0].strip().replace("'","").replace('"','')
\ No newline at end of file
+        return font_name.split(",")[0].strip().replace("'","").replace('"','')
+
+    @staticmethod
+    def fold_accents(text):
+        nfkd = unicodedata.normalize("NFKD", text)
+        return "".join(c for c in nfkd if not unicodedata.combining(c)).lower()
\ No newline at end of file
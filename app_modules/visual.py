@@ -1,23 +1,54 @@
+import threading
+from functools import lru_cache
 import streamlit as st
-from .core import _read_json_safe, DB_FILES
+from .core import get_storage
 from .utils import TextUtils
+from .assets import get_asset_cache
 
-def inject_visual_core():
-    cfg = _read_json_safe(DB_FILES["CONFIG"])
-    theme_color = cfg.get("theme_color", "#D4AF37")
-    font_main = TextUtils.normalize_font(cfg.get("font_family", "Inter"))
+# Paletas por theme_mode; "themes" no config.json pode definir temas nomeados
+# ({"nome": {"theme_color", "theme_mode", "font_family"}}) e "active_theme" escolhe um.
+THEME_MODES = {
+    "Dark Cathedral": {"bg": "#070707", "card": "#0e0e0e", "muted": "#bdb6a8", "border": "#1a1a1a",
+                       "card_grad": "rgba(18,18,18,0.9), rgba(12,12,12,0.8)", "button_text": "#111"},
+    "Light Parchment": {"bg": "#f7f3ea", "card": "#fffdf8", "muted": "#3b352b", "border": "#e2dccd",
+                        "card_grad": "rgba(255,253,248,0.95), rgba(244,238,226,0.9)", "button_text": "#fff"},
+}
+DEFAULT_THEME = {"theme_color": "#D4AF37", "theme_mode": "Dark Cathedral", "font_family": "Inter"}
+
+# antes injetado à parte pelo app.py (inject_word_style)
+EDITOR_CSS = """
+    .main .block-container {max-width:98%; padding:1rem;}
+    .ck-editor__editable {
+        min-height:700px;
+        background:white;
+        color:black;
+    }
+"""
 
-    css = f"""
+def resolve_theme(cfg):
+    """(theme_color, theme_mode, font_family) efetivos para o config."""
+    theme = dict(DEFAULT_THEME)
+    theme.update({k: cfg[k] for k in DEFAULT_THEME if cfg.get(k)})
+    named = (cfg.get("themes") or {}).get(cfg.get("active_theme") or "")
+    if isinstance(named, dict):
+        theme.update({k: named[k] for k in DEFAULT_THEME if named.get(k)})
+    mode = theme["theme_mode"] if theme["theme_mode"] in THEME_MODES else DEFAULT_THEME["theme_mode"]
+    return theme["theme_color"], mode, TextUtils.normalize_font(theme["font_family"])
+
+@lru_cache(maxsize=32)
+def compile_css(theme_color, theme_mode, font_family, font_css=""):
+    p = THEME_MODES[theme_mode]
+    return f"""
     <style>
-    @import url('https://fonts.googleapis.com/css2?family=Cinzel:wght@400;700&family=Inter:wght@300;400;600&display=swap');
+    {font_css}
 
     :root {{
         --gold: {theme_color};
         --gold-dim: {theme_color}40;
-        --bg-dark: #070707;
-        --card-bg: #0e0e0e;
-        --muted: #bdb6a8;
-        --font-body: '{font_main}', Inter, sans-serif;
+        --bg-dark: {p["bg"]};
+        --card-bg: {p["card"]};
+        --muted: {p["muted"]};
+        --font-body: '{font_family}', Inter, sans-serif;
         --font-head: 'Cinzel', serif;
     }}
 
@@ -34,8 +65,8 @@ def inject_visual_core():
     }}
 
     .tech-card {{
-        background: linear-gradient(180deg, rgba(18,18,18,0.9), rgba(12,12,12,0.8));
-        border: 1px solid #1a1a1a;
+        background: linear-gradient(180deg, {p["card_grad"]});
+        border: 1px solid {p["border"]};
         padding: 16px;
         border-radius: 8px;
     }}
@@ -57,11 +88,30 @@ def inject_visual_core():
         background: transparent;
         padding: 0.4rem;
     }}
-    .stButton>button:hover {{ background: var(--gold); color:#111; }}
+    .stButton>button:hover {{ background: var(--gold); color:{p["button_text"]}; }}
 
     /* less aggressive glows */
     .stButton>button, .tech-card {{ box-shadow: none; }}
-
+    {EDITOR_CSS}
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
\ No newline at end of file
+
+_THEME = {"version": None, "theme": None}
+_THEME_LOCK = threading.Lock()
+
+def _current_theme():
+    # só relê o config.json quando a versão do documento muda
+    storage = get_storage()
+    version = (storage.name, storage.doc_version("CONFIG"))
+    with _THEME_LOCK:
+        if _THEME["version"] == version:
+            return _THEME["theme"]
+    theme = resolve_theme(storage.read_doc("CONFIG"))
+    with _THEME_LOCK:
+        _THEME.update(version=version, theme=theme)
+    return theme
+
+def inject_visual_core():
+    # um único bloco <style> (tema + editor); o CSS só é montado quando algo muda
+    css = compile_css(*_current_theme(), get_asset_cache().font_css())
+    st.markdown(css, unsafe_allow_html=True)
@@ -0,0 +1,150 @@
+import os, time, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from .core import DIRECTORY_STRUCTURE
+from .result_cache import ResultCache, cache_key
+from .startup import lazy_import
+
+SEARCH_CACHE_PATH = os.path.join(DIRECTORY_STRUCTURE["LIBRARY_CACHE"], "busca_web.db")
+SEARCH_CACHE_TTL = 86400
+SEARCH_CACHE_MAX_ENTRIES = 5000
+SEARCH_WORKERS = 4
+SEARCH_RATE = 1.0        # consultas por segundo ao provedor (todas as sessões)
+SEARCH_BURST = 3
+SEARCH_TIMEOUT = 30
+
+class DDGSProvider:
+    """duckduckgo_search com um cliente DDGS por thread do pool."""
+
+    name = "ddgs"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def text(self, query, max_results):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            DDGS = lazy_import("duckduckgo_search", "DDGS")
+            if DDGS is None:
+                raise RuntimeError("instale `duckduckgo_search`.")
+            client = self._local.client = DDGS()
+        return [{"title": r.get("title", ""), "body": r.get("body", ""), "href": r.get("href", "")}
+                for r in client.text(query, max_results=max_results) or []]
+
+class FakeProvider:
+    """Provedor local para testes: resultados sintéticos ou de uma função."""
+
+    name = "fake"
+
+    def __init__(self, results=None, delay=0.0):
+        self.results = results or (lambda q, n: [{"title": f"{q} {i + 1}", "body": q, "href": ""} for i in range(n)])
+        self.delay = delay
+        self.calls = 0
+
+    def text(self, query, max_results):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.results(query, max_results)
+
+class RateLimiter:
+    """Balde de fichas compartilhado: no máximo `rate` chamadas/s, com rajada de `burst`."""
+
+    def __init__(self, rate=SEARCH_RATE, burst=SEARCH_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class WebSearchService:
+    """Busca na web com cache em disco, coalescência e consultas em paralelo.
+
+    Consultas iguais em andamento compartilham o mesmo Future; as chamadas
+    ao provedor passam todas pelo mesmo RateLimiter.
+    """
+
+    def __init__(self, provider=None, cache=None, workers=SEARCH_WORKERS, limiter=None, timeout=SEARCH_TIMEOUT):
+        self.provider = provider or DDGSProvider()
+        self.cache = cache if cache is not None else ResultCache(SEARCH_CACHE_PATH, SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES)
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="busca")
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    @staticmethod
+    def _normalize(query):
+        return " ".join((query or "").split()).lower()
+
+    def _submit(self, query, max_results):
+        key = cache_key(self.provider.name, self._normalize(query), max_results)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._pool.submit(self._fetch, key, query, max_results)
+            return future
+
+    def _fetch(self, key, query, max_results):
+        try:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            self.limiter.acquire()
+            results = self.provider.text(query, max_results)
+            self.cache.put(key, results)
+            return results
+        except RuntimeError:
+            raise
+        except Exception as e:
+            logging.error(f"Busca web: falha em '{query}': {e}")
+            raise RuntimeError(str(e)) from e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def search(self, query, max_results=3):
+        """Lista de {title, body, href}; levanta RuntimeError/TimeoutError."""
+        if not self._normalize(query):
+            return []
+        cached = self.cache.get(cache_key(self.provider.name, self._normalize(query), max_results))
+        if cached is not None:
+            return cached
+        return self._submit(query, max_results).result(self.timeout)
+
+    def search_many(self, queries, max_results=3):
+        """{consulta: resultados ou exceção}, com as consultas em paralelo."""
+        futures = {q: self._submit(q, max_results) for q in dict.fromkeys(queries) if self._normalize(q)}
+        out = {}
+        for query, future in futures.items():
+            try:
+                out[query] = future.result(self.timeout)
+            except Exception as e:
+                out[query] = e
+        return out
+
+_SEARCH = None
+_SEARCH_LOCK = threading.Lock()
+
+def get_search_service():
+    global _SEARCH
+    with _SEARCH_LOCK:
+        if _SEARCH is None:
+            _SEARCH = WebSearchService(FakeProvider() if os.environ.get("PREGADOR_SEARCH_PROVIDER") == "fake" else None)
+        return _SEARCH
+
+def set_search_service(service):
+    global _SEARCH
+    with _SEARCH_LOCK:
+        _SEARCH = service
@@ -0,0 +1,178 @@
+import sqlite3, threading, logging, queue
+from collections import OrderedDict
+from .bible import VerseRef, encode_vi, decode_vi
+
+XREFS_PATH = "default.xrefs.twm"
+XREFS_POOL_SIZE = 4
+XREFS_CACHE_SIZE = 4096
+_BATCH_CHUNK = 300  # 3 parâmetros por versículo, abaixo do limite de 999 do SQLite
+
+class XrefIndex:
+    """Consulta de referências cruzadas sobre o banco theWord (xrefs(vi1, vi2)).
+
+    Conexões somente leitura em pool, com mmap; resultados por versículo ficam
+    num LRU. Todas as consultas usam os índices de vi1/vi2 por faixa.
+    """
+
+    def __init__(self, path=XREFS_PATH, pool_size=XREFS_POOL_SIZE, cache_size=XREFS_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._created = 0
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._max_span = None
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._pool_size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._pool.get()
+
+    def _query(self, sql, params=()):
+        conn = self._acquire()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            self._pool.put(conn)
+
+    def _cache_get(self, key):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @property
+    def max_span(self):
+        if self._max_span is None:
+            self._max_span = self._query("SELECT MAX(vi2 & 255) FROM xrefs")[0][0] or 0
+        return self._max_span
+
+    def lookup(self, book, chapter, verse):
+        """Referências que partem de um versículo (ordem do módulo)."""
+        key = (book, chapter, verse)
+        hit = self._cache_get(key)
+        if hit is not None:
+            return hit
+        rows = self._query(
+            "SELECT vi2 FROM xrefs WHERE vi1 BETWEEN ? AND ? ORDER BY id",
+            (encode_vi(book, chapter, verse), encode_vi(book, chapter, verse, 255))
+        )
+        result = tuple(decode_vi(r[0]) for r in rows)
+        self._cache_put(key, result)
+        return result
+
+    def lookup_range(self, book, chapter, verse, end_chapter, end_verse):
+        """Referências de um trecho (ex.: Jo 3:16 até Jo 4:2), agrupadas por origem."""
+        rows = self._query(
+            "SELECT vi1, vi2 FROM xrefs WHERE vi1 BETWEEN ? AND ? ORDER BY vi1, id",
+            (encode_vi(book, chapter, verse), encode_vi(book, end_chapter, end_verse, 255))
+        )
+        result = OrderedDict()
+        for vi1, vi2 in rows:
+            src = decode_vi(vi1)
+            result.setdefault((src.book, src.chapter, src.verse), []).append(decode_vi(vi2))
+        return result
+
+    def lookup_incoming(self, book, chapter, verse):
+        """Versículos que apontam para este (inclui destinos com span que o cobrem)."""
+        start = max(1, verse - self.max_span)
+        rows = self._query(
+            "SELECT vi1, vi2 FROM xrefs WHERE vi2 BETWEEN ? AND ? ORDER BY id",
+            (encode_vi(book, chapter, start), encode_vi(book, chapter, verse, 255))
+        )
+        result = []
+        for vi1, vi2 in rows:
+            dst = decode_vi(vi2)
+            if dst.verse <= verse <= dst.verse + dst.span:
+                result.append(decode_vi(vi1))
+        return tuple(result)
+
+    def lookup_bidirectional(self, book, chapter, verse):
+        outgoing = self.lookup(book, chapter, verse)
+        seen = {(r.book, r.chapter, r.verse, r.span) for r in outgoing}
+        incoming = tuple(r for r in self.lookup_incoming(book, chapter, verse) if tuple(r) not in seen)
+        return outgoing + incoming
+
+    def lookup_many(self, verses):
+        """Resolve vários versículos de uma vez; os que não estão no cache vão numa só consulta.
+
+        `verses` é uma sequência de (livro, capítulo, versículo) ou VerseRef com
+        span (o span expande o trecho). Retorna {(l, c, v): (VerseRef, ...)}.
+        """
+        wanted = OrderedDict()
+        for ref in verses:
+            b, c, v = ref[0], ref[1], ref[2]
+            span = ref.span if isinstance(ref, VerseRef) else 0
+            for i in range(v, v + span + 1):
+                wanted[(b, c, i)] = None
+        result, missing = {}, []
+        for key in wanted:
+            hit = self._cache_get(key)
+            if hit is None:
+                missing.append(key)
+            else:
+                result[key] = hit
+        for i in range(0, len(missing), _BATCH_CHUNK):
+            chunk = missing[i:i + _BATCH_CHUNK]
+            values = ", ".join("(?, ?, ?)" for _ in chunk)
+            params = []
+            for n, (b, c, v) in enumerate(chunk):
+                params += [n, encode_vi(b, c, v), encode_vi(b, c, v, 255)]
+            rows = self._query(
+                f"WITH q(k, lo, hi) AS (VALUES {values}) "
+                "SELECT q.k, x.vi2 FROM q JOIN xrefs x ON x.vi1 BETWEEN q.lo AND q.hi ORDER BY q.k, x.id",
+                params
+            )
+            found = {}
+            for k, vi2 in rows:
+                found.setdefault(k, []).append(decode_vi(vi2))
+            for n, key in enumerate(chunk):
+                value = tuple(found.get(n, ()))
+                self._cache_put(key, value)
+                result[key] = value
+        return {key: result[key] for key in wanted}
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+def get_xref_index():
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = XrefIndex()
+            logging.info(f"Xrefs: índice aberto em {XREFS_PATH}.")
+        return _INDEX
@@ -1,16 +1,17 @@
 import streamlit as st
 import os
-
-# imports opcionais
-try:
-    from duckduckgo_search import DDGS
-except Exception:
-    DDGS = None
-
-try:
-    import google.generativeai as genai
-except Exception:
-    genai = None
+from app_modules.bible import parse_ref, format_ref, VerseRef
+from app_modules.xrefs import get_xref_index
+from app_modules.bible_refs import get_reference_scanner
+from app_modules.bible_text import get_default_bible
+from app_modules.sermon_search import get_sermon_index
+from app_modules.autosave import get_autosaver
+from app_modules.library import get_library
+from app_modules.importer import start_import, get_import_job
+from app_modules.export import EXPORT_FORMATS, export_sermons, export_folder, available_formats
+from app_modules.ai_gateway import get_ai_gateway
+from app_modules.web_search import get_search_service
+from app_modules.spelling_page import render_spell_check
 
 # --- 1. CONFIGURAÇÃO VISUAL (ESTILO DESKTOP/THEWORD) ---
 st.set_page_config(page_title="O Pregador - Simples", layout="wide", page_icon="✝️")
@@ -29,6 +30,8 @@ st.markdown("""
 
 # Pastas
 PASTA_RAIZ = "Meus_Estudos"
+PASTA_EXPORT = os.path.join(PASTA_RAIZ, "_Exportados")   # "_" fica fora das categorias da biblioteca
+REFS_MAX_SHOWN = 30
 CATEGORIAS = ["01. Rascunhos", "02. Antigo Testamento", "03. Novo Testamento", "04. Séries e Temas"]
 
 os.makedirs(PASTA_RAIZ, exist_ok=True)
@@ -37,27 +40,30 @@ for cat in CATEGORIAS:
 
 # funções simples
 
-def consultar_gemini(prompt, chave, contexto):
-    if not chave:
-        return "⚠️ Configure a Chave API no menu lateral."
-    if genai is None:
-        return "⚠️ Biblioteca `google.generativeai` não está instalada."
+def consultar_gemini(prompt, chave, contexto, modo=""):
+    # gerador: a resposta chega em pedaços (st.write_stream); cache e fila em ai_gateway
+    gateway = get_ai_gateway()
+    if not chave and gateway.backend.name != "stub":
+        yield "⚠️ Configure a Chave API no menu lateral."
+        return
     try:
-        genai.configure(api_key=chave)
-        model = genai.GenerativeModel('gemini-pro')
-        return model.generate_content(f"Contexto: {contexto}\n\nPedido: {prompt}").text
+        yield from gateway.stream(f"Contexto: {contexto}\n\nPedido: {prompt}", chave, mode=modo)
     except Exception as e:
-        return f"Erro: {e}"
+        yield f"Erro: {e}"
 
 
 def busca_web(termo):
-    if DDGS is None:
-        return "DuckDuckGo search library not available. Instale `duckduckgo_search`."
-    try:
-        res = DDGS().text(termo, max_results=3)
-        return "\n".join([f"📎 {r.get('title','(sem título)')}: {r.get('body','')}" for r in res]) if res else "Nada achado."
-    except Exception:
-        return "Erro na busca."
+    # "a; b; c" busca cada tópico em paralelo (ex.: um por ponto do sermão)
+    topicos = [t.strip() for t in termo.split(";") if t.strip()]
+    blocos = []
+    for topico, res in get_search_service().search_many(topicos, max_results=3).items():
+        if isinstance(res, Exception):
+            blocos.append(f"Erro na busca ({topico}).")
+            continue
+        linhas = [f"📎 {r.get('title') or '(sem título)'}: {r.get('body','')}" for r in res]
+        cabecalho = [f"**{topico}**"] if len(topicos) > 1 else []
+        blocos.append("\n".join(cabecalho + linhas) if linhas else "Nada achado.")
+    return "\n\n".join(blocos) or "Nada achado."
 
 # Interface
 with st.sidebar:
@@ -66,13 +72,89 @@ with st.sidebar:
         api_key = st.text_input("API Key", type="password")
     st.markdown("---")
     st.caption("BIBLIOTECA (Árvore)")
-    pasta_selecionada = st.selectbox("📂 Pasta:", CATEGORIAS)
+    busca_sermoes = st.text_input("🔎 Buscar nos sermões")
+    if busca_sermoes:
+        indice = get_sermon_index(PASTA_RAIZ)
+        resultados = indice.search(busca_sermoes, limit=10)
+        if not resultados:
+            st.caption("Nenhum sermão encontrado.")
+        for r in resultados:
+            categoria, nome = os.path.split(r["rel"])
+            if categoria in CATEGORIAS and st.button(f"📄 {r['title']}", key=f"busca_{r['rel']}"):
+                st.session_state["pasta_selecionada"] = categoria
+                st.session_state["arquivo_selecionado"] = nome
+                st.rerun()
+            st.caption(f"{categoria} — {indice.snippet(r['path'], busca_sermoes)}")
+    pasta_selecionada = st.selectbox("📂 Pasta:", CATEGORIAS, key="pasta_selecionada")
     caminho_pasta = os.path.join(PASTA_RAIZ, pasta_selecionada)
-    arquivos = [f for f in os.listdir(caminho_pasta) if f.endswith(".txt")]
-    arquivo_atual = st.radio("📄 Sermões:", ["+ Criar Novo"] + arquivos)
+    arquivos = get_library(PASTA_RAIZ).names(pasta_selecionada)
+    if st.session_state.get("arquivo_selecionado") not in ["+ Criar Novo"] + arquivos:
+        st.session_state["arquivo_selecionado"] = "+ Criar Novo"
+    arquivo_atual = st.radio("📄 Sermões:", ["+ Criar Novo"] + arquivos, key="arquivo_selecionado")
     st.markdown("---")
     st.info(f"Total na pasta: {len(arquivos)}")
 
+    with st.expander("📤 Exportar (DOCX/PDF)"):
+        formatos = st.multiselect("Formatos", available_formats(), default=available_formats())
+        destino = os.path.join(PASTA_EXPORT, pasta_selecionada)
+        alvo = st.radio("O quê", ["Sermão atual", "Pasta inteira"], horizontal=True)
+        if not formatos:
+            st.caption("Instale python-docx e reportlab (ou fpdf) para exportar.")
+        elif st.button("Exportar"):
+            barra = st.progress(0.0)
+            avancar = lambda feitos, total: barra.progress(feitos / total, text=f"{feitos}/{total}")
+            if alvo == "Pasta inteira":
+                resultado = export_folder(caminho_pasta, destino, formatos, progress=avancar)
+            elif arquivo_atual != "+ Criar Novo":
+                resultado = export_sermons([os.path.join(caminho_pasta, arquivo_atual)], destino, formatos, progress=avancar)
+            else:
+                resultado = []
+                st.warning("Selecione um sermão.")
+            st.session_state["exportacao"] = resultado
+        resultado = st.session_state.get("exportacao") or []
+        if resultado:
+            erros = [r for r in resultado if r["erro"]]
+            st.caption(f"{len(resultado) - len(erros)} arquivos em {destino}; {len(erros)} erros")
+            st.dataframe([{"arquivo": os.path.basename(r["saida"] or r["origem"]), "formato": r["formato"],
+                           "s": r["segundos"], "erro": r["erro"] or ""} for r in resultado],
+                         hide_index=True, use_container_width=True)
+            if len(resultado) <= len(EXPORT_FORMATS):
+                for r in resultado:
+                    if r["saida"]:
+                        with open(r["saida"], "rb") as f:
+                            st.download_button(f"Baixar {r['formato'].upper()}", f.read(),
+                                               file_name=os.path.basename(r["saida"]), key=f"baixar_{r['formato']}")
+
+    with st.expander("📥 Importar DOCX/HTML"):
+        origem = st.text_input("Pasta com os arquivos (.docx, .html)")
+        job = get_import_job(PASTA_RAIZ, pasta_selecionada)
+        if job is not None and job.is_alive():
+            st.caption("Importação em andamento; pode continuar usando o editor.")
+            c_atualizar, c_parar = st.columns(2)
+            c_atualizar.button("Atualizar")
+            if c_parar.button("Parar"):
+                job.stop()
+        elif st.button("Importar para esta pasta"):
+            if not origem or not os.path.isdir(origem):
+                st.warning("Pasta de origem não encontrada.")
+            else:
+                # o índice de busca acompanha cada arquivo gravado
+                job = start_import(origem, PASTA_RAIZ, pasta_selecionada,
+                                   on_save=lambda caminho, texto: get_sermon_index(PASTA_RAIZ).update(caminho, texto))
+        if job is not None:
+            s = job.snapshot()
+            st.progress(s["feitos"] / s["total"] if s["total"] else 0.0, text=f"{s['feitos']}/{s['total']}")
+            st.caption(f"{s['gravados']} gravados · {s['duplicados']} duplicados · {s['vazios']} vazios · "
+                       f"{s['erros']} erros · {s['retomados']} já importados antes")
+            if s["erro"]:
+                st.error(s["erro"])
+
+def _apos_salvar(caminho, texto):
+    get_sermon_index(PASTA_RAIZ).update(caminho, texto)
+    get_library(PASTA_RAIZ).update(caminho, texto)
+
+autosave = get_autosaver("meus_estudos", on_save=_apos_salvar)
+
 col_editor, col_tools = st.columns([3, 1.2])
 
 with col_editor:
@@ -81,11 +163,9 @@ with col_editor:
     if arquivo_atual != "+ Criar Novo":
         titulo_padrao = arquivo_atual.replace('.txt','')
         path_atual = os.path.join(caminho_pasta, arquivo_atual)
-        try:
-            with open(path_atual, 'r', encoding='utf-8') as f:
-                conteudo_padrao = f.read()
-        except Exception:
-            conteudo_padrao = ''
+        conteudo_padrao = autosave.read(path_atual, reader=get_library(PASTA_RAIZ).read)
+    if "restaurar_texto" in st.session_state:
+        st.session_state['editor_text'] = st.session_state.pop("restaurar_texto")
 
     c1, c2 = st.columns([3,1])
     with c1:
@@ -97,18 +177,24 @@ with col_editor:
             if novo_titulo:
                 caminho_final = os.path.join(caminho_pasta, f"{novo_titulo}.txt")
                 texto_salvar = st.session_state.get('editor_text', conteudo_padrao)
-                try:
-                    with open(caminho_final, 'w', encoding='utf-8') as f:
-                        f.write(texto_salvar)
+                if autosave.save_now(caminho_final, texto_salvar):
                     st.success(f"Salvo em: {pasta_selecionada} ✅")
-                except Exception as e:
-                    st.error(f"Falha ao salvar: {e}")
+                else:
+                    st.error("Falha ao salvar.")
 
     texto = st.text_area("Papel de Rascunho", value=conteudo_padrao, height=700, key='editor_text')
-    if novo_titulo and texto != conteudo_padrao:
+    render_spell_check(texto)
+    if novo_titulo:
         caminho_final = os.path.join(caminho_pasta, f"{novo_titulo}.txt")
-        with open(caminho_final, 'w', encoding='utf-8') as f:
-            f.write(texto)
+        if autosave.submit(caminho_final, texto) == "pending":
+            st.caption("✏️ Alterações serão gravadas automaticamente.")
+        revisoes = autosave.history(caminho_final).revisions()
+        if revisoes:
+            with st.expander(f"🕘 Histórico de versões ({len(revisoes)})"):
+                escolha = st.selectbox("Versão", list(reversed(revisoes)), format_func=lambda r: f"#{r['n'] + 1} — {r['t']}")
+                if st.button("Restaurar esta versão"):
+                    st.session_state["restaurar_texto"] = autosave.history(caminho_final).text_at(escolha["n"])
+                    st.rerun()
 
 with col_tools:
     st.markdown("### Ferramentas")
@@ -116,7 +202,7 @@ with col_tools:
 
     with aba_busca:
         st.caption("Pesquisa Web")
-        q = st.text_input("Termo:")
+        q = st.text_input("Termo (separe tópicos com ;):")
         if st.button("Buscar"):
             res = busca_web(q)
             st.info(res)
@@ -128,11 +214,33 @@ with col_tools:
         if st.button("Processar IA"):
             ctx = st.session_state.get('cache','')
             prompt = f"Modo: {modo}. Texto do pregador: {st.session_state.get('editor_text','')}"
-            resp = consultar_gemini(prompt, api_key, ctx)
-            st.write(resp)
+            st.write_stream(consultar_gemini(prompt, api_key, ctx, modo))
 
     with aba_biblia:
         st.caption("Bíblia Online")
         livro = st.text_input("Ref (ex: Sl 23)")
         if livro:
             st.markdown(f"[Abrir {livro}](https://www.bibliaonline.com.br/acf/busca?q={livro})")
+            ref = parse_ref(livro)
+            biblia = get_default_bible() if ref else None
+            if biblia and biblia.has_book(ref.book):
+                for n, linha in enumerate(biblia.verses(ref), start=ref.verse):
+                    st.markdown(f"<sup>{n}</sup> {linha}", unsafe_allow_html=True)
+            if ref:
+                st.caption("Referências cruzadas")
+                for (b, c, v), destinos in get_xref_index().lookup_many([ref]).items():
+                    if destinos:
+                        origem = format_ref(VerseRef(b, c, v, 0))
+                        st.markdown(f"**{origem}** → " + "; ".join(format_ref(d) for d in destinos))
+        # referências achadas no esboço (só parágrafos alterados são relidos; xrefs numa consulta)
+        scanner = get_reference_scanner()
+        achadas = scanner.scan(st.session_state.get('editor_text', ''))
+        if achadas:
+            st.caption(f"Referências no esboço ({len(achadas)})")
+            for item in scanner.resolve(achadas[:REFS_MAX_SHOWN], get_default_bible(), get_xref_index()):
+                with st.expander(item["ref"]):
+                    for linha in item["texto"]:
+                        st.markdown(linha)
+                    cruzadas = [format_ref(d) for destinos in item["xrefs"].values() for d in destinos]
+                    if cruzadas:
+                        st.caption("→ " + "; ".join(dict.fromkeys(cruzadas)))
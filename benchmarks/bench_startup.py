@@ -0,0 +1,54 @@
+"""Benchmark da partida e do custo por rerun do app.py (sem Streamlit).
+
+Uso: python benchmarks/bench_startup.py [--reruns 2000] [--json saida.json]
+
+Roda numa pasta temporária (Dados_Pregador_V31 é relativo ao cwd) e compara
+a checagem de integridade completa (comportamento antigo, force=True) com o
+caminho em cache, além do import a frio dos módulos em um subprocesso.
+"""
+import os, sys, shutil, argparse, tempfile, subprocess
+from harness import REPO, measure, print_results, write_json, use_repo_modules
+
+def _cold_import(workdir, runs=5):
+    code = (
+        "import time; t = time.perf_counter(); "
+        "import app_modules.core as c, app_modules.auth; "
+        "c.genesis_filesystem_integrity_check(); "
+        "print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip()))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=2000)
+    parser.add_argument("--json", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pregador_bench_")
+    try:
+        results = {"cold_start_first_s": _cold_import(workdir, 1)[0]}  # sem selo: checagem completa
+        cold = _cold_import(workdir)
+        results["cold_start_stamped_s"] = min(cold)
+        os.chdir(workdir)
+        use_repo_modules()
+        from app_modules import core
+        full = lambda i: (core.genesis_filesystem_integrity_check(force=True), core.get_storage().read_doc("CONFIG"))
+        cached = lambda i: (core.genesis_filesystem_integrity_check(), core.get_storage().read_doc("CONFIG"))
+        results["rerun_full_check"] = measure(full, args.reruns, track_memory=False)
+        results["rerun_cached"] = measure(cached, args.reruns, track_memory=False)
+        results["json_cache"] = core._json_cache_stats()
+    finally:
+        os.chdir(REPO)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        write_json(args.json, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark dos caminhos de armazenamento e autenticação (sem Streamlit).
+
+Uso:
+    python benchmarks/bench_storage.py [--backend json|sqlite|both] [--scale 1.0]
+        [--iterations 200] [--threads 8] [--json saida.json] [--compare anterior.json]
+
+Gera numa pasta temporária 10k usuários, 100k check-ins, 50k membros e 5k
+sermões (multiplicados por --scale) e mede latência (p50/p95/p99), vazão e
+pico de memória de cada operação. O cenário de contenção cria contas e
+registra check-ins a partir de várias threads e confere se algum update se
+perdeu.
+"""
+import os, random, shutil, hashlib, argparse, tempfile, threading, time
+from harness import measure, print_results, write_json, load_json, use_repo_modules
+
+MOODS = ["Esgotamento", "Cansaço", "Neutro", "Bem", "Pleno"]
+FIRST_NAMES = "João José Maria Ana Antônio Francisco Lúcia Paulo Pedro Raquel Débora Sérgio".split()
+LAST_NAMES = "Silva Souza Oliveira Conceição Gonçalves Araújo Lima Pereira Simões Brandão".split()
+WORDS = ("graça fé esperança amor oração pastor ovelhas cruz ressurreição salvação igreja reino "
+         "justiça paz alegria perdão espírito santo palavra vida caminho verdade luz").split()
+
+def generate(core, scale, rng):
+    n_users, n_checkins, n_members, n_sermons = (max(1, int(n * scale)) for n in (10_000, 100_000, 50_000, 5_000))
+    users = {"ADMIN": hashlib.sha256(b"admin").hexdigest()}
+    for i in range(n_users):
+        users[f"PASTOR{i}"] = hashlib.sha256(f"senha{i}".encode()).hexdigest()
+    core._write_json_atomic(core.DB_FILES["USERS_DB"], users)
+    checkins = [
+        {"user": f"PASTOR{rng.randrange(n_users)}", "data": f"20{rng.randint(15, 25)}-{rng.randint(1, 12):02d}-"
+         f"{rng.randint(1, 28):02d} 08:00", "humor": rng.choice(MOODS), "nota": "registro sintético"}
+        for _ in range(n_checkins)
+    ]
+    core.JsonStorage().rewrite_records("SOUL_METRICS", checkins)
+    members = (
+        {"id": i + 1, "nome": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}", "user": f"PASTOR{i % n_users}",
+         "ministerio": rng.choice(["Louvor", "Ensino", "Diaconia"]), "status": rng.choice(["Ativo", "Visitante"]),
+         "nascimento": f"19{rng.randint(40, 99)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}
+        for i in range(n_members)
+    )
+    from app_modules.members import get_member_registry
+    get_member_registry().import_records(members)
+    library = os.path.join("Meus_Estudos", "01. Rascunhos")
+    os.makedirs(library, exist_ok=True)
+    for i in range(n_sermons):
+        with open(os.path.join(library, f"sermao_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(" ".join(rng.choice(WORDS) for _ in range(300)))
+    return {"users": n_users, "checkins": n_checkins, "members": n_members, "sermons": n_sermons}
+
+def bench_backend(core, name, sizes, iterations, rng):
+    from app_modules.auth import AccessGate
+    storage = core.get_storage()
+    users_path = core.DB_FILES["USERS_DB"]
+    users_doc = dict(storage.read_doc("USERS_DB"))
+    r = {}
+    if name == "json":
+        r["_write_json_atomic users_db"] = measure(lambda i: core._write_json_atomic(users_path, users_doc), max(5, iterations // 10))
+        r["_read_json_safe users_db (cold)"] = measure(lambda i: core._read_json_safe(users_path, use_cache=False), max(5, iterations // 10))
+        r["_read_json_safe users_db (cached)"] = measure(lambda i: core._read_json_safe(users_path), iterations)
+    # senhas geradas em sha256 legado: o primeiro login de cada uma refaz o hash (KDF + gravação)
+    logins = rng.sample(range(sizes["users"]), min(sizes["users"], max(5, iterations // 10)))
+    r["login_check ok (rehash)"] = measure(lambda i: AccessGate.login_check(f"PASTOR{logins[i % len(logins)]}", f"senha{logins[i % len(logins)]}"), len(logins))
+    r["login_check ok (kdf)"] = measure(lambda i: AccessGate.login_check(f"PASTOR{logins[i % len(logins)]}", f"senha{logins[i % len(logins)]}"), len(logins))
+    r["login_check senha errada"] = measure(lambda i: AccessGate.login_check(f"PASTOR{logins[i % len(logins)]}", "x"), len(logins))
+    r["create_account"] = measure(lambda i: AccessGate.create_account(f"NOVO_{name}_{i}", "senha"), max(5, iterations // 10))
+    r["SOUL_METRICS append"] = measure(lambda i: storage.append("SOUL_METRICS", {
+        "user": "PASTOR1", "data": "2026-01-01 08:00", "humor": "Bem", "nota": "bench"}), iterations)
+    r["SOUL_METRICS tail(5, user)"] = measure(lambda i: storage.tail("SOUL_METRICS", 5, user="PASTOR1"), max(5, iterations // 10))
+    r["SOUL_METRICS page(5, user)"] = measure(lambda i: storage.page("SOUL_METRICS", f"PASTOR{i % sizes['users']}", 5), iterations)
+    r["SOUL_METRICS window(1 mês)"] = measure(
+        lambda i: storage.window("SOUL_METRICS", f"PASTOR{i % sizes['users']}", "2020-03-01", "2020-04-01"), iterations)
+    r["SOUL_METRICS aggregates(mês)"] = measure(lambda i: storage.aggregates("SOUL_METRICS", f"PASTOR{i % sizes['users']}"), iterations)
+    return r
+
+def bench_members(sizes, iterations):
+    from app_modules.members import get_member_registry
+    reg = get_member_registry()
+    r = {
+        "members get(id)": measure(lambda i: reg.get(1 + i % sizes["members"]), iterations),
+        "members search('jo')": measure(lambda i: reg.search("jo", limit=50), iterations),
+        "members search('conc silv')": measure(lambda i: reg.search("conc silv", limit=50), iterations),
+        "members ministério+status": measure(lambda i: reg.search(ministerio="Louvor", status="Ativo", limit=50), iterations),
+        "members aniversariantes(mês)": measure(lambda i: reg.birthdays(1 + i % 12), max(5, iterations // 10)),
+        "members add": measure(lambda i: reg.add({"nome": f"Novo Membro {i}", "ministerio": "Ensino"}), iterations),
+    }
+    started = time.perf_counter()
+    exported = reg.export_csv("membros.csv")
+    r["members export_csv_s"] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    reg.import_csv("membros.csv")
+    r["members import_csv_s"] = round(time.perf_counter() - started, 3)
+    r["members rows"] = exported
+    return r
+
+def bench_contention(core, name, threads, per_thread):
+    from app_modules.auth import AccessGate
+    storage = core.get_storage()
+    before_users = storage.count_doc_items("USERS_DB")
+    before_soul = storage.count_records("SOUL_METRICS")
+    def worker(t):
+        for i in range(per_thread):
+            AccessGate.create_account(f"CONC_{name}_{t}_{i}", "senha")
+            storage.append("SOUL_METRICS", {"user": f"CONC{t}", "data": "2026-01-01 09:00", "humor": "Neutro"})
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for th in pool: th.start()
+    for th in pool: th.join()
+    elapsed = time.perf_counter() - started
+    expected = threads * per_thread
+    return {
+        "threads": threads, "ops": 2 * expected, "seconds": round(elapsed, 3),
+        "ops_per_s": round(2 * expected / elapsed, 1),
+        "lost_accounts": expected - (storage.count_doc_items("USERS_DB") - before_users),
+        "lost_checkins": expected - (storage.count_records("SOUL_METRICS") - before_soul),
+    }
+
+def bench_library(sizes, iterations):
+    from app_modules.sermon_search import SermonIndex
+    library = os.path.join("Meus_Estudos", "01. Rascunhos")
+    r = {"library listdir+sort": measure(lambda i: sorted(f for f in os.listdir(library) if f.endswith(".txt")), iterations)}
+    index = SermonIndex("Meus_Estudos", index_path=os.path.join("bench_index.db"))
+    started = time.perf_counter()
+    index.sync(force=True)
+    r["sermon index build_s"] = round(time.perf_counter() - started, 3)
+    r["sermon search (2 termos)"] = measure(lambda i: index.search("graça esperança", limit=10), iterations)
+    r["sermon search (frase)"] = measure(lambda i: index.search('"bom pastor"', limit=10), iterations)
+    return r
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["json", "sqlite", "both"], default="both")
+    parser.add_argument("--scale", type=float, default=1.0, help="fator sobre o tamanho dos dados")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-thread", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="grava o resultado em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pregador_bench_")
+    repo_cwd = os.getcwd()
+    results = {}
+    try:
+        os.chdir(workdir)
+        use_repo_modules()
+        from app_modules import core
+        rng = random.Random(args.seed)
+        core.genesis_filesystem_integrity_check()
+        started = time.perf_counter()
+        sizes = generate(core, args.scale, rng)
+        results["dataset"] = dict(sizes, generate_s=round(time.perf_counter() - started, 2))
+        backends = ["json", "sqlite"] if args.backend == "both" else [args.backend]
+        for name in backends:
+            if name == "sqlite":
+                storage = core.set_storage(core.SqliteStorage(os.path.join(workdir, "bench.db")))
+                core.migrate_json_to_sqlite(storage)
+            else:
+                core.set_storage(core.JsonStorage())
+            for op, value in bench_backend(core, name, sizes, args.iterations, rng).items():
+                results[f"[{name}] {op}"] = value
+            results[f"[{name}] contention"] = bench_contention(core, name, args.threads, args.per_thread)
+        results.update(bench_members(sizes, args.iterations))
+        results.update(bench_library(sizes, args.iterations))
+    finally:
+        os.chdir(repo_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results, load_json(args.compare) if args.compare else None)
+    if args.json:
+        write_json(args.json, results)
+
+if __name__ == "__main__":
+    main()
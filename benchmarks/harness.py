@@ -0,0 +1,62 @@
+"""Utilidades comuns dos benchmarks: medição, percentis, memória e comparação."""
+import os, sys, json, time, tracemalloc, statistics
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def summarize(samples, elapsed=None):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    result = {"n": len(samples), "mean_us": statistics.mean(ordered) * 1e6,
+              "p50_us": pick(0.50) * 1e6, "p95_us": pick(0.95) * 1e6, "p99_us": pick(0.99) * 1e6,
+              "max_us": ordered[-1] * 1e6}
+    total = elapsed if elapsed is not None else sum(samples)
+    result["ops_per_s"] = len(samples) / total if total else 0.0
+    return result
+
+def measure(fn, n, track_memory=True):
+    """Executa fn(i) n vezes; devolve latências, vazão e pico de memória.
+
+    O pico vem de uma rodada curta separada com tracemalloc, que distorceria
+    as latências se ficasse ligado durante a medição.
+    """
+    samples = []
+    started = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    result = summarize(samples, elapsed)
+    if track_memory:
+        tracemalloc.start()
+        for i in range(n, n + min(n, 3)):
+            fn(i)
+        result["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return result
+
+def print_results(results, baseline=None):
+    for name, value in results.items():
+        if not isinstance(value, dict) or "p50_us" not in value:
+            print(f"{name:>34}: {value}")
+            continue
+        line = (f"{name:>34}: p50 {value['p50_us']:>10.1f} us | p95 {value['p95_us']:>10.1f} us "
+                f"| {value['ops_per_s']:>10.0f} op/s")
+        if "peak_kib" in value:
+            line += f" | pico {value['peak_kib']:>9.0f} KiB"
+        old = (baseline or {}).get(name)
+        if isinstance(old, dict) and old.get("p50_us"):
+            line += f" | Δp50 {100 * (value['p50_us'] / old['p50_us'] - 1):+.1f}%"
+        print(line)
+
+def write_json(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def use_repo_modules():
+    if REPO not in sys.path:
+        sys.path.insert(0, REPO)
@@ -0,0 +1,6 @@
+import os, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# o core cria Dados_Pregador_V31/ relativo à pasta atual: os testes rodam numa pasta temporária
+os.chdir(tempfile.mkdtemp(prefix="pregador_testes_"))
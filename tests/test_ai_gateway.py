@@ -0,0 +1,90 @@
+import threading
+import pytest
+from app_modules import ai_gateway
+from app_modules.ai_gateway import AIGateway, StubBackend
+from app_modules.result_cache import ResultCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "ia.db"), ttl=60, max_entries=100)
+
+def test_stream_and_cache_hit(cache):
+    backend = StubBackend()
+    gateway = AIGateway(backend, cache)
+    first = gateway.ask("Salmo 23", mode="esboco")
+    assert first.strip() == "[gemini-pro] Salmo 23"
+    assert gateway.ask("Salmo 23", mode="esboco") == first
+    # outro gateway com o mesmo cache em disco também não chama o backend
+    assert AIGateway(backend, cache).ask("Salmo 23", mode="esboco") == first
+    assert backend.calls == 1
+
+def test_mode_and_model_are_part_of_the_key(cache):
+    backend = StubBackend()
+    gateway = AIGateway(backend, cache)
+    gateway.ask("João 3:16", mode="esboco")
+    gateway.ask("João 3:16", mode="exegese")
+    gateway.ask("João 3:16", mode="esboco", model="outro")
+    assert backend.calls == 3
+
+def test_identical_requests_in_flight_share_one_generation(cache):
+    backend = StubBackend(reply=lambda prompt, model: "um dois tres quatro cinco", delay=0.02)
+    gateway = AIGateway(backend, cache)
+    barrier = threading.Barrier(5)
+    answers = []
+
+    def ask():
+        barrier.wait()
+        answers.append(gateway.ask("mesmo prompt"))
+
+    threads = [threading.Thread(target=ask) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert backend.calls == 1
+    assert len(answers) == 5 and len(set(answers)) == 1
+    assert answers[0] == "um dois tres quatro cinco "
+
+def test_timeout(cache):
+    backend = StubBackend(reply=lambda prompt, model: "lento demais", delay=0.5)
+    gateway = AIGateway(backend, cache, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        gateway.ask("demora")
+
+def test_backend_error_is_raised_and_not_cached(cache):
+    class Broken(StubBackend):
+        def stream(self, prompt, api_key, model):
+            self.calls += 1
+            raise ValueError("sem rede")
+            yield
+
+    backend = Broken()
+    gateway = AIGateway(backend, cache)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            gateway.ask("erro")
+    assert backend.calls == 2
+
+def test_finished_flight_leaves_inflight_before_waking_followers(cache, monkeypatch):
+    # quem chega logo depois do erro tem de iniciar outra geração, não herdar o erro
+    seen = []
+
+    class Watched(ai_gateway._Flight):
+        def feed(self, text=None, error=None, done=False):
+            if done:
+                seen.append(any(f is self for f in gateway._inflight.values()))
+            super().feed(text, error, done)
+
+    class Broken(StubBackend):
+        def stream(self, prompt, api_key, model):
+            self.calls += 1
+            raise ValueError("sem rede")
+            yield
+
+    monkeypatch.setattr(ai_gateway, "_Flight", Watched)
+    gateway = AIGateway(Broken(), cache)
+    with pytest.raises(RuntimeError):
+        gateway.ask("erro")
+    gateway.backend = StubBackend()
+    assert gateway.ask("erro").strip() == "[gemini-pro] erro"
+    assert seen == [False, False]
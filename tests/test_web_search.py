@@ -0,0 +1,93 @@
+import time, threading
+import pytest
+from app_modules.result_cache import ResultCache
+from app_modules.web_search import WebSearchService, FakeProvider, RateLimiter
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "busca.db"), ttl=60, max_entries=100)
+
+def fast_limiter():
+    return RateLimiter(rate=1000, burst=1000)
+
+def test_cache_hit_and_normalized_query(cache):
+    provider = FakeProvider()
+    service = WebSearchService(provider, cache, limiter=fast_limiter())
+    first = service.search("Graça de Deus")
+    assert [r["title"] for r in first] == ["Graça de Deus 1", "Graça de Deus 2", "Graça de Deus 3"]
+    assert service.search("  graça   de deus ") == first
+    assert provider.calls == 1
+    assert service.search("") == []
+
+def test_identical_queries_in_flight_are_coalesced(cache):
+    provider = FakeProvider(delay=0.2)
+    service = WebSearchService(provider, cache, limiter=fast_limiter())
+    barrier = threading.Barrier(4)
+    results = []
+
+    def search():
+        barrier.wait()
+        results.append(service.search("avivamento"))
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert provider.calls == 1
+    assert len(results) == 4 and all(r == results[0] for r in results)
+
+def test_search_many_runs_in_parallel(cache):
+    provider = FakeProvider(delay=0.2)
+    service = WebSearchService(provider, cache, workers=4, limiter=fast_limiter())
+    started = time.monotonic()
+    out = service.search_many(["fé", "esperança", "amor", "Fé "])
+    assert time.monotonic() - started < 0.6
+    assert set(out) == {"fé", "esperança", "amor", "Fé "}
+    assert provider.calls == 3   # "Fé " e "fé" são a mesma consulta
+
+def test_timeout(cache):
+    service = WebSearchService(FakeProvider(delay=0.5), cache, limiter=fast_limiter(), timeout=0.1)
+    with pytest.raises(TimeoutError):
+        service.search("lenta")
+
+def test_provider_error_becomes_runtime_error(cache):
+    def broken(query, n):
+        raise ConnectionError("sem rede")
+
+    service = WebSearchService(FakeProvider(results=broken), cache, limiter=fast_limiter())
+    with pytest.raises(RuntimeError):
+        service.search("qualquer")
+    assert isinstance(service.search_many(["outra"])["outra"], RuntimeError)
+
+def test_rate_limiter_spacing():
+    limiter = RateLimiter(rate=20, burst=1)
+    stamps = []
+    for _ in range(5):
+        limiter.acquire()
+        stamps.append(time.monotonic())
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert min(gaps) >= 0.045   # 1/20 s entre chamadas, com folga do relógio
+
+def test_rate_limiter_burst():
+    limiter = RateLimiter(rate=5, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.05
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.18
+
+def test_provider_calls_are_spaced_by_the_shared_limiter(cache):
+    stamps = []
+
+    def record(query, n):
+        stamps.append(time.monotonic())
+        return [{"title": query, "body": "", "href": ""}]
+
+    service = WebSearchService(FakeProvider(results=record), cache, workers=4,
+                               limiter=RateLimiter(rate=10, burst=1))
+    service.search_many(["a", "b", "c", "d"])
+    stamps.sort()
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert len(stamps) == 4 and min(gaps) >= 0.09